@@ -14,7 +14,13 @@ from app.models.base import Base
 from app.models.base.team import Team, Player
 from app.models.base.course import Course, Hole
 from app.models.base.league import League, LeagueTeam
-from app.models.base.match import Match, PlayerScore, HoleScore
+from app.models.base.match import Match, PlayerScore, HoleScore, MatchResult
+from app.models.base.task import TaskOutbox
+from app.models.base.head_to_head import (
+    TeamHeadToHead, PlayerHeadToHead, TeamHeadToHeadArchived, PlayerHeadToHeadArchived
+)
+from app.models.base.summary import WeekSummary
+from app.models.base.idempotency import IdempotencyKey
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,56 @@
+"""Partition hole scores by league
+
+Revision ID: 3a8e6d0b5f29
+Revises: d94b2f6e0c17
+Create Date: 2026-10-19 18:31:09.112847
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a8e6d0b5f29'
+down_revision: Union[str, None] = 'd94b2f6e0c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hole_scores', sa.Column('league_id', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE hole_scores hs "
+        "JOIN player_scores ps ON ps.id = hs.player_score_id "
+        "JOIN matches m ON m.id = ps.match_id "
+        "SET hs.league_id = m.league_id"
+    )
+    # Cards orphaned from their match have no league; park them in league 0
+    op.execute("UPDATE hole_scores SET league_id = 0 WHERE league_id IS NULL")
+    op.alter_column('hole_scores', 'league_id', existing_type=sa.Integer(), nullable=False)
+
+    # Partitioned tables cannot have foreign keys; their backing indexes go too
+    inspector = sa.inspect(op.get_bind())
+    for fk in inspector.get_foreign_keys('hole_scores'):
+        op.drop_constraint(fk['name'], 'hole_scores', type_='foreignkey')
+    for index in inspector.get_indexes('hole_scores'):
+        if index['column_names'] in (['player_score_id'], ['hole_id']):
+            op.drop_index(index['name'], table_name='hole_scores')
+    op.create_index('ix_hole_scores_player_score_id', 'hole_scores', ['player_score_id'], unique=False)
+    op.create_index('ix_hole_scores_hole_id', 'hole_scores', ['hole_id'], unique=False)
+
+    op.execute("ALTER TABLE hole_scores DROP PRIMARY KEY, ADD PRIMARY KEY (id, league_id)")
+    op.execute(f"ALTER TABLE hole_scores PARTITION BY HASH(league_id) PARTITIONS {PARTITIONS}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE hole_scores REMOVE PARTITIONING")
+    op.execute("ALTER TABLE hole_scores DROP PRIMARY KEY, ADD PRIMARY KEY (id)")
+    op.create_foreign_key(None, 'hole_scores', 'player_scores', ['player_score_id'], ['id'])
+    op.create_foreign_key(None, 'hole_scores', 'holes', ['hole_id'], ['id'])
+    op.drop_column('hole_scores', 'league_id')
@@ -0,0 +1,32 @@
+"""Add fulltext name indexes
+
+Revision ID: 4e7b90c2d815
+Revises: 9d3a61e7b254
+Create Date: 2026-10-19 15:02:41.118306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4e7b90c2d815'
+down_revision: Union[str, None] = '9d3a61e7b254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ft_players_name', 'players', ['first_name', 'last_name'], mysql_prefix='FULLTEXT')
+    op.create_index('ft_teams_name', 'teams', ['name'], mysql_prefix='FULLTEXT')
+    op.create_index('ft_courses_name', 'courses', ['name'], mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ft_courses_name', table_name='courses')
+    op.drop_index('ft_teams_name', table_name='teams')
+    op.drop_index('ft_players_name', table_name='players')
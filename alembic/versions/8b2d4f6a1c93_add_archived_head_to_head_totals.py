@@ -0,0 +1,58 @@
+"""Add archived head to head totals
+
+Revision ID: 8b2d4f6a1c93
+Revises: f1c7a9d3e268
+Create Date: 2026-10-19 21:12:40.318562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2d4f6a1c93'
+down_revision: Union[str, None] = 'f1c7a9d3e268'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Leagues archived before this revision are folded in with
+    # POST /admin/head-to-head/rebuild-archived
+    op.create_table('team_head_to_head_archived',
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('opponent_id', sa.Integer(), nullable=False),
+    sa.Column('matches_played', sa.Integer(), nullable=False),
+    sa.Column('wins', sa.Integer(), nullable=False),
+    sa.Column('losses', sa.Integer(), nullable=False),
+    sa.Column('halves', sa.Integer(), nullable=False),
+    sa.Column('points_for', sa.Float(), nullable=False),
+    sa.Column('points_against', sa.Float(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['opponent_id'], ['teams.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('team_id', 'opponent_id')
+    )
+    op.create_table('player_head_to_head_archived',
+    sa.Column('player_id', sa.Integer(), nullable=False),
+    sa.Column('opponent_id', sa.Integer(), nullable=False),
+    sa.Column('matches_played', sa.Integer(), nullable=False),
+    sa.Column('holes_won', sa.Integer(), nullable=False),
+    sa.Column('holes_lost', sa.Integer(), nullable=False),
+    sa.Column('holes_halved', sa.Integer(), nullable=False),
+    sa.Column('strokes', sa.Integer(), nullable=False),
+    sa.Column('opponent_strokes', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['opponent_id'], ['players.id'], ),
+    sa.ForeignKeyConstraint(['player_id'], ['players.id'], ),
+    sa.PrimaryKeyConstraint('player_id', 'opponent_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('player_head_to_head_archived')
+    op.drop_table('team_head_to_head_archived')
@@ -0,0 +1,30 @@
+"""Add match and player score versions
+
+Revision ID: d94b2f6e0c17
+Revises: 7c3f1e8a2d45
+Create Date: 2026-10-19 17:58:21.640372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd94b2f6e0c17'
+down_revision: Union[str, None] = '7c3f1e8a2d45'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('matches', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+    op.add_column('player_scores', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('player_scores', 'version')
+    op.drop_column('matches', 'version')
@@ -0,0 +1,46 @@
+"""Denormalize card and hole columns onto hole scores
+
+Revision ID: f1c7a9d3e268
+Revises: 3a8e6d0b5f29
+Create Date: 2026-10-19 19:05:52.477310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1c7a9d3e268'
+down_revision: Union[str, None] = '3a8e6d0b5f29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('hole_scores', sa.Column('match_id', sa.Integer(), nullable=True))
+    op.add_column('hole_scores', sa.Column('player_id', sa.Integer(), nullable=True))
+    op.add_column('hole_scores', sa.Column('team_id', sa.Integer(), nullable=True))
+    op.add_column('hole_scores', sa.Column('hole_number', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE hole_scores hs "
+        "JOIN player_scores ps ON ps.id = hs.player_score_id "
+        "LEFT JOIN players p ON p.id = ps.player_id "
+        "LEFT JOIN holes h ON h.id = hs.hole_id "
+        "SET hs.match_id = ps.match_id, "
+        "hs.player_id = ps.player_id, "
+        "hs.team_id = COALESCE(ps.team_id, p.team_id), "
+        "hs.hole_number = h.number"
+    )
+    op.create_index('ix_hole_scores_match_hole', 'hole_scores', ['match_id', 'hole_number'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_hole_scores_match_hole', table_name='hole_scores')
+    op.drop_column('hole_scores', 'hole_number')
+    op.drop_column('hole_scores', 'team_id')
+    op.drop_column('hole_scores', 'player_id')
+    op.drop_column('hole_scores', 'match_id')
@@ -0,0 +1,3 @@
+# Season archive package
+from .compaction import archive_league, build_season, rebuild_archived_head_to_head
+from .snapshot import open_snapshot
@@ -0,0 +1,207 @@
+import logging
+import os
+from datetime import datetime
+
+from sqlalchemy import and_, delete, func
+from sqlalchemy.orm import Session, selectinload
+
+from app.crud import head_to_head
+from app.models.base.models import (
+    League, LeagueTeam, Team, Player, Course, Hole, Match, PlayerScore, HoleScore, MatchResult,
+    TeamHeadToHeadArchived, PlayerHeadToHeadArchived
+)
+from app.rules.formats import DEFAULT_FORMAT, player_handicap
+from app.rules.scoring import calculate_card_points
+from .snapshot import SeasonSnapshot, write_snapshot, open_snapshot
+
+
+def build_season(db: Session, league: League) -> dict:
+    """Collect a league's full season, scorecards and results included"""
+    course = db.query(Course).options(selectinload(Course.holes))\
+        .filter(Course.id == league.course_id).first()
+    holes = course.holes if course else []
+    course_par = sum(hole.par or 0 for hole in holes)
+    scoring_format = league.scoring_format or DEFAULT_FORMAT
+    teams = db.query(Team).options(selectinload(Team.players))\
+        .join(LeagueTeam).filter(LeagueTeam.league_id == league.id).all()
+    matches = db.query(Match).filter(Match.league_id == league.id)\
+        .order_by(Match.week_number, Match.id).all()
+
+    rows = db.query(
+            PlayerScore.id,
+            PlayerScore.match_id,
+            PlayerScore.player_id,
+            func.coalesce(PlayerScore.team_id, Player.team_id),
+            HoleScore.hole_id,
+            Hole.number,
+            HoleScore.strokes
+        )\
+        .join(Match, Match.id == PlayerScore.match_id)\
+        .outerjoin(Player, Player.id == PlayerScore.player_id)\
+        .outerjoin(HoleScore, and_(
+            HoleScore.player_score_id == PlayerScore.id,
+            HoleScore.league_id == league.id
+        ))\
+        .outerjoin(Hole, Hole.id == HoleScore.hole_id)\
+        .filter(Match.league_id == league.id)\
+        .order_by(PlayerScore.id, Hole.number)\
+        .all()
+
+    cards = {}
+    for score_id, match_id, player_id, team_id, hole_id, hole_number, strokes in rows:
+        card = cards.setdefault(score_id, {
+            "id": score_id,
+            "match_id": match_id,
+            "player_id": player_id,
+            "team_id": team_id,
+            "hole_scores": []
+        })
+        if hole_id is not None:
+            card["hole_scores"].append({
+                "hole_id": hole_id,
+                "hole_number": hole_number,
+                "strokes": strokes
+            })
+
+    match_scores = {}
+    for card in cards.values():
+        match_scores.setdefault(card["match_id"], []).append(card)
+    handicaps = {
+        p.id: player_handicap(p.league_average, course_par)
+        for team in teams for p in team.players
+    }
+
+    season_matches = []
+    for match in matches:
+        scores = match_scores.get(match.id, [])
+        team1_scores = [s for s in scores if s["team_id"] == match.team1_id]
+        team2_scores = [s for s in scores if s["team_id"] == match.team2_id]
+        points = calculate_card_points(
+            [_card(s) for s in team1_scores],
+            [_card(s) for s in team2_scores],
+            holes,
+            scoring_format,
+            [handicaps.get(s["player_id"], 0) for s in team1_scores],
+            [handicaps.get(s["player_id"], 0) for s in team2_scores]
+        )
+        season_matches.append({
+            "id": match.id,
+            "league_id": match.league_id,
+            "week_number": match.week_number,
+            "team1_id": match.team1_id,
+            "team2_id": match.team2_id,
+            "date": match.date.isoformat() if match.date else None,
+            "result": {
+                "team1_points": points["team1_points"],
+                "team2_points": points["team2_points"],
+                "holes_scored": len(points["hole_results"])
+            },
+            "scores": scores
+        })
+
+    return {
+        "league": {
+            "id": league.id,
+            "name": league.name,
+            "course_id": league.course_id,
+            "start_date": league.start_date.isoformat() if league.start_date else None,
+            "scoring_format": scoring_format,
+            "created_at": league.created_at.isoformat() if league.created_at else None
+        },
+        "course": {
+            "id": course.id,
+            "name": course.name,
+            "holes": [
+                {"id": h.id, "number": h.number, "par": h.par, "handicap": h.handicap}
+                for h in sorted(course.holes, key=lambda h: h.number)
+            ]
+        } if course else None,
+        "teams": [
+            {
+                "id": team.id,
+                "name": team.name,
+                "players": [
+                    {"id": p.id, "first_name": p.first_name, "last_name": p.last_name}
+                    for p in team.players
+                ]
+            }
+            for team in teams
+        ],
+        "matches": season_matches
+    }
+
+
+def _card(score: dict) -> dict:
+    return {h["hole_number"]: h["strokes"] for h in score["hole_scores"]}
+
+
+def archive_league(db: Session, league_id: int, directory: str, force: bool = False) -> str:
+    """Compact a finished league into a snapshot file and drop its score rows.
+
+    The snapshot is written and verified before anything is deleted, and the
+    deletes run in a single transaction along with folding the season into
+    the archived head-to-head totals. Returns the snapshot path.
+    """
+    league = db.query(League).filter(League.id == league_id).first()
+    if not league:
+        raise ValueError(f"League with id {league_id} not found")
+    if league.archived_at:
+        raise ValueError(f"League {league_id} is already archived")
+
+    season = build_season(db, league)
+    if not season["matches"]:
+        raise ValueError(f"League {league_id} has no matches")
+    unplayed = [m["id"] for m in season["matches"] if not m["scores"]]
+    if unplayed and not force:
+        raise ValueError(f"League {league_id} is not finished; matches without scores: {unplayed}")
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.abspath(os.path.join(directory, f"league_{league_id}.snap"))
+    size = write_snapshot(path, season)
+
+    hole_score_count = sum(len(s["hole_scores"]) for m in season["matches"] for s in m["scores"])
+    # Opened uncached so an earlier view of the same path can't pass for this file
+    if SeasonSnapshot(path).hole_score_count() != hole_score_count:
+        raise ValueError(f"Snapshot {path} failed verification")
+
+    match_ids = [m["id"] for m in season["matches"]]
+    score_ids = [s["id"] for m in season["matches"] for s in m["scores"]]
+    try:
+        # Archived matches keep counting towards head-to-head records
+        pairs = head_to_head.archive_season(db, season)
+        if score_ids:
+            db.execute(delete(HoleScore).where(
+                HoleScore.league_id == league_id,
+                HoleScore.player_score_id.in_(score_ids)
+            ))
+            db.execute(delete(PlayerScore).where(PlayerScore.id.in_(score_ids)))
+        db.execute(delete(MatchResult).where(MatchResult.match_id.in_(match_ids)))
+        db.execute(delete(Match).where(Match.id.in_(match_ids)))
+        head_to_head.refresh_pairs(db, *pairs)
+        league.archived_at = datetime.utcnow()
+        league.snapshot_path = path
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logging.info(
+        "Archived league %s: %s matches, %s hole scores, %s bytes at %s",
+        league_id, len(match_ids), hole_score_count, size, path
+    )
+    return path
+
+
+def rebuild_archived_head_to_head(db: Session) -> int:
+    """Rebuild the archived head-to-head totals from every archived league's
+    snapshot and refresh the affected pairs; returns the number of leagues"""
+    db.execute(delete(TeamHeadToHeadArchived))
+    db.execute(delete(PlayerHeadToHeadArchived))
+    team_pairs, player_pairs = set(), set()
+    leagues = db.query(League).filter(League.snapshot_path.isnot(None)).all()
+    for league in leagues:
+        teams, players = head_to_head.archive_season(db, open_snapshot(league.snapshot_path).export())
+        team_pairs |= teams
+        player_pairs |= players
+    head_to_head.refresh_pairs(db, team_pairs, player_pairs)
+    return len(leagues)
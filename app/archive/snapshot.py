@@ -0,0 +1,199 @@
+"""Immutable season snapshot files.
+
+Layout::
+
+    MAGIC (8 bytes) | header length (uint32 LE) | header (zlib-compressed JSON)
+    | column 0 | column 1 | ...
+
+The header holds the small dimension data (league, course, teams, matches,
+results) plus the name, type code, offset and length of every column. Row
+level score data is stored column-wise as narrow fixed-width arrays, each
+aligned to 8 bytes, so readers can memory-map the file and slice columns
+without copying or decompressing them.
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from functools import lru_cache
+from typing import Dict, List
+
+MAGIC = b"GLTSNAP1"
+_LENGTH = struct.Struct("<I")
+
+# (table, column, array type code)
+COLUMNS = [
+    ("player_scores", "id", "i"),
+    ("player_scores", "match_id", "i"),
+    ("player_scores", "player_id", "i"),
+    ("player_scores", "team_id", "i"),
+    ("hole_scores", "player_score_id", "i"),
+    ("hole_scores", "hole_id", "i"),
+    ("hole_scores", "hole_number", "B"),
+    ("hole_scores", "strokes", "B"),
+]
+
+_NULL_ID = -1
+
+
+def _pad(length: int) -> int:
+    return (8 - length % 8) % 8
+
+
+def write_snapshot(path: str, season: dict):
+    """Write a season (as built by ``build_season``) to ``path`` atomically"""
+    player_scores = [
+        score for match in season["matches"] for score in match["scores"]
+    ]
+    hole_scores = [
+        (score["id"], hole) for score in player_scores for hole in score["hole_scores"]
+    ]
+    values = {
+        ("player_scores", "id"): [s["id"] for s in player_scores],
+        ("player_scores", "match_id"): [s["match_id"] for s in player_scores],
+        ("player_scores", "player_id"): [s["player_id"] for s in player_scores],
+        ("player_scores", "team_id"): [
+            _NULL_ID if s["team_id"] is None else s["team_id"] for s in player_scores
+        ],
+        ("hole_scores", "player_score_id"): [score_id for score_id, _ in hole_scores],
+        ("hole_scores", "hole_id"): [h["hole_id"] for _, h in hole_scores],
+        ("hole_scores", "hole_number"): [h["hole_number"] for _, h in hole_scores],
+        ("hole_scores", "strokes"): [h["strokes"] for _, h in hole_scores],
+    }
+
+    blobs = []
+    columns = []
+    offset = 0
+    for table, name, typecode in COLUMNS:
+        data = array(typecode, values[(table, name)]).tobytes()
+        columns.append({
+            "table": table,
+            "name": name,
+            "type": typecode,
+            "offset": offset,
+            "length": len(data)
+        })
+        blobs.append(data + b"\0" * _pad(len(data)))
+        offset += len(data) + _pad(len(data))
+
+    header = dict(season)
+    header["matches"] = [
+        {k: v for k, v in match.items() if k != "scores"} for match in season["matches"]
+    ]
+    header["byteorder"] = sys.byteorder
+    header["columns"] = columns
+    header_bytes = zlib.compress(json.dumps(header, default=str).encode(), 9)
+
+    prefix = MAGIC + _LENGTH.pack(len(header_bytes)) + header_bytes
+    data_start = len(prefix) + _pad(len(prefix))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(prefix + b"\0" * _pad(len(prefix)))
+        for blob in blobs:
+            f.write(blob)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return data_start + offset
+
+
+class SeasonSnapshot:
+    """Read-only, memory-mapped view of a snapshot file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._mm[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{path} is not a season snapshot")
+        (header_length,) = _LENGTH.unpack_from(self._mm, len(MAGIC))
+        header_start = len(MAGIC) + _LENGTH.size
+        self.header = json.loads(zlib.decompress(self._mm[header_start:header_start + header_length]))
+        prefix_length = header_start + header_length
+        self._data_start = prefix_length + _pad(prefix_length)
+        self._columns = {(c["table"], c["name"]): c for c in self.header["columns"]}
+
+    def column(self, table: str, name: str):
+        """Return a column as a zero-copy memoryview (or an array if byte-swapped)"""
+        spec = self._columns[(table, name)]
+        start = self._data_start + spec["offset"]
+        view = memoryview(self._mm)[start:start + spec["length"]]
+        if self.header["byteorder"] == sys.byteorder:
+            return view.cast(spec["type"])
+        values = array(spec["type"], view.tobytes())
+        values.byteswap()
+        return values
+
+    @property
+    def league(self) -> dict:
+        return self.header["league"]
+
+    @property
+    def number_of_weeks(self) -> int:
+        return max((m["week_number"] for m in self.header["matches"]), default=0)
+
+    def matches(self, week_number: int = None) -> List[dict]:
+        return [
+            m for m in self.header["matches"]
+            if week_number is None or m["week_number"] == week_number
+        ]
+
+    def weeks(self) -> List[int]:
+        return sorted({m["week_number"] for m in self.header["matches"]})
+
+    def hole_score_count(self) -> int:
+        return len(self.column("hole_scores", "player_score_id"))
+
+    def export(self) -> dict:
+        """Rebuild the full season, scorecards included, from the columns"""
+        cards: Dict[int, dict] = {}
+        match_cards: Dict[int, List[dict]] = {}
+        for score_id, match_id, player_id, team_id in zip(
+            self.column("player_scores", "id"),
+            self.column("player_scores", "match_id"),
+            self.column("player_scores", "player_id"),
+            self.column("player_scores", "team_id"),
+        ):
+            card = {
+                "id": score_id,
+                "match_id": match_id,
+                "player_id": player_id,
+                "team_id": None if team_id == _NULL_ID else team_id,
+                "hole_scores": []
+            }
+            cards[score_id] = card
+            match_cards.setdefault(match_id, []).append(card)
+
+        for score_id, hole_id, hole_number, strokes in zip(
+            self.column("hole_scores", "player_score_id"),
+            self.column("hole_scores", "hole_id"),
+            self.column("hole_scores", "hole_number"),
+            self.column("hole_scores", "strokes"),
+        ):
+            cards[score_id]["hole_scores"].append({
+                "hole_id": hole_id,
+                "hole_number": hole_number,
+                "strokes": strokes
+            })
+
+        season = {k: v for k, v in self.header.items() if k not in ("columns", "byteorder")}
+        season["matches"] = [
+            dict(match, scores=match_cards.get(match["id"], []))
+            for match in self.header["matches"]
+        ]
+        return season
+
+
+def open_snapshot(path: str) -> SeasonSnapshot:
+    """Shared view of ``path``; a file rewritten in place is reopened"""
+    return _open_snapshot(path, os.stat(path).st_mtime_ns)
+
+
+@lru_cache(maxsize=32)
+def _open_snapshot(path: str, mtime_ns: int) -> SeasonSnapshot:
+    return SeasonSnapshot(path)
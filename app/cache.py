@@ -0,0 +1,353 @@
+"""Two-tier versioned cache shared across workers.
+
+Every cache scope (e.g. ``league:5``) has a version counter kept in the
+shared backend. Values are stored under keys that include the version they
+were computed at, both in a small per-process LRU and in the shared backend,
+so bumping the version is all it takes to invalidate a scope everywhere.
+Version bumps are broadcast over pub/sub so every worker drops its local
+copies immediately instead of checking the backend on each read; local
+versions are also re-read from the backend every ``resync_seconds`` in case
+a message was missed while the subscription was down.
+
+Backend errors never fail the caller. A scope whose version cannot be read
+is not cached for that call, and an invalidation that cannot be recorded is
+retried on the next resync, with the scope uncached until it lands.
+
+The shared backend is Redis when ``REDIS_URL`` is set, otherwise an
+in-process stand-in with the same interface (for tests and single-worker
+development).
+"""
+import builtins
+import json
+import logging
+import pickle
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+from app.config import settings
+
+INVALIDATION_CHANNEL = "cache:invalidate"
+
+# Default for ``version`` arguments: the scope's version at the time of the
+# call. An explicit None means the version could not be read and the value
+# is not stored.
+_CURRENT = object()
+
+
+class InMemoryBackend:
+    """Process-local stand-in for the Redis backend"""
+
+    def __init__(self):
+        self._values: Dict[str, Any] = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        return self._values.get(key)
+
+    def set(self, key: str, value, ttl: int):
+        self._values[key] = value
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            self._values[key] = int(self._values.get(key, 0)) + 1
+            return self._values[key]
+
+    def publish(self, channel: str, message: str):
+        for subscribed, callback in list(self._subscribers):
+            if subscribed == channel:
+                callback(message)
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]):
+        self._subscribers.append((channel, callback))
+
+    def close(self):
+        self._subscribers = []
+
+
+class RedisBackend:
+    def __init__(self, url: str):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._pubsub = None
+        self._thread = None
+
+    def get(self, key: str):
+        return self._redis.get(key)
+
+    def set(self, key: str, value, ttl: int):
+        self._redis.set(key, value, ex=ttl)
+
+    def incr(self, key: str) -> int:
+        return self._redis.incr(key)
+
+    def publish(self, channel: str, message: str):
+        self._redis.publish(channel, message)
+
+    def subscribe(self, channel: str, callback: Callable[[str], None]):
+        if self._pubsub is None:
+            self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: lambda message: callback(message["data"].decode())})
+        if self._thread is None:
+            self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def close(self):
+        if self._thread:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub:
+            self._pubsub.close()
+            self._pubsub = None
+
+
+class SharedCache:
+    def __init__(self, backend, ttl: int, local_max_entries: int, resync_seconds: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self.local_max_entries = local_max_entries
+        self.resync_seconds = resync_seconds
+        self._local: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._versions: Dict[str, int] = {}
+        # builtins.set: the module-level set() helper below shadows it
+        self._pending: Set[str] = builtins.set()
+        self._subscribed = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {"local_hits": 0, "remote_hits": 0, "misses": 0}
+
+    def start(self):
+        """Listen for version bumps made by other workers"""
+        if not self._subscribed:
+            try:
+                self.backend.subscribe(INVALIDATION_CHANNEL, self._on_invalidate)
+                self._subscribed = True
+            except Exception as e:
+                logging.warning("Shared cache subscription failed: %s", e)
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="cache-resync", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self.backend.close()
+        self._subscribed = False
+
+    def version(self, scope: str) -> Optional[int]:
+        """Current version of ``scope``, or None when it cannot be trusted"""
+        if scope in self._pending:
+            return None
+        # Without the subscription a local version could be stale
+        if self._subscribed and scope in self._versions:
+            return self._versions[scope]
+        try:
+            version = int(self.backend.get(f"version:{scope}") or 0)
+        except Exception as e:
+            logging.warning("Shared cache version read failed: %s", e)
+            return None
+        self._versions[scope] = version
+        return version
+
+    def known_version(self, scope: str) -> Optional[int]:
+        """Version of ``scope`` if it can be answered without the backend,
+        for callers on the event loop; None means unknown"""
+        if not self._subscribed or scope in self._pending:
+            return None
+        return self._versions.get(scope)
+
+    def invalidate(self, scope: str):
+        with self._lock:
+            for local_key in [k for k in self._local if k[1] == scope]:
+                del self._local[local_key]
+        if not self._bump(scope):
+            self._pending.add(scope)
+
+    def resync(self):
+        """Retry failed invalidations and re-read every known version"""
+        for scope in list(self._pending):
+            if self._bump(scope):
+                self._pending.discard(scope)
+        for scope in list(self._versions):
+            try:
+                version = int(self.backend.get(f"version:{scope}") or 0)
+            except Exception as e:
+                logging.warning("Shared cache version resync failed: %s", e)
+                return
+            self._reset_version(scope, version)
+
+    def get(self, namespace: str, scope: str, key: Hashable = None) -> Optional[Any]:
+        version = self.version(scope)
+        if version is None:
+            self.stats["misses"] += 1
+            return None
+        local_key = (namespace, scope, key, version)
+        with self._lock:
+            if local_key in self._local:
+                self._local.move_to_end(local_key)
+                self.stats["local_hits"] += 1
+                return self._local[local_key]
+
+        try:
+            payload = self.backend.get(self._remote_key(*local_key))
+        except Exception as e:
+            logging.warning("Shared cache read failed: %s", e)
+            payload = None
+        if payload is None:
+            self.stats["misses"] += 1
+            return None
+
+        value = pickle.loads(payload)
+        self._store_local(local_key, value)
+        self.stats["remote_hits"] += 1
+        return value
+
+    def set(self, namespace: str, scope: str, value: Any, key: Hashable = None, version=_CURRENT):
+        """Store a value computed at ``version`` (defaults to the current one)"""
+        if version is _CURRENT:
+            version = self.version(scope)
+        if version is None:
+            return
+        local_key = (namespace, scope, key, version)
+        self._store_local(local_key, value)
+        try:
+            self.backend.set(self._remote_key(*local_key), pickle.dumps(value), self.ttl)
+        except Exception as e:
+            logging.warning("Shared cache write failed: %s", e)
+
+    def hit_ratio(self) -> float:
+        lookups = sum(self.stats.values())
+        return (self.stats["local_hits"] + self.stats["remote_hits"]) / lookups if lookups else 0.0
+
+    def _remote_key(self, namespace, scope, key, version) -> str:
+        return f"cache:{namespace}:{scope}:{version}:{key!r}"
+
+    def _store_local(self, local_key, value):
+        with self._lock:
+            self._local[local_key] = value
+            self._local.move_to_end(local_key)
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+
+    def _bump(self, scope: str) -> bool:
+        try:
+            version = self.backend.incr(f"version:{scope}")
+        except Exception as e:
+            logging.warning("Shared cache invalidation of %s failed: %s", scope, e)
+            return False
+        self._apply_version(scope, version)
+        try:
+            self.backend.publish(INVALIDATION_CHANNEL, json.dumps({"scope": scope, "version": version}))
+        except Exception as e:
+            # Other workers pick the new version up on their next resync
+            logging.warning("Shared cache invalidation broadcast failed: %s", e)
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.resync_seconds):
+            self.resync()
+
+    def _reset_version(self, scope: str, version: int):
+        # Unlike _apply_version this also moves backwards, e.g. after the
+        # backend lost its data, so later bumps are not ignored as stale
+        with self._lock:
+            if version == self._versions.get(scope):
+                return
+            self._versions[scope] = version
+            for local_key in [k for k in self._local if k[1] == scope and k[3] != version]:
+                del self._local[local_key]
+
+    def _apply_version(self, scope: str, version: int):
+        with self._lock:
+            if version <= self._versions.get(scope, 0):
+                return
+            self._versions[scope] = version
+            for local_key in [k for k in self._local if k[1] == scope and k[3] < version]:
+                del self._local[local_key]
+
+    def _on_invalidate(self, message: str):
+        event = json.loads(message)
+        self._apply_version(event["scope"], event["version"])
+
+
+def _create_backend():
+    if settings.REDIS_URL:
+        return RedisBackend(settings.REDIS_URL)
+    return InMemoryBackend()
+
+
+shared_cache = SharedCache(
+    _create_backend(),
+    ttl=settings.CACHE_TTL_SECONDS,
+    local_max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+    resync_seconds=settings.CACHE_VERSION_RESYNC_SECONDS
+)
+
+
+def league_scope(league_id: int) -> str:
+    return f"league:{league_id}"
+
+
+def league_version(league_id: int) -> Optional[int]:
+    return shared_cache.version(league_scope(league_id))
+
+
+def known_league_version(league_id: int) -> Optional[int]:
+    return shared_cache.known_version(league_scope(league_id))
+
+
+def invalidate_league(league_id: int):
+    shared_cache.invalidate(league_scope(league_id))
+
+
+# League of each match served by this worker, so request keys can use the
+# league version without a query; a match never moves to another league
+MATCH_LEAGUES_MAX_ENTRIES = 10000
+_match_leagues: "OrderedDict[int, int]" = OrderedDict()
+_match_leagues_lock = threading.Lock()
+
+
+def remember_match_league(match_id: int, league_id: int):
+    with _match_leagues_lock:
+        _match_leagues[match_id] = league_id
+        _match_leagues.move_to_end(match_id)
+        while len(_match_leagues) > MATCH_LEAGUES_MAX_ENTRIES:
+            _match_leagues.popitem(last=False)
+
+
+def match_league(match_id: int) -> Optional[int]:
+    with _match_leagues_lock:
+        return _match_leagues.get(match_id)
+
+
+def get(namespace: str, league_id: int, key: Hashable = None) -> Optional[Any]:
+    return shared_cache.get(namespace, league_scope(league_id), key)
+
+
+def set(namespace: str, league_id: int, value: Any, key: Hashable = None, version=_CURRENT):
+    shared_cache.set(namespace, league_scope(league_id), value, key, version)
+
+
+# Courses change rarely and are shared by every league, so they get a scope
+# of their own; the key is a course id, or None for the full list
+COURSES_SCOPE = "courses"
+
+
+def courses_version() -> Optional[int]:
+    return shared_cache.version(COURSES_SCOPE)
+
+
+def invalidate_courses():
+    shared_cache.invalidate(COURSES_SCOPE)
+
+
+def get_courses(key: Optional[int] = None) -> Optional[Any]:
+    return shared_cache.get("courses", COURSES_SCOPE, key)
+
+
+def set_courses(value: Any, key: Optional[int] = None, version=_CURRENT):
+    shared_cache.set("courses", COURSES_SCOPE, value, key, version)
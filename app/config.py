@@ -6,8 +6,71 @@ class Settings(BaseSettings):
     DATABASE_USER: str = "twb838"
     DATABASE_PASSWORD: str = "Punter11"
     DATABASE_NAME: str = "leaguetracker"
-    
+
+    # Comma-separated SQLAlchemy URLs of read replicas
+    DATABASE_REPLICA_URLS: str = ""
+    REPLICA_HEALTH_CHECK_SECONDS: float = 10.0
+
+    # Directory holding archived season snapshots
+    ARCHIVE_DIR: str = "archive"
+
+    # Monte Carlo standings projections
+    PROJECTION_PROCESSES: int = 4
+    PROJECTION_MAX_SIMULATIONS: int = 100000
+
+    # Background recomputation queue
+    TASK_WORKERS: int = 2
+    TASK_COALESCE_SECONDS: float = 2.0
+    TASK_MAX_ATTEMPTS: int = 5
+
+    # Shared cache; an in-process stand-in is used when REDIS_URL is empty
+    REDIS_URL: str = ""
+    CACHE_TTL_SECONDS: int = 3600
+    CACHE_LOCAL_MAX_ENTRIES: int = 1024
+    # Local cache versions are re-read from the backend this often, in case
+    # an invalidation message was missed
+    CACHE_VERSION_RESYNC_SECONDS: float = 30.0
+
+    # Token buckets (requests per second and burst size) and load shedding
+    # thresholds on the average database pool checkout wait
+    RATE_LIMIT_CLIENT_RATE: float = 20.0
+    RATE_LIMIT_CLIENT_BURST: int = 40
+    RATE_LIMIT_GLOBAL_RATE: float = 500.0
+    RATE_LIMIT_GLOBAL_BURST: int = 1000
+    SHED_LOW_PRIORITY_WAIT_MS: float = 50.0
+    SHED_NORMAL_PRIORITY_WAIT_MS: float = 250.0
+    SHED_RETRY_AFTER_SECONDS: int = 5
+    # Comma-separated addresses or networks of the load balancers / reverse
+    # proxies whose X-Forwarded-For header identifies the client
+    TRUSTED_PROXIES: str = ""
+
+    # "memory" for the in-process typeahead index, "mysql" for FULLTEXT
+    SEARCH_BACKEND: str = "memory"
+
+    # Admin endpoints and diagnostics are disabled while ADMIN_TOKEN is empty
+    ADMIN_TOKEN: str = ""
+    PROFILING_ENABLED: bool = False
+    PROFILE_DIR: str = "profiles"
+    # Older captured profiles are deleted past this many
+    PROFILE_MAX_FILES: int = 100
+    # 0 disables the sampling profiler
+    SAMPLING_PROFILER_INTERVAL_MS: float = 0
+    # Statements slower than this are logged and EXPLAINed; 0 disables it
+    SLOW_QUERY_THRESHOLD_MS: float = 100
+
+    # Fill pools and caches at startup before reporting ready
+    WARMUP_ENABLED: bool = True
+
+    # /health/ready fails when a SELECT 1 takes longer than this or the
+    # average pool checkout wait exceeds HEALTH_MAX_POOL_WAIT_MS
+    HEALTH_DB_TIMEOUT_MS: float = 500
+    HEALTH_MAX_POOL_WAIT_MS: float = 500
+
+    # How long a stored Idempotency-Key response is replayed for
+    IDEMPOTENCY_KEY_TTL_HOURS: int = 24
+
     class Config:
         env_file = ".env"
+        extra = "ignore"
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -0,0 +1,124 @@
+import logging
+from typing import List, Optional
+
+from sqlalchemy import insert, update, delete
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.base.models import Course, Hole, HoleScore, League, Match, PlayerScore
+from app.models import schemas
+from app.rules.formats import NET_PREFIX
+
+
+def course_payloads(db: Session, course_ids: Optional[List[int]] = None) -> List[dict]:
+    """Courses with their holes in number order, serialized as the API serves them"""
+    query = db.query(Course).options(selectinload(Course.holes))
+    if course_ids is not None:
+        query = query.filter(Course.id.in_(course_ids))
+    payloads = []
+    for course in query.order_by(Course.id):
+        payload = schemas.Course.model_validate(course).model_dump()
+        payload["holes"].sort(key=lambda hole: hole["number"])
+        payloads.append(payload)
+    return payloads
+
+
+def update_course(db: Session, course: Course, course_update: schemas.CourseUpdate) -> dict:
+    """Apply a course edit by diffing holes on their number.
+
+    Existing holes keep their ids so recorded hole scores stay attached;
+    par and stroke index changes go out as one bulk UPDATE and only added
+    or dropped holes are inserted or deleted. Does not commit.
+    """
+    logging.info("Updating course %s", course.id)
+    numbers = [hole.number for hole in course_update.holes]
+    if len(numbers) != len(set(numbers)):
+        raise ValueError("Hole numbers must be unique")
+
+    existing = {
+        hole.number: hole
+        for hole in db.query(Hole.id, Hole.number, Hole.par, Hole.handicap)
+            .filter(Hole.course_id == course.id)
+    }
+    incoming = {hole.number: hole for hole in course_update.holes}
+
+    updates = []
+    inserts = []
+    par_changed = False
+    stroke_index_changed = False
+    for number, hole in incoming.items():
+        current = existing.get(number)
+        if current is None:
+            inserts.append({
+                "course_id": course.id,
+                "number": number,
+                "par": hole.par,
+                "handicap": hole.handicap
+            })
+        elif (current.par, current.handicap) != (hole.par, hole.handicap):
+            updates.append({"id": current.id, "par": hole.par, "handicap": hole.handicap})
+            par_changed |= current.par != hole.par
+            stroke_index_changed |= current.handicap != hole.handicap
+    removed = [hole.id for number, hole in existing.items() if number not in incoming]
+
+    if removed:
+        scored = sorted(
+            number for (number,) in db.query(Hole.number)
+                .filter(Hole.id.in_(removed))
+                .filter(Hole.id.in_(
+                    db.query(HoleScore.hole_id).filter(HoleScore.hole_id.in_(removed))
+                ))
+        )
+        if scored:
+            raise ValueError(
+                f"Cannot remove holes with recorded scores: {', '.join(map(str, scored))}"
+            )
+
+    if course.name != course_update.name:
+        db.query(Course).filter(Course.id == course.id).update({"name": course_update.name})
+    if updates:
+        db.execute(update(Hole), updates)
+    if inserts:
+        db.execute(insert(Hole), inserts)
+    if removed:
+        db.execute(
+            delete(Hole).where(Hole.id.in_(removed)),
+            execution_options={"synchronize_session": False}
+        )
+
+    return {
+        "layout_changed": bool(inserts or removed) or par_changed,
+        "stroke_index_changed": stroke_index_changed
+    }
+
+
+def affected_league_weeks(db: Session, course_id: int, changes: dict) -> dict:
+    """{league_id: [week_number, ...]} of scored weeks a course edit changes.
+
+    Hole set and par changes affect every format; stroke index changes
+    only move handicap strokes, so only net formats need rescoring.
+    """
+    if not changes["layout_changed"] and not changes["stroke_index_changed"]:
+        return {}
+    query = db.query(League.id, Match.week_number)\
+        .join(Match, Match.league_id == League.id)\
+        .filter(
+            League.course_id == course_id,
+            League.archived_at.is_(None),
+            Match.id.in_(db.query(PlayerScore.match_id))
+        )
+    if not changes["layout_changed"]:
+        query = query.filter(League.scoring_format.startswith(NET_PREFIX))
+
+    weeks = {}
+    for league_id, week_number in query.distinct():
+        weeks.setdefault(league_id, []).append(week_number)
+    return weeks
+
+
+def course_league_ids(db: Session, course_id: int) -> List[int]:
+    return [
+        league_id for (league_id,) in db.query(League.id).filter(
+            League.course_id == course_id,
+            League.archived_at.is_(None)
+        )
+    ]
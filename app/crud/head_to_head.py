@@ -0,0 +1,400 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Set, Tuple
+
+from sqlalchemy import and_, case, delete, func, insert, or_, tuple_
+from sqlalchemy.orm import Session, aliased, joinedload, selectinload
+
+from app.models.base.models import (
+    League, Course, Match, Player, PlayerScore, HoleScore, Hole, MatchResult,
+    TeamHeadToHead, PlayerHeadToHead, TeamHeadToHeadArchived, PlayerHeadToHeadArchived
+)
+from app.rules.scoring import calculate_match_points
+
+Pair = Tuple[int, int]
+
+TEAM_TOTALS = ("matches_played", "wins", "losses", "halves", "points_for", "points_against")
+PLAYER_TOTALS = (
+    "matches_played", "holes_won", "holes_lost", "holes_halved", "strokes", "opponent_strokes"
+)
+
+
+def ordered_pair(a: int, b: int) -> Pair:
+    return (a, b) if a <= b else (b, a)
+
+
+def match_pairs(db: Session, match_ids: List[int]) -> Tuple[Set[Pair], Set[Pair]]:
+    """Team and player pairs that met in the given matches"""
+    if not match_ids:
+        return set(), set()
+    team_pairs = {
+        ordered_pair(team1_id, team2_id)
+        for team1_id, team2_id in db.query(Match.team1_id, Match.team2_id)
+            .filter(Match.id.in_(match_ids))
+        if team1_id is not None and team2_id is not None and team1_id != team2_id
+    }
+
+    sides = {}
+    for match_id, player_id, team_id in db.query(
+            PlayerScore.match_id,
+            PlayerScore.player_id,
+            func.coalesce(PlayerScore.team_id, Player.team_id)
+        )\
+        .outerjoin(Player, Player.id == PlayerScore.player_id)\
+        .filter(PlayerScore.match_id.in_(match_ids)):
+        sides.setdefault(match_id, []).append((player_id, team_id))
+    player_pairs = {
+        ordered_pair(p1, p2)
+        for players in sides.values()
+        for p1, t1 in players
+        for p2, t2 in players
+        if p1 < p2 and t1 != t2
+    }
+    return team_pairs, player_pairs
+
+
+def refresh_pairs(db: Session, team_pairs: Iterable[Pair], player_pairs: Iterable[Pair]):
+    """Recompute the stored head-to-head records of the given pairs from
+    their live matches plus the archived totals of archived leagues"""
+    team_pairs = sorted(set(team_pairs))
+    player_pairs = sorted(set(player_pairs))
+    if team_pairs:
+        _refresh_team_pairs(db, team_pairs)
+    if player_pairs:
+        _refresh_player_pairs(db, player_pairs)
+    logging.info(
+        "Refreshed head-to-head records for %s team and %s player pairs",
+        len(team_pairs), len(player_pairs)
+    )
+
+
+def _refresh_team_pairs(db: Session, pairs: List[Pair]):
+    records = {pair: _empty_team_record(*pair) for pair in pairs}
+    _add_archived(db, TeamHeadToHeadArchived, records, TEAM_TOTALS)
+    rows = db.query(
+            Match.team1_id, Match.team2_id, MatchResult.team1_points, MatchResult.team2_points
+        )\
+        .join(MatchResult, MatchResult.match_id == Match.id)\
+        .filter(or_(
+            tuple_(Match.team1_id, Match.team2_id).in_(pairs),
+            tuple_(Match.team2_id, Match.team1_id).in_(pairs)
+        ))
+    for team1_id, team2_id, team1_points, team2_points in rows:
+        _add_team_result(records[ordered_pair(team1_id, team2_id)], team1_id, team1_points, team2_points)
+
+    db.execute(
+        delete(TeamHeadToHead).where(
+            tuple_(TeamHeadToHead.team_id, TeamHeadToHead.opponent_id).in_(pairs)
+        ),
+        execution_options={"synchronize_session": False}
+    )
+    played = [record for record in records.values() if record["matches_played"]]
+    if played:
+        db.execute(insert(TeamHeadToHead), played)
+
+
+def _add_team_result(record: dict, team1_id: int, team1_points, team2_points):
+    points_for, points_against = team1_points or 0, team2_points or 0
+    if team1_id != record["team_id"]:
+        points_for, points_against = points_against, points_for
+    record["matches_played"] += 1
+    record["points_for"] += points_for
+    record["points_against"] += points_against
+    if points_for > points_against:
+        record["wins"] += 1
+    elif points_for < points_against:
+        record["losses"] += 1
+    else:
+        record["halves"] += 1
+
+
+def _add_archived(db: Session, model, records: Dict[Pair, dict], totals: Tuple[str, ...]):
+    """Add the archived totals of ``records``' pairs into them"""
+    key_columns = model.__table__.primary_key.columns.values()
+    for row in db.query(model).filter(tuple_(*key_columns).in_(list(records))):
+        record = records[tuple(getattr(row, column.key) for column in key_columns)]
+        for column in totals:
+            record[column] += getattr(row, column)
+
+
+def _empty_team_record(team_id: int, opponent_id: int) -> dict:
+    return {
+        "team_id": team_id,
+        "opponent_id": opponent_id,
+        "matches_played": 0,
+        "wins": 0,
+        "losses": 0,
+        "halves": 0,
+        "points_for": 0.0,
+        "points_against": 0.0,
+        "updated_at": datetime.utcnow()
+    }
+
+
+def _empty_player_record(player_id: int, opponent_id: int) -> dict:
+    return {
+        "player_id": player_id,
+        "opponent_id": opponent_id,
+        "matches_played": 0,
+        "holes_won": 0,
+        "holes_lost": 0,
+        "holes_halved": 0,
+        "strokes": 0,
+        "opponent_strokes": 0,
+        "updated_at": datetime.utcnow()
+    }
+
+
+def _opposing_holes(db: Session):
+    """Query joining two players' cards hole by hole in matches where they
+    were on opposing teams; returns the query and the aliases it uses"""
+    ps1, ps2 = aliased(PlayerScore), aliased(PlayerScore)
+    pl1, pl2 = aliased(Player), aliased(Player)
+    hs1, hs2 = aliased(HoleScore), aliased(HoleScore)
+    query = db.query(ps1)\
+        .join(ps2, ps2.match_id == ps1.match_id)\
+        .outerjoin(pl1, pl1.id == ps1.player_id)\
+        .outerjoin(pl2, pl2.id == ps2.player_id)\
+        .join(hs1, hs1.player_score_id == ps1.id)\
+        .join(hs2, and_(
+            hs2.player_score_id == ps2.id,
+            hs2.league_id == hs1.league_id,
+            hs2.hole_id == hs1.hole_id
+        ))\
+        .filter(func.coalesce(ps1.team_id, pl1.team_id) != func.coalesce(ps2.team_id, pl2.team_id))
+    return query, ps1, ps2, hs1, hs2
+
+
+def _refresh_player_pairs(db: Session, pairs: List[Pair]):
+    query, ps1, ps2, hs1, hs2 = _opposing_holes(db)
+    rows = query.with_entities(
+            ps1.player_id,
+            ps2.player_id,
+            func.count(func.distinct(ps1.match_id)),
+            func.sum(case((hs1.strokes < hs2.strokes, 1), else_=0)),
+            func.sum(case((hs1.strokes > hs2.strokes, 1), else_=0)),
+            func.sum(case((hs1.strokes == hs2.strokes, 1), else_=0)),
+            func.sum(hs1.strokes),
+            func.sum(hs2.strokes)
+        )\
+        .filter(tuple_(ps1.player_id, ps2.player_id).in_(pairs))\
+        .group_by(ps1.player_id, ps2.player_id)\
+        .all()
+
+    records = {pair: _empty_player_record(*pair) for pair in pairs}
+    _add_archived(db, PlayerHeadToHeadArchived, records, PLAYER_TOTALS)
+    for player_id, opponent_id, matches, won, lost, halved, strokes, opponent_strokes in rows:
+        record = records[(player_id, opponent_id)]
+        record["matches_played"] += matches
+        record["holes_won"] += int(won or 0)
+        record["holes_lost"] += int(lost or 0)
+        record["holes_halved"] += int(halved or 0)
+        record["strokes"] += int(strokes or 0)
+        record["opponent_strokes"] += int(opponent_strokes or 0)
+
+    db.execute(
+        delete(PlayerHeadToHead).where(
+            tuple_(PlayerHeadToHead.player_id, PlayerHeadToHead.opponent_id).in_(pairs)
+        ),
+        execution_options={"synchronize_session": False}
+    )
+    played = [record for record in records.values() if record["matches_played"]]
+    if played:
+        db.execute(insert(PlayerHeadToHead), played)
+
+
+def season_records(season: dict) -> Tuple[Dict[Pair, dict], Dict[Pair, dict]]:
+    """Team and player head-to-head totals of one season, as built by
+    ``build_season`` or exported from its snapshot, counted the way
+    ``refresh_pairs`` counts live matches"""
+    team_records, player_records = {}, {}
+    for match in season["matches"]:
+        if not match["scores"]:
+            continue
+        team1_id, team2_id = match["team1_id"], match["team2_id"]
+        if team1_id is not None and team2_id is not None and team1_id != team2_id:
+            pair = ordered_pair(team1_id, team2_id)
+            record = team_records.setdefault(pair, _empty_team_record(*pair))
+            _add_team_result(record, team1_id, match["result"]["team1_points"], match["result"]["team2_points"])
+
+        cards = [
+            (
+                score["player_id"],
+                score["team_id"],
+                {h["hole_id"]: h["strokes"] for h in score["hole_scores"] if h["strokes"] is not None}
+            )
+            for score in match["scores"]
+            if score["team_id"] is not None
+        ]
+        for player_id, team_id, strokes in cards:
+            for opponent_id, opponent_team_id, opponent_strokes in cards:
+                holes = strokes.keys() & opponent_strokes.keys()
+                if player_id >= opponent_id or team_id == opponent_team_id or not holes:
+                    continue
+                record = player_records.setdefault(
+                    (player_id, opponent_id), _empty_player_record(player_id, opponent_id)
+                )
+                record["matches_played"] += 1
+                for hole_id in holes:
+                    mine, theirs = strokes[hole_id], opponent_strokes[hole_id]
+                    if mine < theirs:
+                        record["holes_won"] += 1
+                    elif mine > theirs:
+                        record["holes_lost"] += 1
+                    else:
+                        record["holes_halved"] += 1
+                    record["strokes"] += mine
+                    record["opponent_strokes"] += theirs
+    return team_records, player_records
+
+
+def archive_season(db: Session, season: dict) -> Tuple[Set[Pair], Set[Pair]]:
+    """Fold a season's totals into the archived records before its matches
+    are deleted; returns the team and player pairs to refresh afterwards"""
+    team_records, player_records = season_records(season)
+    _fold_archived(db, TeamHeadToHeadArchived, team_records, TEAM_TOTALS)
+    _fold_archived(db, PlayerHeadToHeadArchived, player_records, PLAYER_TOTALS)
+    return set(team_records), set(player_records)
+
+
+def _fold_archived(db: Session, model, records: Dict[Pair, dict], totals: Tuple[str, ...]):
+    if not records:
+        return
+    _add_archived(db, model, records, totals)
+    key_columns = model.__table__.primary_key.columns.values()
+    db.execute(
+        delete(model).where(tuple_(*key_columns).in_(list(records))),
+        execution_options={"synchronize_session": False}
+    )
+    db.execute(insert(model), list(records.values()))
+
+
+def team_head_to_head(db: Session, team_id: int, opponent_id: int, limit: int) -> dict:
+    """Stored record of one team against another plus their latest meetings"""
+    low, high = ordered_pair(team_id, opponent_id)
+    stored = db.query(TeamHeadToHead).filter(
+        TeamHeadToHead.team_id == low,
+        TeamHeadToHead.opponent_id == high
+    ).first()
+    record = _empty_team_record(low, high) if stored is None else {
+        column: getattr(stored, column) for column in _empty_team_record(low, high)
+    }
+    if team_id != low:
+        record["wins"], record["losses"] = record["losses"], record["wins"]
+        record["points_for"], record["points_against"] = record["points_against"], record["points_for"]
+
+    matches = db.query(Match)\
+        .options(
+            joinedload(Match.league).joinedload(League.course).selectinload(Course.holes),
+            selectinload(Match.player_scores).joinedload(PlayerScore.player),
+            selectinload(Match.player_scores)
+                .selectinload(PlayerScore.hole_scores)
+                .joinedload(HoleScore.hole)
+        )\
+        .filter(or_(
+            and_(Match.team1_id == team_id, Match.team2_id == opponent_id),
+            and_(Match.team1_id == opponent_id, Match.team2_id == team_id)
+        ))\
+        .order_by(Match.date.desc(), Match.id.desc())\
+        .limit(limit)\
+        .all()
+
+    meetings = []
+    for match in matches:
+        meeting = {
+            "match_id": match.id,
+            "league_id": match.league_id,
+            "week_number": match.week_number,
+            "date": match.date,
+            "points_for": 0.0,
+            "points_against": 0.0,
+            "hole_results": []
+        }
+        if match.player_scores and match.league and match.league.course:
+            points = calculate_match_points(match, match.player_scores)
+            flip = match.team1_id != team_id
+            meeting["points_for"] = points['team2_points' if flip else 'team1_points']
+            meeting["points_against"] = points['team1_points' if flip else 'team2_points']
+            meeting["hole_results"] = [
+                {
+                    "hole_number": hole['hole_number'],
+                    "points_for": hole['points_team2' if flip else 'points_team1'],
+                    "points_against": hole['points_team1' if flip else 'points_team2']
+                }
+                for hole in points['hole_results']
+            ]
+        meetings.append(meeting)
+
+    return {
+        "team_id": team_id,
+        "opponent_id": opponent_id,
+        "record": record,
+        "matches": meetings
+    }
+
+
+def player_head_to_head(db: Session, player_id: int, opponent_id: int, limit: int) -> dict:
+    """Stored record of one player against another plus their latest meetings"""
+    low, high = ordered_pair(player_id, opponent_id)
+    stored = db.query(PlayerHeadToHead).filter(
+        PlayerHeadToHead.player_id == low,
+        PlayerHeadToHead.opponent_id == high
+    ).first()
+    columns = ("matches_played", "holes_won", "holes_lost", "holes_halved", "strokes", "opponent_strokes")
+    record = {column: getattr(stored, column) if stored else 0 for column in columns}
+    if player_id != low:
+        record["holes_won"], record["holes_lost"] = record["holes_lost"], record["holes_won"]
+        record["strokes"], record["opponent_strokes"] = record["opponent_strokes"], record["strokes"]
+
+    query, ps1, ps2, hs1, hs2 = _opposing_holes(db)
+    recent = query.with_entities(ps1.match_id)\
+        .join(Match, Match.id == ps1.match_id)\
+        .filter(ps1.player_id == player_id, ps2.player_id == opponent_id)\
+        .group_by(ps1.match_id, Match.date)\
+        .order_by(Match.date.desc(), ps1.match_id.desc())\
+        .limit(limit)\
+        .subquery()
+    rows = query.with_entities(
+            Match.id, Match.league_id, Match.week_number, Match.date,
+            Hole.number, hs1.strokes, hs2.strokes
+        )\
+        .join(Match, Match.id == ps1.match_id)\
+        .join(Hole, Hole.id == hs1.hole_id)\
+        .filter(
+            ps1.player_id == player_id,
+            ps2.player_id == opponent_id,
+            ps1.match_id.in_(db.query(recent.c.match_id))
+        )\
+        .order_by(Match.date.desc(), Match.id.desc(), Hole.number)\
+        .all()
+
+    meetings = {}
+    for match_id, league_id, week_number, date, hole_number, strokes, opponent_strokes in rows:
+        meeting = meetings.setdefault(match_id, {
+            "match_id": match_id,
+            "league_id": league_id,
+            "week_number": week_number,
+            "date": date,
+            "holes_won": 0,
+            "holes_lost": 0,
+            "holes_halved": 0,
+            "holes": []
+        })
+        if strokes < opponent_strokes:
+            meeting["holes_won"] += 1
+        elif strokes > opponent_strokes:
+            meeting["holes_lost"] += 1
+        else:
+            meeting["holes_halved"] += 1
+        meeting["holes"].append({
+            "hole_number": hole_number,
+            "strokes": strokes,
+            "opponent_strokes": opponent_strokes
+        })
+
+    return {
+        "player_id": player_id,
+        "opponent_id": opponent_id,
+        "record": record,
+        "matches": list(meetings.values())
+    }
@@ -0,0 +1,78 @@
+"""Idempotency-Key handling for write endpoints.
+
+The first request with a key stores its response in the same transaction
+as its writes; a retry with the same key and body gets that response back
+without running the endpoint again. Reusing a key with a different body
+is rejected. Two concurrent first attempts race on the primary key, and
+the loser replays the winner's response.
+"""
+import hashlib
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.base.models import IdempotencyKey
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def request_hash(payload) -> str:
+    body = json.dumps(jsonable_encoder(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def replay(db: Session, key: str, scope: str, fingerprint: str) -> Optional[JSONResponse]:
+    """The stored response for ``key``, or None if it has not been used.
+
+    Raises 422 when the key was used for a different request.
+    """
+    if len(key) > MAX_KEY_LENGTH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Idempotency-Key must be at most {MAX_KEY_LENGTH} characters"
+        )
+    stored = db.query(IdempotencyKey).filter(
+        IdempotencyKey.key == key,
+        IdempotencyKey.scope == scope
+    ).first()
+    if stored is None or stored.created_at < _expiry():
+        return None
+    if stored.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=422,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    return JSONResponse(
+        content=stored.response,
+        status_code=stored.status_code,
+        headers={REPLAYED_HEADER: "true"}
+    )
+
+
+def remember(db: Session, key: str, scope: str, fingerprint: str, response: dict, status_code: int = 200):
+    """Store ``response`` for ``key`` as part of the caller's transaction"""
+    db.merge(IdempotencyKey(
+        key=key,
+        scope=scope,
+        request_hash=fingerprint,
+        status_code=status_code,
+        response=jsonable_encoder(response),
+        created_at=datetime.utcnow()
+    ))
+
+
+def purge_expired(db: Session) -> int:
+    return db.query(IdempotencyKey)\
+        .filter(IdempotencyKey.created_at < _expiry())\
+        .delete(synchronize_session=False)
+
+
+def _expiry() -> datetime:
+    return datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
@@ -0,0 +1,420 @@
+import logging
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy import and_, insert, update, delete
+from sqlalchemy.orm import Session
+
+from app.models.base.models import League, Match, Hole, Player, PlayerScore, HoleScore
+from app.models import schemas
+from app.rules.formats import DEFAULT_FORMAT, player_handicap
+from app.rules.scoring import calculate_card_points
+from app.rules.validation import score_error, validate_player_scores
+
+CardKey = Tuple[int, int]  # (match_id, player_id)
+
+
+class VersionConflict(Exception):
+    """Matches whose scores changed after their version was read"""
+
+    def __init__(self, match_ids: List[int]):
+        self.match_ids = match_ids
+        super().__init__(f"Scores of matches {', '.join(map(str, match_ids))} changed concurrently")
+
+
+def claim_versions(db: Session, versions: Dict[int, int]):
+    """Bump the version of each match that still has the version read.
+
+    The conditional UPDATE is the only lock taken: a writer that read an
+    older version matches no row and gets VersionConflict, so concurrent
+    edits of a match are detected without holding locks across the read.
+    """
+    stale = []
+    for match_id in sorted(versions):
+        result = db.execute(
+            update(Match)
+                .where(Match.id == match_id, Match.version == versions[match_id])
+                .values(version=Match.version + 1),
+            execution_options={"synchronize_session": False}
+        )
+        if result.rowcount == 0:
+            stale.append(match_id)
+    if stale:
+        raise VersionConflict(stale)
+
+
+def _bump_card_versions(db: Session, score_ids):
+    if score_ids:
+        db.execute(
+            update(PlayerScore)
+                .where(PlayerScore.id.in_(score_ids))
+                .values(version=PlayerScore.version + 1),
+            execution_options={"synchronize_session": False}
+        )
+
+
+@dataclass
+class ScorePreload:
+    """Everything needed to validate and score a set of matches in memory"""
+    matches: Dict[int, Match]
+    holes: Dict[int, Hole]
+    rosters: Dict[int, Set[int]]
+    player_score_ids: Dict[CardKey, int]
+    card_teams: Dict[CardKey, Optional[int]]
+    cards: Dict[CardKey, Dict[int, int]]
+    handicaps: Dict[int, int]
+    scoring_format: str
+
+
+def card_rows(db: Session, league_id: int, match_ids: List[int]):
+    """(match_id, player_id, team_id, hole_number, strokes) of every stroke
+    recorded in the matches, read from hole_scores alone"""
+    if not match_ids:
+        return []
+    return db.query(
+            HoleScore.match_id,
+            HoleScore.player_id,
+            HoleScore.team_id,
+            HoleScore.hole_number,
+            HoleScore.strokes
+        )\
+        .filter(HoleScore.league_id == league_id, HoleScore.match_id.in_(match_ids))\
+        .all()
+
+
+def preload_week(db: Session, league: League, week_number: int) -> ScorePreload:
+    """Load a league week's matches, course holes, rosters and stored cards"""
+    logging.info("Preloading scores for league %s week %s", league.id, week_number)
+    matches = db.query(Match).filter(
+        Match.league_id == league.id,
+        Match.week_number == week_number
+    ).all()
+    holes = db.query(Hole).filter(Hole.course_id == league.course_id).all()
+    return _preload(db, matches, holes, league.scoring_format or DEFAULT_FORMAT)
+
+
+def _preload(db: Session, matches: List[Match], holes: List[Hole], scoring_format: str) -> ScorePreload:
+    course_par = sum(hole.par or 0 for hole in holes)
+    team_ids = {m.team1_id for m in matches} | {m.team2_id for m in matches}
+    rosters = {team_id: set() for team_id in team_ids}
+    handicaps = {}
+    if team_ids:
+        for player_id, team_id, league_average in db.query(
+                Player.id, Player.team_id, Player.league_average
+            ).filter(Player.team_id.in_(team_ids)):
+            rosters[team_id].add(player_id)
+            handicaps[player_id] = player_handicap(league_average, course_par)
+
+    player_score_ids = {}
+    card_teams = {}
+    cards = {}
+    if matches:
+        match_ids = [m.id for m in matches]
+        for score_id, match_id, player_id, team_id in db.query(
+                PlayerScore.id, PlayerScore.match_id, PlayerScore.player_id, PlayerScore.team_id
+            ).filter(PlayerScore.match_id.in_(match_ids)):
+            key = (match_id, player_id)
+            player_score_ids[key] = score_id
+            card_teams[key] = team_id
+            cards[key] = {}
+        for match_id, player_id, _, hole_number, strokes in card_rows(db, matches[0].league_id, match_ids):
+            cards.setdefault((match_id, player_id), {})[hole_number] = strokes
+
+    return ScorePreload(
+        matches={m.id: m for m in matches},
+        holes={h.id: h for h in holes},
+        rosters=rosters,
+        player_score_ids=player_score_ids,
+        card_teams=card_teams,
+        cards=cards,
+        handicaps=handicaps,
+        scoring_format=scoring_format
+    )
+
+
+def validate_week_scores(
+    preload: ScorePreload,
+    submission: schemas.WeekScoresCreate
+) -> Tuple[List[dict], Dict[CardKey, int]]:
+    """Validate a week's submission and resolve the team of every card"""
+    errors = []
+    team_ids = {}
+    seen_matches = set()
+    for match_scores in submission.matches:
+        match = preload.matches.get(match_scores.match_id)
+        if not match:
+            errors.append(score_error(
+                "match_not_in_week",
+                f"Match {match_scores.match_id} is not part of this week",
+                match_id=match_scores.match_id
+            ))
+            continue
+        if match.id in seen_matches:
+            errors.append(score_error(
+                "duplicate_match",
+                f"Match {match.id} submitted more than once",
+                match_id=match.id
+            ))
+            continue
+        seen_matches.add(match.id)
+
+        match_errors, match_team_ids = validate_player_scores(
+            match.id,
+            match.team1_id,
+            match.team2_id,
+            preload.rosters,
+            set(preload.holes),
+            match_scores.player_scores
+        )
+        errors.extend(match_errors)
+        team_ids.update({
+            (match.id, player_id): team_id for player_id, team_id in match_team_ids.items()
+        })
+    return errors, team_ids
+
+
+def save_week_scores(
+    db: Session,
+    preload: ScorePreload,
+    submission: schemas.WeekScoresCreate,
+    team_ids: Dict[CardKey, int]
+) -> Tuple[List[dict], int]:
+    """Write every submitted card in bulk and return each match's points.
+
+    A submitted card replaces the player's stored card for that match;
+    cards identical to the stored ones are not written. Also returns the
+    number of cards written. Matches with changed cards must still have
+    the version preloaded, or VersionConflict is raised. Nothing is
+    committed; the caller owns the transaction.
+    """
+    entries = []
+    for match_scores in submission.matches:
+        match = preload.matches[match_scores.match_id]
+        for player_score in match_scores.player_scores:
+            team_id = team_ids[(match.id, player_score.player_id)]
+            entries.append((match.id, player_score.player_id, team_id, player_score.scores))
+
+    changed = [entry for entry in entries if not _card_unchanged(preload, *entry)]
+    claim_versions(db, {
+        match_id: preload.matches[match_id].version for match_id, _, _, _ in changed
+    })
+    _write_cards(db, preload, changed)
+
+    for match_id, player_id, team_id, hole_scores in changed:
+        key = (match_id, player_id)
+        preload.card_teams[key] = team_id
+        preload.cards[key] = _card(preload, hole_scores)
+
+    results = [
+        _match_points(preload, preload.matches[match_scores.match_id])
+        for match_scores in submission.matches
+    ]
+    return results, len(changed)
+
+
+def save_match_scores(
+    db: Session,
+    match: Match,
+    player_scores: List[schemas.PlayerScoreCreate],
+    team_ids: Dict[int, int]
+) -> Tuple[List[int], int]:
+    """Upsert a match's submitted cards hole by hole.
+
+    Holes left out of a card keep their stored strokes. Returns the ids of
+    the submitted cards and the number of rows written, which is 0 when
+    every card matches what is stored. Anything written bumps the match
+    from the version it was loaded with, raising VersionConflict if it has
+    moved on. Nothing is committed.
+    """
+    match_id, league_id = match.id, match.league_id
+    player_ids = [player_score.player_id for player_score in player_scores]
+    score_ids = {}
+    card_teams = {}
+    cards: Dict[int, Dict[int, Tuple[int, int]]] = {}
+    for score_id, player_id, team_id, hole_score_id, hole_id, strokes in db.query(
+            PlayerScore.id,
+            PlayerScore.player_id,
+            PlayerScore.team_id,
+            HoleScore.id,
+            HoleScore.hole_id,
+            HoleScore.strokes
+        )\
+        .outerjoin(HoleScore, and_(
+            HoleScore.player_score_id == PlayerScore.id,
+            HoleScore.league_id == league_id
+        ))\
+        .filter(PlayerScore.match_id == match_id, PlayerScore.player_id.in_(player_ids)):
+        score_ids[player_id] = score_id
+        card_teams[player_id] = team_id
+        card = cards.setdefault(player_id, {})
+        if hole_score_id is not None:
+            card[hole_id] = (hole_score_id, strokes)
+
+    new_cards = [
+        {"match_id": match_id, "player_id": player_id, "team_id": team_ids[player_id]}
+        for player_id in player_ids if player_id not in score_ids
+    ]
+    moved_players = [
+        player_id for player_id in player_ids
+        if player_id in score_ids and card_teams[player_id] != team_ids[player_id]
+    ]
+    moved_cards = [
+        {"id": score_ids[player_id], "team_id": team_ids[player_id]} for player_id in moved_players
+    ]
+    new_holes = []
+    changed_holes = []
+    changed_players = {card["player_id"] for card in new_cards} | set(moved_players)
+    for player_score in player_scores:
+        card = cards.get(player_score.player_id, {})
+        for s in player_score.scores:
+            stored = card.get(s.hole_id)
+            if stored is None:
+                new_holes.append((player_score.player_id, s.hole_id, s.strokes))
+                changed_players.add(player_score.player_id)
+            elif stored[1] != s.strokes:
+                changed_holes.append({"id": stored[0], "league_id": league_id, "strokes": s.strokes})
+                changed_players.add(player_score.player_id)
+
+    written = len(new_cards) + len(moved_cards) + len(new_holes) + len(changed_holes)
+    if not written:
+        return [score_ids[player_id] for player_id in player_ids], 0
+    claim_versions(db, {match_id: match.version})
+
+    if moved_cards:
+        db.execute(update(PlayerScore), moved_cards)
+        for player_id in moved_players:
+            db.execute(
+                update(HoleScore)
+                    .where(HoleScore.league_id == league_id, HoleScore.player_score_id == score_ids[player_id])
+                    .values(team_id=team_ids[player_id]),
+                execution_options={"synchronize_session": False}
+            )
+    # New cards are not in score_ids yet and start at version 1
+    _bump_card_versions(db, [
+        score_ids[player_id] for player_id in changed_players if player_id in score_ids
+    ])
+    if new_cards:
+        db.execute(insert(PlayerScore), new_cards)
+        for score_id, player_id in db.query(PlayerScore.id, PlayerScore.player_id).filter(
+                PlayerScore.match_id == match_id,
+                PlayerScore.player_id.in_([card["player_id"] for card in new_cards])
+            ):
+            score_ids[player_id] = score_id
+
+    if changed_holes:
+        db.execute(update(HoleScore), changed_holes)
+    if new_holes:
+        hole_numbers = {hole.id: hole.number for hole in match.league.course.holes}
+        db.execute(insert(HoleScore), [
+            {
+                "league_id": league_id,
+                "player_score_id": score_ids[player_id],
+                "hole_id": hole_id,
+                "match_id": match_id,
+                "player_id": player_id,
+                "team_id": team_ids[player_id],
+                "hole_number": hole_numbers[hole_id],
+                "strokes": strokes
+            }
+            for player_id, hole_id, strokes in new_holes
+        ])
+
+    return [score_ids[player_id] for player_id in player_ids], written
+
+
+def _card(preload: ScorePreload, hole_scores) -> Dict[int, int]:
+    return {preload.holes[s.hole_id].number: s.strokes for s in hole_scores}
+
+
+def _card_unchanged(preload: ScorePreload, match_id: int, player_id: int, team_id: int, hole_scores) -> bool:
+    key = (match_id, player_id)
+    return key in preload.player_score_ids \
+        and preload.card_teams.get(key) == team_id \
+        and preload.cards.get(key) == _card(preload, hole_scores)
+
+
+def _write_cards(db: Session, preload: ScorePreload, entries):
+    new_cards = [
+        {"match_id": match_id, "player_id": player_id, "team_id": team_id}
+        for match_id, player_id, team_id, _ in entries
+        if (match_id, player_id) not in preload.player_score_ids
+    ]
+    existing_cards = [
+        {"id": preload.player_score_ids[(match_id, player_id)], "team_id": team_id}
+        for match_id, player_id, team_id, _ in entries
+        if (match_id, player_id) in preload.player_score_ids
+    ]
+
+    if existing_cards:
+        db.execute(update(PlayerScore), existing_cards)
+        _bump_card_versions(db, [card["id"] for card in existing_cards])
+    if new_cards:
+        db.execute(insert(PlayerScore), new_cards)
+        match_ids = {card["match_id"] for card in new_cards}
+        for score_id, match_id, player_id in db.query(
+                PlayerScore.id, PlayerScore.match_id, PlayerScore.player_id
+            ).filter(PlayerScore.match_id.in_(match_ids)):
+            preload.player_score_ids[(match_id, player_id)] = score_id
+
+    score_ids = [preload.player_score_ids[(match_id, player_id)] for match_id, player_id, _, _ in entries]
+    if not score_ids:
+        return
+
+    league_ids = {preload.matches[match_id].league_id for match_id, _, _, _ in entries}
+    db.execute(
+        delete(HoleScore).where(
+            HoleScore.league_id.in_(league_ids),
+            HoleScore.player_score_id.in_(score_ids)
+        ),
+        execution_options={"synchronize_session": False}
+    )
+    hole_rows = [
+        {
+            "league_id": preload.matches[match_id].league_id,
+            "player_score_id": preload.player_score_ids[(match_id, player_id)],
+            "hole_id": s.hole_id,
+            "match_id": match_id,
+            "player_id": player_id,
+            "team_id": team_id,
+            "hole_number": preload.holes[s.hole_id].number,
+            "strokes": s.strokes
+        }
+        for match_id, player_id, team_id, hole_scores in entries
+        for s in hole_scores
+    ]
+    if hole_rows:
+        db.execute(insert(HoleScore), hole_rows)
+
+
+def _match_points(preload: ScorePreload, match: Match) -> dict:
+    team_cards = {match.team1_id: [], match.team2_id: []}
+    team_handicaps = {match.team1_id: [], match.team2_id: []}
+    for (match_id, player_id), card in preload.cards.items():
+        if match_id != match.id:
+            continue
+        team_id = preload.card_teams.get((match_id, player_id))
+        if team_id is None:
+            team_id = next(
+                (t for t in team_cards if player_id in preload.rosters.get(t, set())),
+                None
+            )
+        if team_id in team_cards:
+            team_cards[team_id].append(card)
+            team_handicaps[team_id].append(preload.handicaps.get(player_id, 0))
+
+    points = calculate_card_points(
+        team_cards[match.team1_id],
+        team_cards[match.team2_id],
+        list(preload.holes.values()),
+        preload.scoring_format,
+        team_handicaps[match.team1_id],
+        team_handicaps[match.team2_id]
+    )
+    return {
+        "match_id": match.id,
+        "team1_id": match.team1_id,
+        "team2_id": match.team2_id,
+        "team1_points": points['team1_points'],
+        "team2_points": points['team2_points'],
+        "holes_scored": len(points['hole_results'])
+    }
@@ -1,28 +1,130 @@
 import logging
-from sqlalchemy.orm import Session
+from typing import List
 
-from app.models.base.models import Team, Player
+from sqlalchemy import insert, update, or_
+from sqlalchemy.orm import Session, selectinload
+
+from app.models.base.models import Team, Player, LeagueTeam
 from app.models import schemas
+from app.rules.summary import drop_week_summaries
+from app.search import search_index, player_doc, team_doc, PLAYER, TEAM
+
+ROSTER_FIELDS = ("first_name", "last_name", "league_average")
 
 
 def create_team(db: Session, team: schemas.TeamCreate):
-    logging.info("Creating team: %s", team.name)
-    db_team = Team(name=team.name)
-    db.add(db_team)
-    db.flush()
-
-    for player_data in team.players:
-        player = Player(
-            first_name=player_data.first_name,
-            last_name=player_data.last_name,
-            league_average=player_data.league_average,
-            team_id=db_team.id
-        )
-        db.add(player)
+    return create_teams(db, [team])[0]
+
+
+def create_teams(db: Session, teams: List[schemas.TeamCreate]):
+    """Create teams and their players with one insert per table"""
+    # insert() with an empty parameter list would add one all-defaults row
+    if not teams:
+        return []
+    logging.info("Creating %s teams", len(teams))
+    names = [team.name for team in teams]
+    duplicates = {name for name in names if names.count(name) > 1}
+    duplicates |= {
+        name for (name,) in db.query(Team.name).filter(Team.name.in_(names))
+    }
+    if duplicates:
+        raise ValueError(f"Team names already in use: {', '.join(sorted(duplicates))}")
+
+    db.execute(insert(Team), [{"name": name} for name in names])
+    # Names are unique, so they map the new rows back to their ids
+    team_ids = dict(db.query(Team.name, Team.id).filter(Team.name.in_(names)).all())
+
+    players = [
+        dict(player.model_dump(include=set(ROSTER_FIELDS)), team_id=team_ids[team.name])
+        for team in teams for player in team.players
+    ]
+    if players:
+        db.execute(insert(Player), players)
 
     db.commit()
-    db.refresh(db_team)
-    return db_team
+    created = db.query(Team)\
+        .options(selectinload(Team.players))\
+        .filter(Team.id.in_(list(team_ids.values())))\
+        .all()
+    search_index.upsert(
+        [team_doc(team) for team in created]
+        + [player_doc(player) for team in created for player in team.players]
+    )
+    by_name = {team.name: team for team in created}
+    return [by_name[name] for name in names]
+
+
+def update_roster(db: Session, team_id: int, players: List[schemas.PlayerBase], replace: bool):
+    """Bring a team's roster in line with ``players`` using set-based writes.
+
+    Players with an id are updated (and moved onto this team if needed),
+    players without one are inserted. With ``replace``, current players
+    missing from the list are taken off the team; their rows are kept so
+    past scorecards still resolve.
+    """
+    logging.info("Updating roster of team %s (replace=%s)", team_id, replace)
+    incoming_ids = [player.id for player in players if player.id is not None]
+    existing = {
+        row.id: row for row in db.query(
+            Player.id, Player.team_id, *[getattr(Player, field) for field in ROSTER_FIELDS]
+        ).filter(or_(Player.team_id == team_id, Player.id.in_(incoming_ids)))
+    }
+    unknown = set(incoming_ids) - set(existing)
+    if unknown:
+        raise ValueError(f"Players not found: {', '.join(map(str, sorted(unknown)))}")
+
+    updates = []
+    inserts = []
+    for player in players:
+        values = player.model_dump(include=set(ROSTER_FIELDS))
+        if player.id is None:
+            inserts.append(dict(values, team_id=team_id))
+            continue
+        current = existing[player.id]
+        if current.team_id != team_id or any(getattr(current, f) != v for f, v in values.items()):
+            updates.append(dict(values, id=player.id, team_id=team_id))
+
+    removed = []
+    if replace:
+        keep = set(incoming_ids)
+        removed = [pid for pid, row in existing.items() if row.team_id == team_id and pid not in keep]
+
+    if updates:
+        db.execute(update(Player), updates)
+    if inserts:
+        db.execute(insert(Player), inserts)
+    if removed:
+        db.execute(
+            update(Player).where(Player.id.in_(removed)).values(team_id=None),
+            execution_options={"synchronize_session": False}
+        )
+    # Handicaps come from league averages and feed the stored net rounds
+    rehandicapped = [u["id"] for u in updates if existing[u["id"]].league_average != u["league_average"]]
+    if rehandicapped:
+        teams = {team_id} | {existing[pid].team_id for pid in rehandicapped if existing[pid].team_id}
+        drop_week_summaries(db, team_league_ids(db, list(teams)))
+    db.commit()
+    roster = db.query(Player).filter(Player.team_id == team_id).order_by(Player.id).all()
+    search_index.upsert([player_doc(player) for player in roster])
+
+    return {
+        "team_id": team_id,
+        "inserted": len(inserts),
+        "updated": len(updates),
+        "removed": len(removed),
+        "moved_from_team_ids": sorted({
+            existing[u["id"]].team_id for u in updates
+            if existing[u["id"]].team_id not in (None, team_id)
+        }),
+        "players": roster
+    }
+
+
+def team_league_ids(db: Session, team_ids: List[int]) -> List[int]:
+    return [
+        league_id for (league_id,) in db.query(LeagueTeam.league_id)
+            .filter(LeagueTeam.team_id.in_(team_ids)).distinct()
+    ]
 
 
 def get_teams(db: Session):
@@ -32,10 +134,10 @@ def get_teams(db: Session):
 
 def get_team(db: Session, team_id: int):
     logging.info("Fetching team with id: %s", team_id)
-    db_team = db.query(Team).filter(Team.id == team_id).first()
-    if db_team:
-        db_team.players = db.query(Player).filter(Player.team_id == team_id).all()
-    return db_team
+    return db.query(Team)\
+        .options(selectinload(Team.players))\
+        .filter(Team.id == team_id)\
+        .first()
 
 
 def delete_team(db: Session, team_id: int):
@@ -45,14 +147,19 @@ def delete_team(db: Session, team_id: int):
         logging.warning("Team with id %s not found", team_id)
         return None
 
+    player_ids = [pid for (pid,) in db.query(Player.id).filter(Player.team_id == team_id)]
     db.query(Player).filter(Player.team_id == team_id).delete()
     db.delete(db_team)
     db.commit()
+    search_index.remove(PLAYER, player_ids)
+    search_index.remove(TEAM, [team_id])
     return db_team
 
 
 def delete_unassigned_players(db: Session):
     logging.info("Deleting unassigned players")
+    player_ids = [pid for (pid,) in db.query(Player.id).filter(Player.team_id.is_(None))]
     result = db.query(Player).filter(Player.team_id.is_(None)).delete()
     db.commit()
+    search_index.remove(PLAYER, player_ids)
     return result
@@ -1,10 +1,19 @@
-from typing import Any
+from typing import Any, List, Optional
+import itertools
+import logging
+import math
+import threading
+import time
 from mysql.connector import pooling
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, Insert, Update, Delete
+from sqlalchemy.engine import Engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import QueuePool
 from dotenv import load_dotenv
 import os
+from app.config import settings
+from app.diagnostics import slow_queries
 
 try:
     import pymysql
@@ -21,13 +30,152 @@ SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL")
 if not SQLALCHEMY_DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable is not set")
 
+
+
+class PoolWait:
+    """Moving average of how long checkouts wait for a pooled connection.
+
+    The average decays with ``half_life`` seconds of inactivity, so it
+    recovers once load is shed even if few checkouts happen meanwhile.
+    """
+
+    def __init__(self, alpha: float = 0.2, half_life: float = 5.0):
+        self.alpha = alpha
+        self.half_life = half_life
+        self._average = 0.0
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._average = self._decayed(time.monotonic())
+            self._average += self.alpha * (seconds - self._average)
+            self._updated_at = time.monotonic()
+
+    def current(self) -> float:
+        """Average wait in seconds"""
+        with self._lock:
+            return self._decayed(time.monotonic())
+
+    def _decayed(self, now: float) -> float:
+        return self._average * math.pow(0.5, (now - self._updated_at) / self.half_life)
+
+
+pool_wait = PoolWait()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records checkout wait times in ``pool_wait``"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait.record(time.perf_counter() - start)
+
+
+# Per engine; /health/ready reports a worker whose pool is exhausted
+POOL_SIZE = 5
+MAX_OVERFLOW = 10
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
+    poolclass=TimedQueuePool,
     pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10
+    pool_size=POOL_SIZE,
+    max_overflow=MAX_OVERFLOW
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+class ReplicaSet:
+    """Round-robin over read replicas, skipping ones that fail a health check.
+
+    A background thread pings every replica each ``health_check_seconds``
+    so requests never wait on a check; until the first round, replicas are
+    assumed healthy.
+    """
+
+    def __init__(self, urls: List[str], health_check_seconds: float):
+        self.engines = [
+            create_engine(url, pool_pre_ping=True, pool_size=POOL_SIZE, max_overflow=MAX_OVERFLOW)
+            for url in urls
+        ]
+        self.health_check_seconds = health_check_seconds
+        self._healthy = {e: True for e in self.engines}
+        self._counter = itertools.count()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if not self.engines or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-health", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def choose(self) -> Optional[Engine]:
+        for _ in range(len(self.engines)):
+            replica = self.engines[next(self._counter) % len(self.engines)]
+            if self._healthy[replica]:
+                return replica
+        return None
+
+    def _run(self):
+        while True:
+            for replica in self.engines:
+                self._healthy[replica] = self._check(replica)
+            if self._stop.wait(self.health_check_seconds):
+                return
+
+    @staticmethod
+    def _check(replica: Engine) -> bool:
+        try:
+            with replica.connect() as connection:
+                connection.exec_driver_sql("SELECT 1")
+            return True
+        except Exception as e:
+            logging.warning("Replica %s failed health check: %s", replica.url.host, e)
+            return False
+
+
+replicas = ReplicaSet(
+    [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()],
+    settings.REPLICA_HEALTH_CHECK_SECONDS
+)
+
+slow_queries.install([engine] + replicas.engines, settings.SLOW_QUERY_THRESHOLD_MS)
+
+
+class RoutingSession(Session):
+    """Session that serves read-only requests from a replica.
+
+    Sessions opened with ``info={"read_only": True}`` send SELECTs to a
+    replica until the first write, after which every statement for the rest
+    of the session (i.e. the request) goes to the primary so the request
+    reads its own writes. The replica is chosen once per session, so all
+    reads of a request see the same replication lag.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if not self.info.get("read_only") or self.info.get("use_primary"):
+            return engine
+        if self._flushing or isinstance(clause, (Insert, Update, Delete)) \
+                or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["use_primary"] = True
+            return engine
+        if "replica" not in self.info:
+            self.info["replica"] = replicas.choose() or engine
+        return self.info["replica"]
+
+
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
@@ -39,6 +187,14 @@ def get_db():
     finally:
         db.close()
 
+def get_read_db():
+    """Session for read-only routes; reads go to a replica when one is configured"""
+    db = SessionLocal(info={"read_only": True})
+    try:
+        yield db
+    finally:
+        db.close()
+
 class Database:
     def __init__(self):
         self._db_config = {
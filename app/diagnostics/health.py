@@ -0,0 +1,74 @@
+"""Dependency checks behind the health endpoints.
+
+Everything here is cheap enough for a load balancer to poll every second:
+pool numbers are read from the pool's counters, and the database ping is
+bounded by a timeout, shared by concurrent callers and reused for
+PROBE_MAX_AGE seconds so a fleet of checkers adds at most one query per
+second per worker.
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Optional
+
+PROBE_MAX_AGE = 1.0
+
+
+def pool_stats(pool, max_overflow: int) -> dict:
+    """Counters of a SQLAlchemy QueuePool; saturated when every connection
+    it may open is checked out"""
+    size = pool.size()
+    checked_out = pool.checkedout()
+    return {
+        "size": size,
+        "checked_in": pool.checkedin(),
+        "checked_out": checked_out,
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": max_overflow,
+        "saturated": checked_out >= size + max_overflow
+    }
+
+
+class DatabaseProbe:
+    """``SELECT 1`` on a fresh checkout, answered within ``timeout`` seconds.
+
+    A ping that overruns keeps running on the probe's own thread and later
+    callers wait on it instead of starting another, so a hung database
+    never ties up more than one connection and one thread.
+    """
+
+    def __init__(self, engine, timeout: float, max_age: float = PROBE_MAX_AGE):
+        self.engine = engine
+        self.timeout = timeout
+        self.max_age = max_age
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="health-db")
+        self._lock = threading.Lock()
+        self._pending = None
+        self._result: Optional[dict] = None
+        self._checked_at = 0.0
+
+    def check(self) -> dict:
+        with self._lock:
+            if self._result is not None and time.monotonic() - self._checked_at < self.max_age:
+                return self._result
+            if self._pending is None or self._pending.done():
+                self._pending = self._executor.submit(self._ping)
+            pending = self._pending
+
+        try:
+            result = {"ok": True, "latency_ms": round(pending.result(timeout=self.timeout) * 1000, 1)}
+        except FutureTimeoutError:
+            result = {"ok": False, "error": f"No response within {self.timeout * 1000:.0f} ms"}
+        except Exception as e:
+            result = {"ok": False, "error": str(e)}
+
+        with self._lock:
+            self._result = result
+            self._checked_at = time.monotonic()
+        return result
+
+    def _ping(self) -> float:
+        start = time.perf_counter()
+        with self.engine.connect() as connection:
+            connection.exec_driver_sql("SELECT 1")
+        return time.perf_counter() - start
@@ -0,0 +1,139 @@
+"""Per-request cProfile captures and a sampling profiler.
+
+Captured profiles are written to PROFILE_DIR as pstats files and can be
+read back as text reports. The sampling profiler walks every thread's stack
+at a fixed interval and counts the stacks in folded form ("a;b;c count"),
+which flamegraph.pl and speedscope read directly. Neither is installed
+unless enabled in the settings.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import uuid
+from collections import Counter
+from typing import Optional
+
+from app.config import settings
+
+REPORT_LINES = 60
+
+
+def save_profile(profile: cProfile.Profile) -> str:
+    os.makedirs(settings.PROFILE_DIR, exist_ok=True)
+    profile_id = uuid.uuid4().hex
+    profile.dump_stats(_profile_path(profile_id))
+    prune_profiles(settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+    return profile_id
+
+
+def prune_profiles(directory: str, keep: int):
+    """Delete all but the ``keep`` most recent profiles"""
+    paths = [
+        os.path.join(directory, name) for name in os.listdir(directory) if name.endswith(".pstats")
+    ]
+    paths.sort(key=os.path.getmtime, reverse=True)
+    for path in paths[keep:]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+def profile_report(profile_id: str) -> Optional[str]:
+    if not profile_id.isalnum():
+        return None
+    path = _profile_path(profile_id)
+    if not os.path.exists(path):
+        return None
+    return render_report(pstats.Stats(path))
+
+
+def render_report(stats: pstats.Stats) -> str:
+    output = io.StringIO()
+    stats.stream = output
+    stats.sort_stats("cumulative").print_stats(REPORT_LINES)
+    return output.getvalue()
+
+
+def _profile_path(profile_id: str) -> str:
+    return os.path.join(settings.PROFILE_DIR, f"{profile_id}.pstats")
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """Counts the stacks of all threads every ``interval`` seconds"""
+
+    def __init__(self, interval: float, max_depth: int = 64):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = 0
+        self._stacks: Counter = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def reset(self):
+        with self._lock:
+            self._stacks.clear()
+            self.samples = 0
+
+    def folded(self) -> str:
+        with self._lock:
+            return "".join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def _run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.sample(skip=own)
+
+    def sample(self, skip: Optional[int] = None):
+        stacks = []
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip:
+                continue
+            names = []
+            while frame is not None and len(names) < self.max_depth:
+                names.append(_frame_name(frame))
+                frame = frame.f_back
+            # Idle threads waiting on locks or sockets add no information
+            if names and not names[0].startswith("threading:"):
+                stacks.append(";".join(reversed(names)))
+        with self._lock:
+            self._stacks.update(stacks)
+            self.samples += 1
+
+
+sampler: Optional[SamplingProfiler] = None
+
+
+def start_sampler():
+    global sampler
+    if settings.SAMPLING_PROFILER_INTERVAL_MS > 0 and sampler is None:
+        sampler = SamplingProfiler(settings.SAMPLING_PROFILER_INTERVAL_MS / 1000)
+        sampler.start()
+
+
+def stop_sampler():
+    global sampler
+    if sampler is not None:
+        sampler.stop()
+        sampler = None
@@ -0,0 +1,191 @@
+"""Slow query log with EXPLAIN capture.
+
+Engine events time every statement; those over SLOW_QUERY_THRESHOLD_MS are
+grouped by fingerprint (the statement with literals and IN lists collapsed)
+along with the routes and call sites that issued them and the shape of
+their parameters. The first slow execution of each fingerprint is
+EXPLAINed on a background thread, so the plan is at hand when it shows up
+in the top-N.
+"""
+import logging
+import os
+import re
+import threading
+import time
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar
+from datetime import datetime
+from hashlib import sha1
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Distinct statements kept; the ones with the least total time are evicted
+MAX_FINGERPRINTS = 500
+MAX_DISTINCT_SOURCES = 20
+EXPLAINABLE = ("select", "update", "delete", "insert")
+
+# "GET /leagues/{id}/matches" of the request being served, if any
+current_route: ContextVar[Optional[str]] = ContextVar("current_route", default=None)
+
+_APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_SKIPPED_DIRS = (os.path.dirname(os.path.abspath(__file__)),)
+_SKIPPED_FILES = (os.path.join(_APP_DIR, "database.py"),)
+
+
+def fingerprint(statement: str) -> str:
+    normalized = re.sub(r"\s+", " ", statement).strip()
+    normalized = re.sub(r"'(?:[^'\\]|\\.)*'", "?", normalized)
+    normalized = re.sub(r"\b\d+(?:\.\d+)?\b", "?", normalized)
+    normalized = re.sub(r"%\([^)]+\)s|%s", "?", normalized)
+    normalized = re.sub(r"\(\s*\?(?:\s*,\s*\?)*\s*\)", "(...)", normalized)
+    return normalized
+
+
+def parameters_shape(parameters, executemany: bool) -> str:
+    if executemany:
+        rows = list(parameters or [])
+        return f"{len(rows)} rows of {parameters_shape(rows[0], False) if rows else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in parameters) + ")"
+    return type(parameters).__name__
+
+
+def normalize_route(method: str, path: str) -> str:
+    path = re.sub(r"/\d+(?=/|$)", "/{id}", path)
+    return f"{method} {path}"
+
+
+def call_site() -> Optional[str]:
+    """Innermost application frame outside the database layer"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if not filename.startswith(_APP_DIR) or filename in _SKIPPED_FILES \
+                or filename.startswith(_SKIPPED_DIRS):
+            continue
+        return f"{os.path.relpath(filename, os.path.dirname(_APP_DIR))}:{frame.lineno} in {frame.name}"
+    return None
+
+
+class SlowQueryLog:
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self._entries: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        self._explainer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slow-query-explain")
+        self._local = threading.local()
+
+    def install(self, engine: Engine):
+        event.listen(engine, "before_cursor_execute", self._before)
+        event.listen(engine, "after_cursor_execute", self._after)
+
+    def top(self, limit: int) -> List[dict]:
+        with self._lock:
+            entries = sorted(self._entries.values(), key=lambda e: e["total_ms"], reverse=True)
+            return [self._export(entry) for entry in entries[:limit]]
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+    # The start time lives on the execution context: after_cursor_execute
+    # never fires for a statement that raises, so anything kept on the
+    # connection would leak for the life of the pooled connection
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        context._slow_query_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        started_at = getattr(context, "_slow_query_start", None)
+        if started_at is None:
+            return
+        elapsed = time.perf_counter() - started_at
+        if elapsed < self.threshold or getattr(self._local, "explaining", False):
+            return
+        self.record(conn.engine, statement, parameters, executemany, elapsed)
+
+    def record(self, engine, statement, parameters, executemany, elapsed):
+        key = sha1(fingerprint(statement).encode()).hexdigest()[:16]
+        elapsed_ms = elapsed * 1000
+        now = datetime.utcnow()
+        route, site = current_route.get(), call_site()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._evict()
+                entry = self._entries[key] = {
+                    "fingerprint": key,
+                    "statement": fingerprint(statement),
+                    "count": 0,
+                    "total_ms": 0.0,
+                    "max_ms": 0.0,
+                    "parameters": None,
+                    "routes": Counter(),
+                    "call_sites": Counter(),
+                    "explain": None,
+                    "first_seen": now,
+                    "last_seen": now
+                }
+                explain = not executemany and statement.lstrip().lower().startswith(EXPLAINABLE)
+            else:
+                explain = False
+            entry["count"] += 1
+            entry["total_ms"] += elapsed_ms
+            entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+            entry["parameters"] = parameters_shape(parameters, executemany)
+            entry["last_seen"] = now
+            _count(entry["routes"], route)
+            _count(entry["call_sites"], site)
+
+        logging.warning("Slow query (%.1f ms) %s", elapsed_ms, entry["statement"][:200])
+        if explain:
+            self._explainer.submit(self._explain, engine, key, statement, parameters)
+
+    def _explain(self, engine, key, statement, parameters):
+        self._local.explaining = True
+        try:
+            with engine.connect() as connection:
+                rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters)
+                plan = [dict(row._mapping) for row in rows]
+        except Exception as e:
+            plan = [{"error": str(e)}]
+        finally:
+            self._local.explaining = False
+        with self._lock:
+            if key in self._entries:
+                self._entries[key]["explain"] = plan
+
+    def _evict(self):
+        if len(self._entries) >= MAX_FINGERPRINTS:
+            del self._entries[min(self._entries, key=lambda k: self._entries[k]["total_ms"])]
+
+    @staticmethod
+    def _export(entry: dict) -> dict:
+        return dict(
+            entry,
+            mean_ms=entry["total_ms"] / entry["count"],
+            routes=dict(entry["routes"].most_common()),
+            call_sites=dict(entry["call_sites"].most_common())
+        )
+
+
+def _count(counter: Counter, value: Optional[str]):
+    if value is not None and (value in counter or len(counter) < MAX_DISTINCT_SOURCES):
+        counter[value] += 1
+
+
+slow_query_log: Optional[SlowQueryLog] = None
+
+
+def install(engines: List[Engine], threshold_ms: float):
+    """Attach the slow query log to ``engines``; a threshold of 0 disables it"""
+    global slow_query_log
+    if threshold_ms <= 0:
+        return
+    slow_query_log = SlowQueryLog(threshold_ms / 1000)
+    for engine in engines:
+        slow_query_log.install(engine)
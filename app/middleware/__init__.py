@@ -0,0 +1,2 @@
+from .coalescing import CoalescingMiddleware
+from .limits import LoadSheddingMiddleware, InMemoryBuckets, RedisBuckets, CRITICAL, NORMAL, LOW
@@ -0,0 +1,89 @@
+"""Single-flight coalescing of identical concurrent GET requests.
+
+When a GET arrives while an identical one (same route key) is still being
+served, it waits for that response and replays it instead of running the
+same queries again. Only routes registered with the middleware are
+coalesced; each may supply a key function to decide what "identical" means.
+"""
+import asyncio
+import re
+from typing import Callable, Dict, Hashable, Optional
+from urllib.parse import parse_qsl
+
+# Called with the path parameters and parsed query of a request; returning
+# None opts that request out of coalescing. Runs on the event loop, so it
+# must not block.
+KeyFunc = Callable[[Dict[str, str], Dict[str, str]], Optional[Hashable]]
+
+
+def default_key(path_params: Dict[str, str], query: Dict[str, str]) -> Hashable:
+    return tuple(sorted(path_params.items())), tuple(sorted(query.items()))
+
+
+def compile_route(template: str):
+    pattern = re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", template.rstrip("/"))
+    return re.compile(f"^{pattern}/?$")
+
+
+class LeaderCancelled(Exception):
+    """The request being waited on was cancelled before it responded"""
+
+
+class CoalescingMiddleware:
+    def __init__(self, app, routes: Dict[str, Optional[KeyFunc]]):
+        self.app = app
+        self.routes = [
+            (template, compile_route(template), key or default_key)
+            for template, key in routes.items()
+        ]
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    async def __call__(self, scope, receive, send):
+        key = self._key(scope) if scope["type"] == "http" and scope["method"] == "GET" else None
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        leader = self._inflight.get(key)
+        if leader is not None:
+            try:
+                messages = await asyncio.shield(leader)
+            except Exception:
+                # The first request failed; serve this one on its own
+                await self.app(scope, receive, send)
+                return
+            for message in messages:
+                await send(message)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        messages = []
+
+        async def capture(message):
+            messages.append(message)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, capture)
+        except BaseException as e:
+            # Resolve on every path, cancellation included, or followers
+            # wait forever; they get an ordinary error and serve themselves
+            future.set_exception(e if isinstance(e, Exception) else LeaderCancelled())
+            # Mark retrieved so an unawaited failure is not logged twice
+            future.exception()
+            raise
+        else:
+            future.set_result(messages)
+        finally:
+            del self._inflight[key]
+
+    def _key(self, scope) -> Optional[Hashable]:
+        path = scope["path"]
+        for template, pattern, key_func in self.routes:
+            match = pattern.match(path)
+            if match:
+                query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+                key = key_func(match.groupdict(), query)
+                return None if key is None else (template, key)
+        return None
@@ -0,0 +1,215 @@
+"""Token-bucket rate limiting and priority load shedding.
+
+Every request is classified as critical (score submissions), normal or low
+(list views and other expensive, low-value reads). Each client has its own
+token bucket, and a separate one for critical requests; non-critical
+requests also draw from a global bucket. When the
+database pool is congested, measured by the average connection checkout
+wait, low priority requests are shed first, then normal ones. Critical
+requests are never shed, so scorecards keep getting through a read storm.
+
+Clients are identified by their address. X-Forwarded-For is only believed
+when the connection comes from a trusted proxy, and then only up to the
+right-most hop not added by a trusted proxy, since anything left of that
+is whatever the client chose to send.
+"""
+import ipaddress
+import json
+import logging
+import math
+import threading
+import time
+from typing import Callable, Dict, Iterable, Tuple
+
+from .coalescing import compile_route
+
+CRITICAL = "critical"
+NORMAL = "normal"
+LOW = "low"
+
+
+class InMemoryBuckets:
+    """Token buckets local to this process.
+
+    A bucket that has refilled is the same as no bucket, so buckets are
+    dropped once full; every ``prune_seconds`` the idle ones are swept.
+    """
+
+    def __init__(self, prune_seconds: float = 60.0):
+        self.prune_seconds = prune_seconds
+        # key -> (tokens, updated_at, full_at)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._pruned_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until a token is available)"""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at, _ = self._buckets.get(key, (burst, now, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now, now + (burst - tokens) / rate)
+            if now - self._pruned_at >= self.prune_seconds:
+                self._prune(now)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _prune(self, now: float):
+        self._buckets = {key: b for key, b in self._buckets.items() if b[2] > now}
+        self._pruned_at = now
+
+
+TAKE_TOKEN = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + (now - updated_at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBuckets:
+    """Token buckets shared by every worker through Redis"""
+
+    def __init__(self, url: str):
+        import redis.asyncio
+        self._redis = redis.asyncio.Redis.from_url(url)
+        self._take = self._redis.register_script(TAKE_TOKEN)
+
+    async def take(self, key: str, rate: float, burst: int) -> Tuple[bool, float]:
+        try:
+            allowed, tokens = await self._take(keys=[f"ratelimit:{key}"], args=[rate, burst])
+        except Exception as e:
+            # Fail open: losing rate limiting beats failing every request
+            logging.warning("Rate limit check failed, allowing request: %s", e)
+            return True, 0.0
+        return bool(allowed), 0.0 if allowed else (1 - float(tokens)) / rate
+
+
+class LoadSheddingMiddleware:
+    def __init__(
+        self,
+        app,
+        buckets,
+        load: Callable[[], float],
+        priorities: Dict[Tuple[str, str], str],
+        client_rate: float,
+        client_burst: int,
+        global_rate: float,
+        global_burst: int,
+        shed_low_wait: float,
+        shed_normal_wait: float,
+        retry_after: int,
+        trusted_proxies: Iterable[str] = ()
+    ):
+        """``load`` returns the current pool wait in seconds; ``priorities``
+        maps (method, route template) to a priority, anything else is normal.
+        ``trusted_proxies`` are addresses or networks whose X-Forwarded-For
+        headers are honoured.
+        """
+        self.app = app
+        self.buckets = buckets
+        self.load = load
+        self.priorities = [
+            (method, compile_route(template), priority)
+            for (method, template), priority in priorities.items()
+        ]
+        self.client_rate = client_rate
+        self.client_burst = client_burst
+        self.global_rate = global_rate
+        self.global_burst = global_burst
+        self.shed_low_wait = shed_low_wait
+        self.shed_normal_wait = shed_normal_wait
+        self.retry_after = retry_after
+        self.trusted_proxies = [ipaddress.ip_network(p, strict=False) for p in trusted_proxies]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        priority = self.priority(scope["method"], scope["path"])
+        if self._should_shed(priority):
+            await _reject(send, 503, "Server is busy, please retry shortly", self.retry_after)
+            return
+
+        # Critical requests get a bucket of their own, so a client's reads
+        # (or others' behind the same NAT address) never crowd out its writes
+        bucket = "critical" if priority == CRITICAL else "client"
+        allowed, wait = await self.buckets.take(
+            f"{bucket}:{self.client_id(scope)}", self.client_rate, self.client_burst
+        )
+        if allowed and priority != CRITICAL:
+            allowed, wait = await self.buckets.take("global", self.global_rate, self.global_burst)
+        if not allowed:
+            await _reject(send, 429, "Too many requests", max(1, math.ceil(wait)))
+            return
+
+        await self.app(scope, receive, send)
+
+    def priority(self, method: str, path: str) -> str:
+        for route_method, pattern, priority in self.priorities:
+            if route_method == method and pattern.match(path):
+                return priority
+        return NORMAL
+
+    def client_id(self, scope) -> str:
+        client = scope.get("client")
+        peer = client[0] if client else "unknown"
+        if not self._trusted(peer):
+            return peer
+
+        hops = []
+        for name, value in scope.get("headers", []):
+            if name == b"x-forwarded-for":
+                hops.extend(h.strip() for h in value.decode("latin-1").split(","))
+        hops = [h for h in hops if h]
+        for hop in reversed(hops):
+            if not self._trusted(hop):
+                return hop
+        # Every hop is one of our proxies; the left-most is the closest we get
+        return hops[0] if hops else peer
+
+    def _trusted(self, address: str) -> bool:
+        try:
+            ip = ipaddress.ip_address(address)
+        except ValueError:
+            return False
+        return any(ip in network for network in self.trusted_proxies)
+
+    def _should_shed(self, priority: str) -> bool:
+        if priority == CRITICAL:
+            return False
+        wait = self.load()
+        threshold = self.shed_low_wait if priority == LOW else self.shed_normal_wait
+        return wait >= threshold
+
+
+async def _reject(send, status: int, detail: str, retry_after: int):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(retry_after).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,95 @@
+"""On-demand cProfile capture of single requests.
+
+An admin request with ``?profile=1`` gets the profile report back instead
+of the normal response; with an ``X-Profile: 1`` header the normal response
+is returned and the profile is stored, its id in ``X-Profile-Id``. Only
+installed when PROFILING_ENABLED is set.
+
+cProfile follows the event loop thread: an async route is captured along
+with whatever other requests run on the loop meanwhile, and sync routes,
+which run in the threadpool, show as the wait. A profiler is per thread,
+so one capture runs at a time; a second gets 409 until the first is done.
+"""
+import asyncio
+import cProfile
+import json
+from urllib.parse import parse_qsl
+
+from app.diagnostics.profiling import save_profile, profile_report
+from app.security import is_admin_token
+
+
+class ProfilingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self._capture = asyncio.Lock()
+
+    async def __call__(self, scope, receive, send):
+        mode = self._mode(scope) if scope["type"] == "http" else None
+        if mode is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The response is held back until the profile ends, so its id can
+        # go in the headers or the report can replace it
+        messages = []
+
+        async def buffer(message):
+            messages.append(message)
+
+        if self._capture.locked():
+            await _busy(send)
+            return
+        async with self._capture:
+            profile = cProfile.Profile()
+            profile.enable()
+            try:
+                await self.app(scope, receive, buffer)
+            finally:
+                profile.disable()
+        profile_id = save_profile(profile)
+
+        if mode == "store":
+            for message in messages:
+                if message["type"] == "http.response.start":
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"x-profile-id", profile_id.encode())
+                    ])
+                await send(message)
+            return
+
+        body = profile_report(profile_id).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"content-length", str(len(body)).encode()),
+                (b"x-profile-id", profile_id.encode())
+            ]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+    def _mode(self, scope):
+        headers = dict(scope.get("headers", []))
+        if not is_admin_token(headers.get(b"x-admin-token", b"").decode("latin-1")):
+            return None
+        if headers.get(b"x-profile") == b"1":
+            return "store"
+        query = dict(parse_qsl(scope.get("query_string", b"").decode("latin-1")))
+        if query.get("profile") == "1":
+            return "report"
+        return None
+
+
+async def _busy(send):
+    body = json.dumps({"detail": "Another profile capture is running"}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": 409,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode())
+        ]
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,18 @@
+from app.diagnostics.slow_queries import current_route, normalize_route
+
+
+class QueryContextMiddleware:
+    """Tags statements run while serving a request with its route"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = current_route.set(normalize_route(scope["method"], scope["path"]))
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_route.reset(token)
@@ -6,4 +6,8 @@ Base = declarative_base()
 from .team import *
 from .course import *
 from .league import *
-from .match import *
\ No newline at end of file
+from .match import *
+from .task import *
+from .head_to_head import *
+from .summary import *
+from .idempotency import *
\ No newline at end of file
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from . import Base
 
@@ -13,6 +13,10 @@ class Course(Base):
     holes = relationship("Hole", back_populates="course")
     leagues = relationship("League", back_populates="course")
 
+    __table_args__ = (
+        Index("ft_courses_name", "name", mysql_prefix="FULLTEXT"),
+    )
+
 class Hole(Base):
     __tablename__ = "holes"
 
@@ -23,4 +27,8 @@ class Hole(Base):
     handicap = Column(Integer)
     
     course = relationship("Course", back_populates="holes")
-    scores = relationship("HoleScore", back_populates="hole")
\ No newline at end of file
+    scores = relationship(
+        "HoleScore",
+        primaryjoin="Hole.id == foreign(HoleScore.hole_id)",
+        back_populates="hole"
+    )
\ No newline at end of file
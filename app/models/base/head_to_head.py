@@ -0,0 +1,63 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from . import Base
+
+class TeamHeadToHead(Base):
+    """Record of ``team_id`` against ``opponent_id``; stored once per pair
+    with the lower team id first"""
+    __tablename__ = "team_head_to_head"
+
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    opponent_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    matches_played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    halves = Column(Integer, nullable=False, default=0)
+    points_for = Column(Float, nullable=False, default=0)
+    points_against = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class PlayerHeadToHead(Base):
+    """Hole-by-hole record of ``player_id`` against ``opponent_id`` in
+    matches where they played on opposing teams; lower player id first"""
+    __tablename__ = "player_head_to_head"
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    opponent_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    matches_played = Column(Integer, nullable=False, default=0)
+    holes_won = Column(Integer, nullable=False, default=0)
+    holes_lost = Column(Integer, nullable=False, default=0)
+    holes_halved = Column(Integer, nullable=False, default=0)
+    strokes = Column(Integer, nullable=False, default=0)
+    opponent_strokes = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class TeamHeadToHeadArchived(Base):
+    """Part of a team pair's record from archived leagues, whose matches
+    are no longer in the database; added into TeamHeadToHead on refresh"""
+    __tablename__ = "team_head_to_head_archived"
+
+    team_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    opponent_id = Column(Integer, ForeignKey("teams.id"), primary_key=True)
+    matches_played = Column(Integer, nullable=False, default=0)
+    wins = Column(Integer, nullable=False, default=0)
+    losses = Column(Integer, nullable=False, default=0)
+    halves = Column(Integer, nullable=False, default=0)
+    points_for = Column(Float, nullable=False, default=0)
+    points_against = Column(Float, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+class PlayerHeadToHeadArchived(Base):
+    """Part of a player pair's record from archived leagues; added into
+    PlayerHeadToHead on refresh"""
+    __tablename__ = "player_head_to_head_archived"
+
+    player_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    opponent_id = Column(Integer, ForeignKey("players.id"), primary_key=True)
+    matches_played = Column(Integer, nullable=False, default=0)
+    holes_won = Column(Integer, nullable=False, default=0)
+    holes_lost = Column(Integer, nullable=False, default=0)
+    holes_halved = Column(Integer, nullable=False, default=0)
+    strokes = Column(Integer, nullable=False, default=0)
+    opponent_strokes = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.utcnow)
@@ -0,0 +1,14 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from . import Base
+
+class IdempotencyKey(Base):
+    """Response stored for a client's ``Idempotency-Key`` on a write endpoint"""
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(255), primary_key=True)
+    scope = Column(String(100), primary_key=True)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=False)
+    response = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -10,7 +10,10 @@ class League(Base):
     name = Column(String(100))
     course_id = Column(Integer, ForeignKey("courses.id"))
     start_date = Column(Date)
+    scoring_format = Column(String(30), nullable=False, default="best_ball_aggregate")
     created_at = Column(DateTime, default=datetime.utcnow)
+    archived_at = Column(DateTime, nullable=True)
+    snapshot_path = Column(String(255), nullable=True)
     
     teams = relationship("Team", secondary="league_teams", back_populates="leagues")
     course = relationship("Course", back_populates="leagues")
@@ -21,6 +24,9 @@ class League(Base):
         """Dynamically calculate number of weeks based on matches"""
         if self.id is None:
             return 0
+        if self.snapshot_path:
+            from app.archive.snapshot import open_snapshot
+            return open_snapshot(self.snapshot_path).number_of_weeks
         session = object_session(self)
         if session:
             from .match import Match
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, DateTime, Date, ForeignKey, func
+from sqlalchemy import Column, Integer, Float, DateTime, Date, ForeignKey, Index, func
 from sqlalchemy.orm import relationship, object_session
 from . import Base
 
@@ -12,12 +12,19 @@ class Match(Base):
     team1_id = Column(Integer, ForeignKey("teams.id"))
     team2_id = Column(Integer, ForeignKey("teams.id"))
     date = Column(Date)
+    # Bumped by every scorecard write; served as the ETag of the match's scores
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow)
     
     league = relationship("League", back_populates="matches")
     team1 = relationship("Team", foreign_keys=[team1_id], back_populates="home_matches")
     team2 = relationship("Team", foreign_keys=[team2_id], back_populates="away_matches")
     player_scores = relationship("PlayerScore", back_populates="match")
+    result = relationship("MatchResult", back_populates="match", uselist=False)
+
+    __table_args__ = (
+        Index("ix_matches_teams_league", "team1_id", "team2_id", "league_id"),
+    )
 
     @property
     def course_id(self):
@@ -35,20 +42,72 @@ class PlayerScore(Base):
     match_id = Column(Integer, ForeignKey("matches.id"))
     player_id = Column(Integer, ForeignKey("players.id"))
     team_id = Column(Integer, ForeignKey("teams.id"))
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow)
 
     match = relationship("Match", back_populates="player_scores")
     player = relationship("Player", back_populates="scores")
-    hole_scores = relationship("HoleScore", back_populates="player_score")
+    hole_scores = relationship(
+        "HoleScore",
+        primaryjoin="PlayerScore.id == foreign(HoleScore.player_score_id)",
+        back_populates="player_score"
+    )
+
+    __table_args__ = (
+        Index("ix_player_scores_player_match", "player_id", "match_id"),
+    )
 
 class HoleScore(Base):
+    """One hole of a card, hash partitioned by league.
+
+    MySQL requires the partition key in every unique key and does not
+    allow foreign keys on partitioned tables, so league_id (copied from
+    the match) is part of the primary key, relationships join explicitly
+    and writers must set league_id. Filtering on it lets MySQL prune to
+    the league's partition.
+
+    The card's match, player and team and the hole's number are copied in
+    as well, so a match's or a week's strokes come from one range scan of
+    ix_hole_scores_match_hole without joining the card or hole.
+    """
     __tablename__ = "hole_scores"
 
-    id = Column(Integer, primary_key=True, index=True)
-    player_score_id = Column(Integer, ForeignKey("player_scores.id"))
-    hole_id = Column(Integer, ForeignKey("holes.id"))
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
+    league_id = Column(Integer, primary_key=True, autoincrement=False)
+    player_score_id = Column(Integer)
+    hole_id = Column(Integer)
+    match_id = Column(Integer)
+    player_id = Column(Integer)
+    team_id = Column(Integer)
+    hole_number = Column(Integer)
     strokes = Column(Integer)
     created_at = Column(DateTime, default=datetime.utcnow)
 
-    player_score = relationship("PlayerScore", back_populates="hole_scores")
-    hole = relationship("Hole", back_populates="scores")
\ No newline at end of file
+    player_score = relationship(
+        "PlayerScore",
+        primaryjoin="PlayerScore.id == foreign(HoleScore.player_score_id)",
+        back_populates="hole_scores"
+    )
+    hole = relationship(
+        "Hole",
+        primaryjoin="Hole.id == foreign(HoleScore.hole_id)",
+        back_populates="scores"
+    )
+
+    __table_args__ = (
+        Index("ix_hole_scores_player_score_id", "player_score_id"),
+        Index("ix_hole_scores_hole_id", "hole_id"),
+        Index("ix_hole_scores_match_hole", "match_id", "hole_number"),
+        {"mysql_partition_by": "HASH(league_id)", "mysql_partitions": "16"},
+    )
+
+class MatchResult(Base):
+    __tablename__ = "match_results"
+
+    match_id = Column(Integer, ForeignKey("matches.id"), primary_key=True)
+    team1_points = Column(Float, default=0)
+    team2_points = Column(Float, default=0)
+    holes_scored = Column(Integer, default=0)
+    computed_at = Column(DateTime, default=datetime.utcnow)
+
+    match = relationship("Match", back_populates="result")
\ No newline at end of file
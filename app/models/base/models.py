@@ -1,7 +1,13 @@
 from .team import Team, Player
 from .course import Course, Hole
 from .league import League, LeagueTeam
-from .match import Match, PlayerScore, HoleScore
+from .match import Match, PlayerScore, HoleScore, MatchResult
+from .task import TaskOutbox
+from .head_to_head import (
+    TeamHeadToHead, PlayerHeadToHead, TeamHeadToHeadArchived, PlayerHeadToHeadArchived
+)
+from .summary import WeekSummary
+from .idempotency import IdempotencyKey
 
 __all__ = [
     'Team',
@@ -12,5 +18,13 @@ __all__ = [
     'LeagueTeam',
     'Match',
     'PlayerScore',
-    'HoleScore'
+    'HoleScore',
+    'MatchResult',
+    'TaskOutbox',
+    'TeamHeadToHead',
+    'PlayerHeadToHead',
+    'TeamHeadToHeadArchived',
+    'PlayerHeadToHeadArchived',
+    'WeekSummary',
+    'IdempotencyKey'
 ]
\ No newline at end of file
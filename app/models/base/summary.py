@@ -0,0 +1,12 @@
+from datetime import datetime
+from sqlalchemy import Column, Integer, DateTime, JSON, ForeignKey
+from . import Base
+
+class WeekSummary(Base):
+    """Stored result of ``week_summary`` for a league week"""
+    __tablename__ = "week_summaries"
+
+    league_id = Column(Integer, ForeignKey("leagues.id"), primary_key=True)
+    week_number = Column(Integer, primary_key=True)
+    summary = Column(JSON, nullable=False)
+    computed_at = Column(DateTime, default=datetime.utcnow)
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from . import Base
 
@@ -15,6 +15,10 @@ class Team(Base):
     home_matches = relationship("Match", foreign_keys="[Match.team1_id]", back_populates="team1")
     away_matches = relationship("Match", foreign_keys="[Match.team2_id]", back_populates="team2")
 
+    __table_args__ = (
+        Index("ft_teams_name", "name", mysql_prefix="FULLTEXT"),
+    )
+
 class Player(Base):
     __tablename__ = "players"
 
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field, validator
 from datetime import datetime, date
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
 
 
 
@@ -40,6 +40,14 @@ class Team(TeamBase):
     class Config:
         from_attributes = True
 
+class RosterUpdateResponse(BaseModel):
+    team_id: int
+    inserted: int
+    updated: int
+    removed: int
+    moved_from_team_ids: List[int]
+    players: List[PlayerBase]
+
 class TeamBasic(BaseModel):
     id: int
     name: str
@@ -103,6 +111,7 @@ class LeagueBase(BaseModel):
     course_id: int
     start_date: date
     number_of_weeks: int  # This will now be computed
+    scoring_format: str = "best_ball_aggregate"
 
     class Config:
         from_attributes = True
@@ -113,6 +122,7 @@ class LeagueCreate(LeagueBase):
 class League(LeagueBase):
     id: int
     created_at: datetime
+    archived_at: Optional[datetime] = None
     teams: List[Team]
     
     class Config:
@@ -124,6 +134,7 @@ class LeagueUpdate(BaseModel):
     number_of_weeks: int
     start_date: datetime
     team_ids: List[int]
+    scoring_format: Optional[str] = None
 
     class Config:
         from_attributes = True
@@ -141,7 +152,8 @@ class MatchResponse(BaseModel):
     week_number: int
     team1_id: int
     team2_id: int
-    date: date
+    date: Optional[date] = None
+    version: Optional[int] = None
 
     class Config:
         from_attributes = True
@@ -169,6 +181,7 @@ class LeagueDetails(BaseModel):
     course_id: int
     number_of_weeks: int
     start_date: date
+    scoring_format: str
     team_ids: List[int]
     teams: List[TeamBasic]
 
@@ -203,6 +216,7 @@ class MatchDetail(BaseModel):
     team2: TeamBase
     league: LeagueBase
     course_id: int  # Added course_id
+    version: int
 
     class Config:
         from_attributes = True
@@ -275,6 +289,7 @@ class PlayerScoreResponse(BaseModel):
     player_id: int
     match_id: int
     hole_scores: List[HoleScoreResponse]  # Changed from scores to hole_scores to match model
+    version: int
     created_at: datetime
 
     class Config:
@@ -284,7 +299,210 @@ class MatchScoreResponse(BaseModel):
     status: str
     message: str
     match_id: int
+    version: int
     scores: List[PlayerScoreResponse]
+    job_id: Optional[int] = None
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class MatchScoresConflict(BaseModel):
+    detail: str
+    match_id: int
+    version: int
+    scores: List[PlayerScoreResponse]
+
+class MatchScoresCreate(BaseModel):
+    match_id: int
+    player_scores: List[PlayerScoreCreate]
+
+class WeekScoresCreate(BaseModel):
+    matches: List[MatchScoresCreate]
+
+class MatchPoints(BaseModel):
+    match_id: int
+    team1_id: int
+    team2_id: int
+    team1_points: float
+    team2_points: float
+    holes_scored: int
+
+class WeekScoreResponse(BaseModel):
+    status: str
+    message: str
+    league_id: int
+    week_number: int
+    results: List[MatchPoints]
+    job_id: Optional[int] = None
+
+class TeamProjection(BaseModel):
+    team_id: int
+    name: str
+    current_points: float
+    expected_points: float
+    first_place_odds: float
+    playoff_odds: float
+
+class LeagueProjections(BaseModel):
+    league_id: int
+    simulations: int
+    remaining_matches: int
+    teams: List[TeamProjection]
+
+class SkinWon(BaseModel):
+    hole_number: int
+    player_id: int
+    name: str
+    team_id: Optional[int] = None
+    strokes: float
+    value: int
+
+class PlayerSkins(BaseModel):
+    player_id: int
+    name: str
+    skins: int
+
+class SkinsResult(BaseModel):
+    skins: List[SkinWon]
+    carried_over: int
+    totals: List[PlayerSkins]
+
+class WeekSkins(BaseModel):
+    league_id: int
+    week_number: int
+    players: int
+    gross: SkinsResult
+    net: SkinsResult
+
+class HoleSummary(BaseModel):
+    hole_number: int
+    par: Optional[int] = None
+    handicap: Optional[int] = None
+    scores: int
+    average: float
+    to_par: float
+    low: int
+    high: int
+    birdies_or_better: int
+    pars: int
+    bogeys_or_worse: int
+
+class PlayerRound(BaseModel):
+    player_id: int
+    name: str
+    team_id: Optional[int] = None
+    gross: int
+    net: int
+
+class WeekSummary(BaseModel):
+    league_id: int
+    week_number: int
+    players: int
+    complete_rounds: int
+    field_average: Optional[float] = None
+    hardest_hole: Optional[int] = None
+    easiest_hole: Optional[int] = None
+    low_gross: List[PlayerRound]
+    low_net: List[PlayerRound]
+    holes: List[HoleSummary]
+    computed_at: Optional[datetime] = None
+
+class JobStatus(BaseModel):
+    id: int
+    kind: str
+    league_id: int
+    week_number: int
+    status: str
+    attempts: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+class SearchResult(BaseModel):
+    kind: str
+    id: int
+    name: str
+
+    class Config:
+        from_attributes = True
+
+class SearchResponse(BaseModel):
+    query: str
+    results: List[SearchResult]
+
+class TeamHeadToHeadRecord(BaseModel):
+    matches_played: int
+    wins: int
+    losses: int
+    halves: int
+    points_for: float
+    points_against: float
+
+class TeamMeetingHole(BaseModel):
+    hole_number: int
+    points_for: float
+    points_against: float
+
+class TeamMeeting(BaseModel):
+    match_id: int
+    league_id: int
+    week_number: int
+    date: Optional[date] = None
+    points_for: float
+    points_against: float
+    hole_results: List[TeamMeetingHole]
+
+class TeamHeadToHeadResponse(BaseModel):
+    team_id: int
+    opponent_id: int
+    record: TeamHeadToHeadRecord
+    matches: List[TeamMeeting]
+
+class PlayerHeadToHeadRecord(BaseModel):
+    matches_played: int
+    holes_won: int
+    holes_lost: int
+    holes_halved: int
+    strokes: int
+    opponent_strokes: int
+
+class PlayerMeetingHole(BaseModel):
+    hole_number: int
+    strokes: int
+    opponent_strokes: int
+
+class PlayerMeeting(BaseModel):
+    match_id: int
+    league_id: int
+    week_number: int
+    date: Optional[date] = None
+    holes_won: int
+    holes_lost: int
+    holes_halved: int
+    holes: List[PlayerMeetingHole]
+
+class PlayerHeadToHeadResponse(BaseModel):
+    player_id: int
+    opponent_id: int
+    record: PlayerHeadToHeadRecord
+    matches: List[PlayerMeeting]
+
+class IncludeNode(BaseModel):
+    where: Dict[str, Any] = {}
+    include: Dict[str, "IncludeNode"] = {}
+
+class RootQuery(BaseModel):
+    resource: str
+    where: Dict[str, Any]
+    include: Dict[str, IncludeNode] = {}
+
+class BatchQuery(BaseModel):
+    queries: Dict[str, RootQuery]
+
+class BatchQueryResponse(BaseModel):
+    data: Dict[str, List[Dict[str, Any]]]
+    statements: int
@@ -0,0 +1,2 @@
+from .executor import execute, BatchLoader, MAX_DEPTH, MAX_QUERIES
+from .resources import RESOURCES, Relation, Resource
@@ -0,0 +1,223 @@
+"""Batched, nested reads over the league models.
+
+A request names any number of root queries, each selecting rows of one
+resource and the relations to include beneath them. Relations are resolved
+breadth first across every root at once: all keys wanted at a level are
+collected, then loaded with one query per (model, column, filter), and rows
+already loaded earlier in the request are reused. The number of SQL
+statements depends on the shape of the request, never on how many rows it
+returns.
+"""
+from typing import Dict, Hashable, Iterable, List, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.archive import open_snapshot
+from .resources import RESOURCES, Relation, Resource
+
+MAX_DEPTH = 6
+MAX_QUERIES = 20
+SCALARS = (str, int, float, bool)
+
+Spec = Tuple[type, str, Tuple]  # (model, column, frozen filters)
+
+
+def _value(row, name: str):
+    return row[name] if isinstance(row, dict) else getattr(row, name)
+
+
+def _freeze(where: dict) -> Tuple:
+    return tuple(sorted(
+        (column, tuple(value) if isinstance(value, list) else value)
+        for column, value in where.items()
+    ))
+
+
+def _filter(query, model, where: Iterable[Tuple[str, Hashable]]):
+    for column, value in where:
+        attribute = getattr(model, column)
+        query = query.filter(attribute.in_(value) if isinstance(value, tuple) else attribute == value)
+    return query
+
+
+def _matches_where(row, where: Tuple) -> bool:
+    return all(
+        _value(row, column) in value if isinstance(value, tuple) else _value(row, column) == value
+        for column, value in where
+    )
+
+
+class BatchLoader:
+    """Per-request rows keyed by the column they were looked up on"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.statements = 0
+        self._rows: Dict[Spec, Dict[Hashable, list]] = {}
+
+    def load(self, wants: Dict[Spec, Set[Hashable]], order_by: Dict[type, str]):
+        for spec, keys in wants.items():
+            model, column, where = spec
+            cache = self._rows.setdefault(spec, {})
+            missing = [key for key in keys if key not in cache]
+            if not missing:
+                continue
+            query = _filter(
+                self.db.query(model).filter(getattr(model, column).in_(missing)), model, where
+            )
+            if model in order_by:
+                query = query.order_by(getattr(model, order_by[model]))
+            for key in missing:
+                cache[key] = []
+            for row in query:
+                cache[getattr(row, column)].append(row)
+            self.statements += 1
+
+    def get(self, spec: Spec, key: Hashable) -> list:
+        return self._rows.get(spec, {}).get(key, [])
+
+
+def resource(name: str) -> Resource:
+    if name not in RESOURCES:
+        raise ValueError(f"Unknown resource '{name}'. Available: {', '.join(sorted(RESOURCES))}")
+    return RESOURCES[name]
+
+
+def _where(target: Resource, name: str, where: dict) -> Tuple:
+    unknown = set(where or {}) - set(target.filters)
+    if unknown:
+        raise ValueError(f"Cannot filter {name} on: {', '.join(sorted(unknown))}")
+    for column, value in (where or {}).items():
+        # Filters are frozen into hashable batch keys
+        values = value if isinstance(value, list) else [value]
+        if not all(v is None or isinstance(v, SCALARS) for v in values):
+            raise ValueError(f"Filter {name}.{column} takes a value or a list of values")
+    return _freeze(where or {})
+
+
+def _snapshot_matches(parent, where: Tuple) -> list:
+    """Matches of an archived league live in its season snapshot, with their
+    results; scorecards of archived seasons are served by the export"""
+    return [m for m in open_snapshot(parent.snapshot_path).matches() if _matches_where(m, where)]
+
+
+def execute(db: Session, queries: dict) -> dict:
+    """Run root queries shaped ``{"resource", "where", "include"}`` where
+    ``include`` maps relation names to nodes shaped ``{"where", "include"}``"""
+    if len(queries) > MAX_QUERIES:
+        raise ValueError(f"At most {MAX_QUERIES} queries per request")
+
+    loader = BatchLoader(db)
+    order_by = {r.model: r.order_by for r in RESOURCES.values()}
+    data = {}
+    # Each entry: (resource name, rows, serialized rows, include node)
+    level = []
+    for name, query in queries.items():
+        root = resource(query["resource"])
+        where = _where(root, query["resource"], query.get("where"))
+        if not where:
+            raise ValueError(f"Query '{name}' needs a where filter")
+        rows = _filter(db.query(root.model), root.model, where)\
+            .order_by(getattr(root.model, root.order_by)).all()
+        loader.statements += 1
+        data[name] = [_serialize(root, row) for row in rows]
+        level.append((query["resource"], rows, data[name], query.get("include") or {}))
+
+    depth = 0
+    while level:
+        depth += 1
+        if depth > MAX_DEPTH:
+            raise ValueError(f"Includes may nest at most {MAX_DEPTH} levels")
+        plan = _plan(level)
+        _load(loader, plan, order_by)
+        level = _attach(loader, plan)
+
+    return {"data": data, "statements": loader.statements}
+
+
+def _plan(level) -> List[tuple]:
+    plan = []
+    for parent_name, rows, serialized, include in level:
+        parent = RESOURCES[parent_name]
+        for relation_name, node in include.items():
+            relation = parent.relations.get(relation_name)
+            if relation is None:
+                raise ValueError(f"Unknown relation '{relation_name}' on {parent_name}")
+            target = RESOURCES[relation.target]
+            where = _where(target, relation.target, (node or {}).get("where"))
+            plan.append((parent_name, relation_name, relation, where, rows, serialized, node or {}))
+    return plan
+
+
+def _spec(relation: Relation, where: Tuple) -> Spec:
+    return (RESOURCES[relation.target].model, relation.remote, where)
+
+
+def _link_spec(relation: Relation) -> Spec:
+    link_model, link_column, _ = relation.through
+    return (link_model, link_column, ())
+
+
+def _is_snapshot(parent_name: str, relation_name: str, row) -> bool:
+    return parent_name == "leagues" and relation_name == "matches" and bool(row.snapshot_path)
+
+
+def _load(loader: BatchLoader, plan, order_by):
+    # Many-to-many links first, since their rows supply the target keys
+    links = {}
+    for parent_name, relation_name, relation, where, rows, _, _ in plan:
+        if relation.through:
+            links.setdefault(_link_spec(relation), set()).update(
+                _value(row, relation.local) for row in rows
+            )
+    loader.load(links, order_by)
+
+    wants = {}
+    for parent_name, relation_name, relation, where, rows, _, _ in plan:
+        keys = wants.setdefault(_spec(relation, where), set())
+        for row in rows:
+            if _is_snapshot(parent_name, relation_name, row):
+                continue
+            for key in _keys(loader, relation, row):
+                keys.add(key)
+    loader.load({spec: keys for spec, keys in wants.items() if keys}, order_by)
+
+
+def _keys(loader: BatchLoader, relation: Relation, row) -> List[Hashable]:
+    key = _value(row, relation.local)
+    if key is None:
+        return []
+    if relation.through:
+        _, _, target_column = relation.through
+        return [getattr(link, target_column) for link in loader.get(_link_spec(relation), key)]
+    return [key]
+
+
+def _attach(loader: BatchLoader, plan) -> list:
+    next_level = []
+    for parent_name, relation_name, relation, where, rows, serialized, node in plan:
+        target = RESOURCES[relation.target]
+        spec = _spec(relation, where)
+        children = []
+        children_serialized = []
+        for row, out in zip(rows, serialized):
+            if _is_snapshot(parent_name, relation_name, row):
+                found = _snapshot_matches(row, where)
+            elif isinstance(row, dict) and relation_name == "result":
+                found = [dict(row["result"], match_id=row["id"])] if row.get("result") else []
+            else:
+                found = [child for key in _keys(loader, relation, row) for child in loader.get(spec, key)]
+            found_serialized = [_serialize(target, child) for child in found]
+            if relation.many:
+                out[relation_name] = found_serialized
+            else:
+                out[relation_name] = found_serialized[0] if found_serialized else None
+            children += found
+            children_serialized += found_serialized
+        if node.get("include"):
+            next_level.append((relation.target, children, children_serialized, node["include"]))
+    return next_level
+
+
+def _serialize(target: Resource, row) -> dict:
+    return {name: _value(row, name) for name in target.fields}
@@ -0,0 +1,109 @@
+"""Resources and relations exposed by the batched query endpoint"""
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+from app.models.base.models import (
+    League, LeagueTeam, Course, Hole, Team, Player, Match, MatchResult, PlayerScore, HoleScore
+)
+
+
+@dataclass(frozen=True)
+class Relation:
+    target: str
+    # Attribute of the parent whose value is looked up in ``remote``
+    local: str
+    remote: str
+    many: bool
+    # (link model, column matched against ``local``, column holding the
+    # target's ``remote`` value) for many-to-many relations
+    through: Optional[Tuple[type, str, str]] = None
+
+
+@dataclass(frozen=True)
+class Resource:
+    model: type
+    fields: Tuple[str, ...]
+    filters: Tuple[str, ...]
+    order_by: str = "id"
+    relations: Dict[str, Relation] = field(default_factory=dict)
+
+
+RESOURCES: Dict[str, Resource] = {
+    "leagues": Resource(
+        League,
+        fields=("id", "name", "course_id", "start_date", "scoring_format", "archived_at"),
+        filters=("id", "course_id"),
+        relations={
+            "course": Relation("courses", "course_id", "id", many=False),
+            "teams": Relation("teams", "id", "id", many=True,
+                              through=(LeagueTeam, "league_id", "team_id")),
+            "matches": Relation("matches", "id", "league_id", many=True),
+        }
+    ),
+    "courses": Resource(
+        Course,
+        fields=("id", "name"),
+        filters=("id",),
+        relations={
+            "holes": Relation("holes", "id", "course_id", many=True),
+            "leagues": Relation("leagues", "id", "course_id", many=True),
+        }
+    ),
+    "holes": Resource(
+        Hole,
+        fields=("id", "course_id", "number", "par", "handicap"),
+        filters=("id", "course_id", "number"),
+        order_by="number"
+    ),
+    "teams": Resource(
+        Team,
+        fields=("id", "name"),
+        filters=("id",),
+        relations={
+            "players": Relation("players", "id", "team_id", many=True),
+        }
+    ),
+    "players": Resource(
+        Player,
+        fields=("id", "first_name", "last_name", "team_id", "league_average"),
+        filters=("id", "team_id"),
+        relations={
+            "team": Relation("teams", "team_id", "id", many=False),
+        }
+    ),
+    "matches": Resource(
+        Match,
+        fields=("id", "league_id", "week_number", "team1_id", "team2_id", "date"),
+        filters=("id", "league_id", "week_number", "team1_id", "team2_id"),
+        relations={
+            "league": Relation("leagues", "league_id", "id", many=False),
+            "team1": Relation("teams", "team1_id", "id", many=False),
+            "team2": Relation("teams", "team2_id", "id", many=False),
+            "scores": Relation("player_scores", "id", "match_id", many=True),
+            "result": Relation("match_results", "id", "match_id", many=False),
+        }
+    ),
+    "match_results": Resource(
+        MatchResult,
+        fields=("match_id", "team1_points", "team2_points", "holes_scored"),
+        filters=("match_id",),
+        order_by="match_id"
+    ),
+    "player_scores": Resource(
+        PlayerScore,
+        fields=("id", "match_id", "player_id", "team_id"),
+        filters=("id", "match_id", "player_id", "team_id"),
+        relations={
+            "player": Relation("players", "player_id", "id", many=False),
+            "hole_scores": Relation("hole_scores", "id", "player_score_id", many=True),
+        }
+    ),
+    "hole_scores": Resource(
+        HoleScore,
+        fields=("id", "player_score_id", "match_id", "player_id", "team_id", "hole_id", "hole_number", "strokes"),
+        filters=("match_id", "hole_id"),
+        relations={
+            "hole": Relation("holes", "hole_id", "id", many=False),
+        }
+    ),
+}
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from app.archive import rebuild_archived_head_to_head
+from app.crud import idempotency
+from app.database import get_db
+from app.diagnostics import profiling, slow_queries
+from app.security import require_admin
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+def get_profile(profile_id: str):
+    """Text report of a profile captured with X-Profile"""
+    report = profiling.profile_report(profile_id)
+    if report is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return report
+
+@router.get("/profile/stacks", response_class=PlainTextResponse)
+def get_sampled_stacks():
+    """Hot stacks from the sampling profiler in folded format, ready for
+    flamegraph.pl or speedscope"""
+    if profiling.sampler is None:
+        raise HTTPException(status_code=404, detail="Sampling profiler is not enabled")
+    return profiling.sampler.folded()
+
+@router.delete("/profile/stacks")
+def reset_sampled_stacks():
+    if profiling.sampler is None:
+        raise HTTPException(status_code=404, detail="Sampling profiler is not enabled")
+    profiling.sampler.reset()
+    return {"message": "Sampled stacks cleared"}
+
+@router.get("/slow-queries")
+def get_slow_queries(limit: int = 20):
+    """Slow statements by total time, with routes, call sites and plan"""
+    if slow_queries.slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is not enabled")
+    return slow_queries.slow_query_log.top(limit)
+
+@router.delete("/slow-queries")
+def reset_slow_queries():
+    if slow_queries.slow_query_log is None:
+        raise HTTPException(status_code=404, detail="Slow query log is not enabled")
+    slow_queries.slow_query_log.reset()
+    return {"message": "Slow query log cleared"}
+
+@router.delete("/idempotency-keys/expired")
+def purge_idempotency_keys(db: Session = Depends(get_db)):
+    """Drop stored Idempotency-Key responses past their TTL"""
+    deleted = idempotency.purge_expired(db)
+    db.commit()
+    return {"message": f"Deleted {deleted} expired idempotency keys", "deleted_count": deleted}
+
+@router.post("/head-to-head/rebuild-archived")
+def rebuild_archived_records(db: Session = Depends(get_db)):
+    """Refold archived leagues' snapshots into head-to-head records, e.g. for
+    leagues archived before archived totals were kept"""
+    leagues = rebuild_archived_head_to_head(db)
+    db.commit()
+    return {"message": f"Rebuilt archived head-to-head records from {leagues} leagues"}
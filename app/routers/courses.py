@@ -1,9 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends
 from typing import List
-from ..database import get_db
+from ..database import get_db, get_read_db
 from sqlalchemy.orm import Session
 from ..models import schemas
 from app.models.base.models import *
+from ..search import search_index, course_doc, COURSE
+from ..crud import courses as courses_crud
+from ..rules.summary import drop_week_summaries
+from ..tasks import task_queue, enqueue, WEEK_RECOMPUTE
+from .. import cache
 
 router = APIRouter(prefix="/courses", tags=["courses"])
 
@@ -33,27 +38,29 @@ def create_course(course: schemas.CourseCreate, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     
+    cache.invalidate_courses()
+    search_index.upsert([course_doc(db_course)])
     return db_course
 
 @router.get("/", response_model=List[schemas.Course])
-def get_courses(db: Session = Depends(get_db)):
-    courses = db.query(Course).all()
-    for course in courses:
-        course.holes = db.query(Hole).filter(
-            Hole.course_id == course.id
-        ).all()
+def get_courses(db: Session = Depends(get_read_db)):
+    courses = cache.get_courses()
+    if courses is None:
+        version = cache.courses_version()
+        courses = courses_crud.course_payloads(db)
+        cache.set_courses(courses, version=version)
     return courses
 
 @router.get("/{course_id}", response_model=schemas.Course)
-def get_course(course_id: int, db: Session = Depends(get_db)):
-    course = db.query(Course).filter(Course.id == course_id).first()
-    if not course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    
-    course.holes = db.query(Hole).filter(
-        Hole.course_id == course_id
-    ).order_by(Hole.number).all()
-    
+def get_course(course_id: int, db: Session = Depends(get_read_db)):
+    course = cache.get_courses(course_id)
+    if course is None:
+        version = cache.courses_version()
+        found = courses_crud.course_payloads(db, [course_id])
+        if not found:
+            raise HTTPException(status_code=404, detail="Course not found")
+        course = found[0]
+        cache.set_courses(course, course_id, version=version)
     return course
 
 @router.put("/{course_id}", response_model=schemas.Course)
@@ -64,36 +71,42 @@ def update_course(course_id: int, course_update: schemas.CourseUpdate, db: Sessi
         raise HTTPException(status_code=404, detail="Course not found")
 
     try:
-        # Update course name
-        db.query(Course).filter(Course.id == course_id).update({"name": course_update.name})
-        
-        # Delete existing holes
-        db.query(Hole).filter(Hole.course_id == course_id).delete()
-        
-        # Add updated holes
-        for hole in course_update.holes:
-            db_hole = Hole(
-                course_id=course_id,
-                number=hole.number,
-                par=hole.par,
-                handicap=hole.handicap
-            )
-            db.add(db_hole)
-        
+        changes = courses_crud.update_course(db, db_course, course_update)
+
+        # Rescore only the weeks whose points depend on what changed
+        jobs = [
+            (league_id, week_number)
+            for league_id, weeks in courses_crud.affected_league_weeks(db, course_id, changes).items()
+            for week_number in weeks
+        ]
+        for league_id, week_number in jobs:
+            enqueue(db, WEEK_RECOMPUTE, league_id, week_number)
+        # Stored summaries list each hole's stroke index, and gross leagues
+        # are not rescored for it; the jobs above store theirs again
+        if changes["stroke_index_changed"]:
+            drop_week_summaries(db, courses_crud.course_league_ids(db, course_id))
+
         db.commit()
         db.refresh(db_course)
-        
-        # Fetch updated holes
-        db_course.holes = db.query(Hole).filter(
-            Hole.course_id == course_id
-        ).order_by(Hole.number).all()
-        
-        return db_course
-    
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+    for league_id, week_number in jobs:
+        task_queue.notify(WEEK_RECOMPUTE, league_id, week_number)
+    cache.invalidate_courses()
+    if changes["layout_changed"] or changes["stroke_index_changed"]:
+        for league_id in courses_crud.course_league_ids(db, course_id):
+            cache.invalidate_league(league_id)
+    search_index.upsert([course_doc(db_course)])
+
+    # Fetch updated holes
+    db_course.holes = db.query(Hole).filter(
+        Hole.course_id == course_id
+    ).order_by(Hole.number).all()
+
+    return db_course
+
 @router.delete("/{course_id}")
 def delete_course(course_id: int, db: Session = Depends(get_db)):
     course = db.query(Course).filter(Course.id == course_id).first()
@@ -110,4 +123,6 @@ def delete_course(course_id: int, db: Session = Depends(get_db)):
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
     
+    cache.invalidate_courses()
+    search_index.remove(COURSE, [course_id])
     return {"message": "Course deleted successfully"}
\ No newline at end of file
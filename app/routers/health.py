@@ -0,0 +1,63 @@
+from fastapi import APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app import cache
+from app.config import settings
+from app.database import engine, replicas, pool_wait, MAX_OVERFLOW
+from app.diagnostics.health import DatabaseProbe, pool_stats
+from app.tasks import task_queue
+from app.warmup import warmup
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+database_probe = DatabaseProbe(engine, settings.HEALTH_DB_TIMEOUT_MS / 1000)
+
+
+def _report() -> dict:
+    return {
+        "pools": {
+            "primary": pool_stats(engine.pool, MAX_OVERFLOW),
+            "replicas": [pool_stats(e.pool, MAX_OVERFLOW) for e in replicas.engines]
+        },
+        "pool_wait_ms": round(pool_wait.current() * 1000, 1),
+        "cache": {"hit_ratio": cache.shared_cache.hit_ratio(), **cache.shared_cache.stats},
+        "queue_depth": task_queue.depth()
+    }
+
+
+@router.get("/live")
+def live():
+    """200 while the process is serving requests; never touches the database"""
+    return {"status": "alive", **_report()}
+
+
+@router.get("/ready")
+def ready():
+    """200 when the worker can take traffic, 503 with the reasons otherwise.
+
+    A saturated pool fails without pinging the database, since the ping
+    would only queue behind the requests already waiting.
+    """
+    report = _report()
+    reasons = []
+    if not warmup.ready:
+        reasons.append("warming up")
+    if report["pools"]["primary"]["saturated"]:
+        reasons.append("connection pool saturated")
+        report["database"] = None
+    else:
+        report["database"] = database_probe.check()
+        if not report["database"]["ok"]:
+            reasons.append("database unreachable")
+    if report["pool_wait_ms"] > settings.HEALTH_MAX_POOL_WAIT_MS:
+        reasons.append("pool checkout wait too high")
+
+    return JSONResponse(
+        content=jsonable_encoder({
+            "status": "ready" if not reasons else "unavailable",
+            "reasons": reasons,
+            **report,
+            "warmup": warmup.status()
+        }),
+        status_code=503 if reasons else 200
+    )
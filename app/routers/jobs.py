@@ -0,0 +1,31 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from ..database import get_db
+from ..models import schemas
+from ..models.base.models import TaskOutbox
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+@router.get("/", response_model=List[schemas.JobStatus])
+async def get_jobs(
+    league_id: Optional[int] = None,
+    status: Optional[str] = None,
+    limit: int = 50,
+    db: Session = Depends(get_db)
+):
+    """List the most recent background jobs"""
+    query = db.query(TaskOutbox)
+    if league_id is not None:
+        query = query.filter(TaskOutbox.league_id == league_id)
+    if status is not None:
+        query = query.filter(TaskOutbox.status == status)
+    return query.order_by(TaskOutbox.id.desc()).limit(min(limit, 500)).all()
+
+@router.get("/{job_id}", response_model=schemas.JobStatus)
+async def get_job(job_id: int, db: Session = Depends(get_db)):
+    """Get the status of a background job"""
+    job = db.query(TaskOutbox).filter(TaskOutbox.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail=f"Job with id {job_id} not found")
+    return job
@@ -1,13 +1,32 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header, Query
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session, joinedload
-from typing import List
-from ..database import get_db
+from typing import List, Optional
+from ..database import get_db, get_read_db
 from ..models import schemas
 from ..models.schemas import LeagueCreate, MatchResponse, MatchCreate
 from app.models.base.models import *
+from app.config import settings
+from app.crud import scores as scores_crud
+from app.crud import head_to_head, idempotency
+from app.archive import build_season, open_snapshot
+from app.rules.projections import project_league
+from app.rules.formats import available_formats, is_valid_format
+from app.rules.skins import week_skins
+from app.rules.summary import week_summary
+from app import cache
+from app.rules.validation import raise_for_errors
+from app.tasks import task_queue, enqueue, WEEK_RECOMPUTE
 
 router = APIRouter(prefix="/leagues", tags=["leagues"])
 
+def validate_scoring_format(scoring_format: str):
+    if not is_valid_format(scoring_format):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown scoring format '{scoring_format}'. Available: {', '.join(available_formats())}"
+        )
+
 @router.post("/", response_model=schemas.League)
 async def create_league(league: LeagueCreate, db: Session = Depends(get_db)):
     # Validate team count
@@ -15,12 +34,14 @@ async def create_league(league: LeagueCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="Team count must be between 2 and 30")
     if len(league.team_ids) % 2 != 0:
         raise HTTPException(status_code=400, detail="Must have an even number of teams")
+    validate_scoring_format(league.scoring_format)
 
     db_league = League(
         name=league.name,
         course_id=league.course_id,
         number_of_weeks=league.number_of_weeks,
-        start_date=league.start_date
+        start_date=league.start_date,
+        scoring_format=league.scoring_format
     )
     db.add(db_league)
     
@@ -39,7 +60,7 @@ async def create_league(league: LeagueCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail=str(e))
 
 @router.get("/", response_model=List[schemas.League])
-async def get_leagues(db: Session = Depends(get_db)):
+async def get_leagues(db: Session = Depends(get_read_db)):
     try:
         leagues = db.query(League).all()
         return leagues
@@ -47,7 +68,7 @@ async def get_leagues(db: Session = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/{league_id}", response_model=schemas.League)
-async def get_league(league_id: int, db: Session = Depends(get_db)):
+async def get_league(league_id: int, db: Session = Depends(get_read_db)):
     league = db.query(League).filter(League.id == league_id).first()
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
@@ -85,14 +106,32 @@ async def update_league(league_id: int, league_update: schemas.LeagueUpdate, db:
         raise HTTPException(status_code=400, detail="Team count must be between 2 and 30")
     if len(league_update.team_ids) % 2 != 0:
         raise HTTPException(status_code=400, detail="Must have an even number of teams")
+    if league_update.scoring_format is not None:
+        validate_scoring_format(league_update.scoring_format)
+
+    format_changed = league_update.scoring_format not in (None, db_league.scoring_format)
 
     try:
         # Update league details
-        db.query(League).filter(League.id == league_id).update({
+        values = {
             League.name: league_update.name,
             League.course_id: league_update.course_id,
             League.start_date: league_update.start_date
-        })
+        }
+        if league_update.scoring_format is not None:
+            values[League.scoring_format] = league_update.scoring_format
+        db.query(League).filter(League.id == league_id).update(values)
+
+        # Results of every week have to be rescored under the new format
+        rescored_weeks = []
+        if format_changed:
+            rescored_weeks = [
+                week for (week,) in db.query(Match.week_number)
+                    .filter(Match.league_id == league_id)
+                    .distinct()
+            ]
+            for week in rescored_weeks:
+                enqueue(db, WEEK_RECOMPUTE, league_id, week)
 
         # Remove existing team associations
         db.query(LeagueTeam).filter(LeagueTeam.league_id == league_id).delete()
@@ -103,16 +142,21 @@ async def update_league(league_id: int, league_update: schemas.LeagueUpdate, db:
             db.add(league_team)
 
         db.commit()
-        db.refresh(db_league)
-        return db_league
 
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=400, detail=str(e))
 
+    for week in rescored_weeks:
+        task_queue.notify(WEEK_RECOMPUTE, league_id, week)
+    if format_changed:
+        cache.invalidate_league(league_id)
+    db.refresh(db_league)
+    return db_league
+
 
 @router.get("/{league_id}", response_model=schemas.LeagueDetails)
-async def get_league_details(league_id: int, db: Session = Depends(get_db)):
+async def get_league_details(league_id: int, db: Session = Depends(get_read_db)):
     # Load league with joined team data
     league = db.query(League).options(
         joinedload(League.teams)
@@ -130,20 +174,35 @@ async def get_league_details(league_id: int, db: Session = Depends(get_db)):
         "course_id": league.course_id,
         "number_of_weeks": league.number_of_weeks,
         "start_date": league.start_date,
+        "scoring_format": league.scoring_format,
         "team_ids": [team.id for team in teams],
         "teams": teams
     }
 
 @router.get("/{league_id}/matches", response_model=List[MatchResponse])
-async def get_league_matches(league_id: int, db: Session = Depends(get_db)):
+async def get_league_matches(league_id: int, db: Session = Depends(get_read_db)):
+    league = db.query(League).filter(League.id == league_id).first()
+    if league and league.snapshot_path:
+        return open_snapshot(league.snapshot_path).matches()
     matches = db.query(Match).filter(Match.league_id == league_id).all()
     return matches
 
+@router.get("/{league_id}/export")
+async def export_league(league_id: int, db: Session = Depends(get_read_db)):
+    """Export a league's full season including every scorecard"""
+    league = db.query(League).filter(League.id == league_id).first()
+    if not league:
+        raise HTTPException(status_code=404, detail="League not found")
+
+    if league.snapshot_path:
+        return open_snapshot(league.snapshot_path).export()
+    return build_season(db, league)
+
 @router.get("/{league_id}/matches/week/{week_number}", response_model=List[schemas.MatchResponse])
 async def get_league_week_matches(
     league_id: int,
     week_number: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all matches for a specific week in a league"""
     try:
@@ -155,6 +214,15 @@ async def get_league_week_matches(
                 detail=f"League with id {league_id} not found"
             )
 
+        if league.snapshot_path:
+            matches = open_snapshot(league.snapshot_path).matches(week_number)
+            if not matches:
+                raise HTTPException(
+                    status_code=404,
+                    detail=f"No matches found for week {week_number}"
+                )
+            return matches
+
         # Get matches for the specific week
         matches = db.query(Match)\
             .options(
@@ -194,6 +262,8 @@ async def create_match(
     league = db.query(League).filter(League.id == league_id).first()
     if not league:
         raise HTTPException(status_code=404, detail="League not found")
+    if league.archived_at:
+        raise HTTPException(status_code=400, detail="League is archived")
 
     # Check if week number is valid
     existing_match = db.query(Match).filter(
@@ -239,6 +309,8 @@ async def create_matches(
         league = db.query(League).filter(League.id == league_id).first()
         if not league:
             raise HTTPException(status_code=404, detail="League not found")
+        if league.archived_at:
+            raise HTTPException(status_code=400, detail="League is archived")
 
         for match_data in request.matches:
             # Validate week number
@@ -298,6 +370,8 @@ async def delete_week(
                 detail=f"No matches found for week {week_number}"
             )
 
+        pairs = head_to_head.match_pairs(db, [m.id for m in matches])
+
         # Delete all player scores and hole scores for these matches
         for match in matches:
             # Get all player scores for this match
@@ -305,43 +379,247 @@ async def delete_week(
                 PlayerScore.match_id == match.id
             ).all()
 
-            for score in player_scores:
-                # Delete hole scores first
-                db.query(HoleScore).filter(
-                    HoleScore.player_score_id == score.id
-                ).delete()
+            # Delete hole scores first, from the league's partition
+            db.query(HoleScore).filter(
+                HoleScore.league_id == league_id,
+                HoleScore.player_score_id.in_([score.id for score in player_scores])
+            ).delete(synchronize_session=False)
 
             # Delete player scores
             db.query(PlayerScore).filter(
                 PlayerScore.match_id == match.id
             ).delete()
 
+            db.query(MatchResult).filter(
+                MatchResult.match_id == match.id
+            ).delete()
+
         # Delete the matches
         deleted_count = db.query(Match).filter(
             Match.league_id == league_id,
             Match.week_number == week_number
         ).delete()
 
+        head_to_head.refresh_pairs(db, *pairs)
+        refresh_week_summary(db, league_id, week_number)
         db.commit()
 
-        return {
-            "message": f"Successfully deleted week {week_number} matches",
-            "deleted_count": deleted_count,
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to delete week: {str(e)}"
+        )
+
+    cache.invalidate_league(league_id)
+    return {
+        "message": f"Successfully deleted week {week_number} matches",
+        "deleted_count": deleted_count,
+        "week_number": week_number,
+        "league_id": league_id
+    }
+
+@router.post("/{league_id}/weeks/{week_number}/scores", response_model=schemas.WeekScoreResponse)
+async def submit_week_scores(
+    league_id: int,
+    week_number: int,
+    submission: schemas.WeekScoresCreate,
+    idempotency_key: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """Submit scorecards for every match of a week in a single transaction"""
+    scope = f"week-scores:{league_id}:{week_number}"
+    fingerprint = idempotency.request_hash(submission)
+    try:
+        if idempotency_key:
+            replayed = idempotency.replay(db, idempotency_key, scope, fingerprint)
+            if replayed is not None:
+                return replayed
+
+        league = db.query(League).filter(League.id == league_id).first()
+        if not league:
+            raise HTTPException(
+                status_code=404,
+                detail=f"League with id {league_id} not found"
+            )
+
+        preload = scores_crud.preload_week(db, league, week_number)
+        if not preload.matches:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No matches found for week {week_number}"
+            )
+
+        errors, team_ids = scores_crud.validate_week_scores(preload, submission)
+        raise_for_errors(errors)
+
+        results, written = scores_crud.save_week_scores(db, preload, submission, team_ids)
+
+        job_id = None
+        if written:
+            job_id = enqueue(db, WEEK_RECOMPUTE, league_id, week_number).id
+
+        response = {
+            "status": "success",
+            "message": f"Scores submitted for {len(results)} matches" if written else "Scores unchanged",
+            "league_id": league_id,
             "week_number": week_number,
-            "league_id": league_id
+            "results": results,
+            "job_id": job_id
         }
+        if idempotency_key:
+            idempotency.remember(db, idempotency_key, scope, fingerprint, response)
+        db.commit()
 
+    except IntegrityError:
+        db.rollback()
+        # A concurrent request with the same key committed first
+        replayed = idempotency.replay(db, idempotency_key, scope, fingerprint) if idempotency_key else None
+        if replayed is None:
+            raise HTTPException(status_code=409, detail="Conflicting concurrent score submission")
+        return replayed
+    except scores_crud.VersionConflict as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=409,
+            detail={"message": str(e), "match_ids": e.match_ids}
+        )
     except HTTPException:
         raise
     except Exception as e:
         db.rollback()
         raise HTTPException(
             status_code=500,
-            detail=f"Failed to delete week: {str(e)}"
+            detail=f"Failed to submit week scores: {str(e)}"
+        )
+
+    # Committed; nothing past this point may turn the write into an error
+    if written:
+        task_queue.notify(WEEK_RECOMPUTE, league_id, week_number)
+        cache.invalidate_league(league_id)
+    return response
+
+@router.get("/{league_id}/weeks/{week_number}/skins", response_model=schemas.WeekSkins)
+async def get_week_skins(
+    league_id: int,
+    week_number: int,
+    db: Session = Depends(get_read_db)
+):
+    """Gross and net skins across every player in a week"""
+    try:
+        skins = cache.get("skins", league_id, week_number)
+        if skins is not None:
+            return skins
+
+        league = db.query(League).filter(League.id == league_id).first()
+        if not league:
+            raise HTTPException(
+                status_code=404,
+                detail=f"League with id {league_id} not found"
+            )
+
+        version = cache.league_version(league_id)
+        skins = week_skins(db, league, week_number)
+        cache.set("skins", league_id, skins, week_number, version=version)
+        return skins
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to compute skins: {str(e)}"
+        )
+
+@router.get("/{league_id}/weeks/{week_number}/summary", response_model=schemas.WeekSummary)
+async def get_week_summary(
+    league_id: int,
+    week_number: int,
+    db: Session = Depends(get_read_db)
+):
+    """Per-hole field statistics and low rounds of a week.
+
+    Served from the summary stored by the week's recompute job; weeks
+    scored before that job has run are computed on the fly.
+    """
+    try:
+        stored = db.query(WeekSummary).filter(
+            WeekSummary.league_id == league_id,
+            WeekSummary.week_number == week_number
+        ).first()
+        if stored is not None:
+            return dict(stored.summary, computed_at=stored.computed_at)
+
+        league = db.query(League).filter(League.id == league_id).first()
+        if not league:
+            raise HTTPException(
+                status_code=404,
+                detail=f"League with id {league_id} not found"
+            )
+
+        summary = week_summary(db, league, week_number)
+        if summary is None:
+            raise HTTPException(
+                status_code=404,
+                detail=f"No scores found for week {week_number}"
+            )
+        return summary
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to compute week summary: {str(e)}"
+        )
+
+@router.get("/{league_id}/projections", response_model=schemas.LeagueProjections)
+async def get_league_projections(
+    league_id: int,
+    simulations: int = 20000,
+    playoff_spots: int = Query(4, ge=1),
+    db: Session = Depends(get_read_db)
+):
+    """Project final standings by simulating the remaining schedule"""
+    if simulations < 1 or simulations > settings.PROJECTION_MAX_SIMULATIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Simulations must be between 1 and {settings.PROJECTION_MAX_SIMULATIONS}"
+        )
+
+    league = db.query(League).filter(League.id == league_id).first()
+    if not league:
+        raise HTTPException(
+            status_code=404,
+            detail=f"League with id {league_id} not found"
+        )
+    team_count = db.query(LeagueTeam).filter(LeagueTeam.league_id == league_id).count()
+    if team_count and playoff_spots > team_count:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Playoff spots must be between 1 and the league's {team_count} teams"
+        )
+
+    key = (simulations, playoff_spots)
+    projections = cache.get("projections", league_id, key)
+    if projections is not None:
+        return projections
+
+    try:
+        version = cache.league_version(league_id)
+        projections = await project_league(db, league, simulations, playoff_spots)
+        cache.set("projections", league_id, projections, key, version=version)
+        return projections
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Failed to project standings: {str(e)}"
         )
 
 @router.get("/{league_id}/weeks", response_model=List[int])
-async def get_league_weeks(league_id: int, db: Session = Depends(get_db)):
+async def get_league_weeks(league_id: int, db: Session = Depends(get_read_db)):
     """Get all week numbers for matches in a league"""
     try:
         # Check if league exists
@@ -352,6 +630,9 @@ async def get_league_weeks(league_id: int, db: Session = Depends(get_db)):
                 detail=f"League with id {league_id} not found"
             )
 
+        if league.snapshot_path:
+            return open_snapshot(league.snapshot_path).weeks()
+
         # Get distinct week numbers for this league
         weeks = db.query(Match.week_number)\
             .filter(Match.league_id == league_id)\
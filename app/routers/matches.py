@@ -1,15 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session, joinedload
-from typing import List
-from ..database import get_db
+from fastapi import APIRouter, Depends, Header, HTTPException, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from typing import List, Optional
+from ..database import get_db, get_read_db
 from ..models import schemas
 from ..models.schemas import PlayerScoreCreate
-from ..models.base.models import Match, League, Team, PlayerScore, HoleScore, Course
+from ..models.base.models import Match, League, Team, PlayerScore, HoleScore, Course, MatchResult
+from ..rules.summary import refresh_week_summary
+from ..rules.validation import load_match_for_scoring, validate_match_submission, raise_for_errors
+from ..tasks import task_queue, enqueue, WEEK_RECOMPUTE
+from .. import cache
+from ..crud import head_to_head, idempotency
+from ..crud import scores as scores_crud
 
 router = APIRouter(prefix="/matches", tags=["matches"])
 
+def _etag(version: int) -> str:
+    return f'"{version}"'
+
+def _if_match(header: str, version: int) -> bool:
+    """Whether an If-Match header value matches the match's version"""
+    tags = [tag.strip() for tag in header.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == _etag(version) for tag in tags)
+
+def _scores_conflict(db: Session, match_id: int, status_code: int) -> JSONResponse:
+    """Conflict response carrying the match's current cards and version"""
+    version, league_id = db.query(Match.version, Match.league_id).filter(Match.id == match_id).one()
+    scores = db.query(PlayerScore)\
+        .options(selectinload(PlayerScore.hole_scores.and_(HoleScore.league_id == league_id)))\
+        .filter(PlayerScore.match_id == match_id)\
+        .all()
+    body = schemas.MatchScoresConflict.model_validate({
+        "detail": f"Scores of match {match_id} were changed by another request",
+        "match_id": match_id,
+        "version": version,
+        "scores": scores
+    }, from_attributes=True)
+    return JSONResponse(
+        content=jsonable_encoder(body),
+        status_code=status_code,
+        headers={"ETag": _etag(version)}
+    )
+
 @router.get("/{match_id}", response_model=schemas.MatchDetail)
-async def get_match(match_id: int, db: Session = Depends(get_db)):
+async def get_match(match_id: int, response: Response, db: Session = Depends(get_read_db)):
     """Get match details including teams and players"""
     try:
         # Load match with all relationships
@@ -42,6 +78,8 @@ async def get_match(match_id: int, db: Session = Depends(get_db)):
 
         # Add course_id to the response
         match.course_id = match.league.course_id
+        response.headers["ETag"] = _etag(match.version)
+        cache.remember_match_league(match_id, match.league_id)
         
         return match
     
@@ -57,62 +95,93 @@ async def get_match(match_id: int, db: Session = Depends(get_db)):
 async def submit_match_scores(
     match_id: int,
     player_scores: List[schemas.PlayerScoreCreate],
+    response: Response,
+    idempotency_key: Optional[str] = Header(None),
+    if_match: Optional[str] = Header(None),
     db: Session = Depends(get_db)
 ):
-    """Submit or update scores for a match"""
+    """Submit or update scores for a match.
+
+    A retry carrying the same Idempotency-Key gets the first response back
+    without rewriting anything, and resubmitting unchanged cards writes
+    nothing and queues no recompute.
+
+    Writes are optimistic: the match's version is bumped only if it is
+    still the one read. With If-Match (the ETag of GET /matches/{id} or a
+    previous submission) a stale version gets 412; without it, a write
+    that raced another one gets 409. Both carry the current cards.
+    """
+    scope = f"match-scores:{match_id}"
+    fingerprint = idempotency.request_hash(player_scores)
     try:
-        # Verify match exists
-        match = db.query(Match).filter(Match.id == match_id).first()
+        if idempotency_key:
+            replayed = idempotency.replay(db, idempotency_key, scope, fingerprint)
+            if replayed is not None:
+                return replayed
+
+        # Verify match exists, loading its course holes and rosters
+        match = load_match_for_scoring(db, match_id)
         if not match:
             raise HTTPException(status_code=404, detail="Match not found")
 
-        created_scores = []
-        for player_score in player_scores:
-            # Upsert player score with relationship loading
-            db_player_score = db.query(PlayerScore).filter(
-                PlayerScore.match_id == match_id,
-                PlayerScore.player_id == player_score.player_id
-            ).first()
-
-            if not db_player_score:
-                db_player_score = PlayerScore(
-                    match_id=match_id,
-                    player_id=player_score.player_id
-                )
-                db.add(db_player_score)
-                db.flush()
-
-            # Upsert hole scores
-            for hole_score in player_score.scores:
-                db.merge(HoleScore(
-                    player_score_id=db_player_score.id,
-                    hole_id=hole_score.hole_id,
-                    strokes=hole_score.strokes
-                ))
-            
-            created_scores.append(db_player_score)
+        if if_match is not None and not _if_match(if_match, match.version):
+            db.rollback()
+            return _scores_conflict(db, match_id, 412)
 
-        # Update match status
-        match.status = "completed"
-        db.commit()
+        errors, team_ids = validate_match_submission(match, player_scores)
+        raise_for_errors(errors)
+
+        score_ids, written = scores_crud.save_match_scores(db, match, player_scores, team_ids)
+        version = match.version + 1 if written else match.version
+
+        job_id = None
+        if written:
+            # Derived data is recomputed in the background, after the commit
+            job_id = enqueue(db, WEEK_RECOMPUTE, match.league_id, match.week_number).id
 
-        # Refresh all scores with relationships loaded
         refreshed_scores = db.query(PlayerScore)\
-            .options(joinedload(PlayerScore.hole_scores))\
-            .filter(PlayerScore.id.in_([score.id for score in created_scores]))\
+            .options(selectinload(PlayerScore.hole_scores.and_(HoleScore.league_id == match.league_id)))\
+            .filter(PlayerScore.id.in_(score_ids))\
+            .populate_existing()\
             .all()
-
-        return {
+        result = schemas.MatchScoreResponse.model_validate({
             "status": "success",
-            "message": "Scores submitted successfully",
+            "message": "Scores submitted successfully" if written else "Scores unchanged",
             "match_id": match_id,
-            "scores": refreshed_scores
-        }
+            "version": version,
+            "scores": refreshed_scores,
+            "job_id": job_id
+        }, from_attributes=True)
+
+        if idempotency_key:
+            idempotency.remember(db, idempotency_key, scope, fingerprint, result.model_dump())
+        db.commit()
 
+    except HTTPException:
+        db.rollback()
+        raise
+    except scores_crud.VersionConflict:
+        db.rollback()
+        return _scores_conflict(db, match_id, 412 if if_match is not None else 409)
+    except IntegrityError:
+        db.rollback()
+        # A concurrent request with the same key committed first
+        replayed = idempotency.replay(db, idempotency_key, scope, fingerprint) if idempotency_key else None
+        if replayed is None:
+            raise HTTPException(status_code=409, detail="Conflicting concurrent score submission")
+        return replayed
     except Exception as e:
         db.rollback()
         raise HTTPException(status_code=500, detail=str(e))
 
+    # Committed; nothing past this point may turn the write into an error
+    if written:
+        task_queue.notify(WEEK_RECOMPUTE, match.league_id, match.week_number)
+        cache.invalidate_league(match.league_id)
+
+    response.headers["ETag"] = _etag(version)
+    return result
+
 @router.delete("/{match_id}", response_model=schemas.DeleteMatchResponse)
 async def delete_match(match_id: int, db: Session = Depends(get_db)):
     """Delete a match and all associated scores"""
@@ -125,33 +194,35 @@ async def delete_match(match_id: int, db: Session = Depends(get_db)):
                 detail=f"Match with id {match_id} not found"
             )
 
+        pairs = head_to_head.match_pairs(db, [match_id])
+
         # Get all player scores for this match
         player_scores = db.query(PlayerScore).filter(
             PlayerScore.match_id == match_id
         ).all()
 
-        # Delete hole scores first (child records)
-        for score in player_scores:
-            db.query(HoleScore).filter(
-                HoleScore.player_score_id == score.id
-            ).delete()
+        # Delete hole scores first (child records) from the league's partition
+        db.query(HoleScore).filter(
+            HoleScore.league_id == match.league_id,
+            HoleScore.player_score_id.in_([score.id for score in player_scores])
+        ).delete(synchronize_session=False)
 
         # Delete player scores
         db.query(PlayerScore).filter(
             PlayerScore.match_id == match_id
         ).delete()
 
+        db.query(MatchResult).filter(
+            MatchResult.match_id == match_id
+        ).delete()
+
         # Delete the match
         db.delete(match)
+        db.flush()
+        head_to_head.refresh_pairs(db, *pairs)
+        refresh_week_summary(db, match.league_id, match.week_number)
         db.commit()
 
-        return {
-            "message": f"Successfully deleted match {match_id}",
-            "match_id": match_id,
-            "league_id": match.league_id,
-            "week_number": match.week_number
-        }
-
     except HTTPException:
         raise
     except Exception as e:
@@ -159,4 +230,12 @@ async def delete_match(match_id: int, db: Session = Depends(get_db)):
         raise HTTPException(
             status_code=500,
             detail=f"Failed to delete match: {str(e)}"
-        )
\ No newline at end of file
+        )
+
+    cache.invalidate_league(match.league_id)
+    return {
+        "message": f"Successfully deleted match {match_id}",
+        "match_id": match_id,
+        "league_id": match.league_id,
+        "week_number": match.week_number
+    }
\ No newline at end of file
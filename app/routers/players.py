@@ -1,8 +1,26 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List
+from sqlalchemy.orm import Session
+from ..models import schemas
 from ..models.schemas import Team
-from ..database import db
+from ..database import get_read_db
+from ..crud import head_to_head
 from datetime import datetime
 from app.models.base.models import *
 
 router = APIRouter(prefix="/players", tags=["players"])
+
+@router.get("/{player_id}/vs/{opponent_id}", response_model=schemas.PlayerHeadToHeadResponse)
+def get_player_head_to_head(
+    player_id: int,
+    opponent_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Record and latest hole-by-hole meetings of two players on opposing teams"""
+    if player_id == opponent_id:
+        raise HTTPException(status_code=400, detail="A player cannot face themselves")
+    found = db.query(Player.id).filter(Player.id.in_([player_id, opponent_id])).count()
+    if found < 2:
+        raise HTTPException(status_code=404, detail="Player not found")
+    return head_to_head.player_head_to_head(db, player_id, opponent_id, limit)
@@ -0,0 +1,29 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..database import get_read_db
+from ..models import schemas
+from ..query import execute
+
+router = APIRouter(prefix="/query", tags=["query"])
+
+@router.post("", response_model=schemas.BatchQueryResponse)
+def run_batch_query(batch: schemas.BatchQuery, db: Session = Depends(get_read_db)):
+    """Fetch several resources and their relations in one request
+
+    Example body for a league night page::
+
+        {"queries": {
+            "league": {"resource": "leagues", "where": {"id": 5},
+                       "include": {"course": {"include": {"holes": {}}},
+                                   "teams": {"include": {"players": {}}}}},
+            "week": {"resource": "matches", "where": {"league_id": 5, "week_number": 3},
+                     "include": {"result": {},
+                                 "scores": {"include": {"hole_scores": {}}}}}
+        }}
+    """
+    try:
+        return execute(db, {name: query.model_dump() for name, query in batch.queries.items()})
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to run query: {str(e)}")
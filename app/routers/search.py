@@ -0,0 +1,35 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from ..database import get_read_db
+from ..models import schemas
+from ..search import search, PLAYER, TEAM, COURSE
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+KINDS = {PLAYER, TEAM, COURSE}
+
+@router.get("", response_model=schemas.SearchResponse)
+def search_names(
+    q: str,
+    kinds: Optional[str] = None,
+    limit: int = 10,
+    db: Session = Depends(get_read_db)
+):
+    """Typeahead over player, team and course names
+
+    ``kinds`` is a comma-separated subset of player, team and course.
+    """
+    kind_filter = None
+    if kinds:
+        kind_filter = {kind.strip() for kind in kinds.split(",")}
+        unknown = kind_filter - KINDS
+        if unknown:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown search kinds: {', '.join(sorted(unknown))}"
+            )
+    if limit < 1 or limit > 50:
+        raise HTTPException(status_code=400, detail="Limit must be between 1 and 50")
+
+    return {"query": q, "results": search(db, q, kind_filter, limit)}
@@ -1,9 +1,11 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models import schemas
 from app.crud import teams as teams_crud
+from app.crud import head_to_head
+from app import cache
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
@@ -14,17 +16,73 @@ def create_team(team: schemas.TeamCreate, db: Session = Depends(get_db)):
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
 
+@router.post("/bulk", response_model=List[schemas.Team])
+def create_teams(teams: List[schemas.TeamCreate], db: Session = Depends(get_db)):
+    """Create many teams and their rosters in a few statements"""
+    try:
+        return teams_crud.create_teams(db, teams)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
 @router.get("/", response_model=List[schemas.Team])
-def get_teams(db: Session = Depends(get_db)):
+def get_teams(db: Session = Depends(get_read_db)):
     return teams_crud.get_teams(db)
 
 @router.get("/{team_id}")
-async def get_team_details(team_id: int, db: Session = Depends(get_db)):
+async def get_team_details(team_id: int, db: Session = Depends(get_read_db)):
     db_team = teams_crud.get_team(db, team_id)
     if not db_team:
         raise HTTPException(status_code=404, detail="Team not found")
     return db_team
 
+@router.get("/{team_id}/vs/{opponent_id}", response_model=schemas.TeamHeadToHeadResponse)
+def get_team_head_to_head(
+    team_id: int,
+    opponent_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    """Record and latest hole-by-hole meetings of two teams"""
+    if team_id == opponent_id:
+        raise HTTPException(status_code=400, detail="A team cannot face itself")
+    if not teams_crud.get_team(db, team_id) or not teams_crud.get_team(db, opponent_id):
+        raise HTTPException(status_code=404, detail="Team not found")
+    return head_to_head.team_head_to_head(db, team_id, opponent_id, limit)
+
+@router.put("/{team_id}/players", response_model=schemas.RosterUpdateResponse)
+def replace_roster(
+    team_id: int,
+    players: List[schemas.PlayerBase],
+    db: Session = Depends(get_db)
+):
+    """Replace a team's roster; players left out are taken off the team"""
+    return _update_roster(db, team_id, players, replace=True)
+
+@router.patch("/{team_id}/players", response_model=schemas.RosterUpdateResponse)
+def patch_roster(
+    team_id: int,
+    players: List[schemas.PlayerBase],
+    db: Session = Depends(get_db)
+):
+    """Add or update players without touching the rest of the roster"""
+    return _update_roster(db, team_id, players, replace=False)
+
+def _update_roster(db: Session, team_id: int, players, replace: bool):
+    if not teams_crud.get_team(db, team_id):
+        raise HTTPException(status_code=404, detail="Team not found")
+    try:
+        result = teams_crud.update_roster(db, team_id, players, replace)
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    # Handicaps and rosters feed cached league results
+    affected = [team_id] + result["moved_from_team_ids"]
+    for league_id in teams_crud.team_league_ids(db, affected):
+        cache.invalidate_league(league_id)
+    return result
+
 @router.delete("/{team_id}")
 def delete_team(team_id: int, db: Session = Depends(get_db)):
     try:
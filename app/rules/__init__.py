@@ -0,0 +1 @@
+# Scoring rules package
@@ -0,0 +1,187 @@
+"""Scoring format registry.
+
+Each format is a function over stroke arrays shaped (matches, players, holes)
+for both teams, returning per-hole points shaped (matches, holes) and total
+points shaped (matches,) for each team. Unplayed holes are NaN in float
+arrays; integer arrays (simulations) take the faster non-NaN path.
+
+``compile_format`` binds a format to a course layout once, so scoring a week
+or a batch of simulations is a handful of array operations. Prefixing any
+format name with ``net_`` scores net of each player's handicap strokes.
+"""
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_FORMAT = "best_ball_aggregate"
+NET_PREFIX = "net_"
+
+_formats = {}
+
+
+def scoring_format(name: str):
+    """Register a scoring format under ``name``"""
+    def decorator(func):
+        _formats[name] = func
+        return func
+    return decorator
+
+
+def available_formats() -> List[str]:
+    return sorted(_formats) + sorted(NET_PREFIX + name for name in _formats)
+
+
+def is_valid_format(name: str) -> bool:
+    return _base_name(name) in _formats
+
+
+def _base_name(name: str) -> str:
+    return name[len(NET_PREFIX):] if name.startswith(NET_PREFIX) else name
+
+
+def player_handicap(league_average: Optional[float], course_par: int) -> int:
+    """Strokes a player receives over the course, from their league average"""
+    if league_average is None:
+        return 0
+    return max(0, int(round(league_average - course_par)))
+
+
+def cards_to_strokes(cards: Sequence[Dict[int, int]], hole_numbers: Sequence[int]) -> np.ndarray:
+    """Stack {hole_number: strokes} cards into a (1, players, holes) array"""
+    strokes = np.full((1, len(cards), len(hole_numbers)), np.nan)
+    for p, card in enumerate(cards):
+        for h, number in enumerate(hole_numbers):
+            if card.get(number) is not None:
+                strokes[0, p, h] = card[number]
+    return strokes
+
+
+def allocation_rank(stroke_index: Sequence[int]) -> np.ndarray:
+    """0 for the hardest hole, which receives handicap strokes first"""
+    return np.argsort(np.argsort(stroke_index, kind="stable"), kind="stable")
+
+
+def allocate_strokes(handicaps, rank: np.ndarray) -> np.ndarray:
+    """Per-hole strokes for handicaps shaped (players,) or (matches, players)"""
+    handicaps = np.asarray(handicaps, dtype=np.int64)
+    base, extra = np.divmod(handicaps, max(len(rank), 1))
+    return base[..., None] + (rank < extra[..., None])
+
+
+class CompiledFormat:
+    """A scoring format bound to one course layout"""
+
+    def __init__(self, name: str, pars: Sequence[int], stroke_index: Sequence[int]):
+        if not is_valid_format(name):
+            raise ValueError(f"Unknown scoring format: {name}")
+        self.name = name
+        self.net = name.startswith(NET_PREFIX)
+        self._score = _formats[_base_name(name)]
+        self.pars = np.asarray(pars, dtype=np.int64)
+        self.allocation_rank = allocation_rank(stroke_index)
+
+    def strokes_received(self, handicaps) -> np.ndarray:
+        return allocate_strokes(handicaps, self.allocation_rank)
+
+    def __call__(self, team1, team2, team1_handicaps=None, team2_handicaps=None):
+        if self.net:
+            if team1_handicaps is not None:
+                team1 = team1 - self.strokes_received(team1_handicaps)
+            if team2_handicaps is not None:
+                team2 = team2 - self.strokes_received(team2_handicaps)
+        return self._score(team1, team2, self.pars)
+
+
+@lru_cache(maxsize=128)
+def compile_format(name: str, pars: tuple, stroke_index: tuple) -> CompiledFormat:
+    return CompiledFormat(name, pars, stroke_index)
+
+
+def _best(strokes):
+    return np.fmin.reduce(strokes, axis=1)
+
+
+def _total(strokes):
+    if strokes.dtype.kind == "f":
+        return np.nansum(strokes, axis=1)
+    return strokes.sum(axis=1)
+
+
+def _played(best1, best2):
+    if best1.dtype.kind == "f":
+        return ~np.isnan(best1) & ~np.isnan(best2)
+    return np.ones(best1.shape, dtype=bool)
+
+
+def _lower_wins(score1, score2, played):
+    return (score1 < score2) & played, (score2 < score1) & played
+
+
+def _totals(hole1, hole2):
+    hole1 = hole1.astype(np.float64)
+    hole2 = hole2.astype(np.float64)
+    return hole1, hole2, hole1.sum(axis=-1), hole2.sum(axis=-1)
+
+
+@scoring_format("best_ball")
+def best_ball(team1, team2, pars):
+    """One point per hole for the lower individual score"""
+    best1, best2 = _best(team1), _best(team2)
+    return _totals(*_lower_wins(best1, best2, _played(best1, best2)))
+
+
+@scoring_format("aggregate")
+def aggregate(team1, team2, pars):
+    """One point per hole for the lower team total"""
+    played = _played(_best(team1), _best(team2))
+    return _totals(*_lower_wins(_total(team1), _total(team2), played))
+
+
+@scoring_format("best_ball_aggregate")
+def best_ball_aggregate(team1, team2, pars):
+    """One point for best ball and one for team total on every hole"""
+    best1, best2 = _best(team1), _best(team2)
+    played = _played(best1, best2)
+    ball1, ball2 = _lower_wins(best1, best2, played)
+    total1, total2 = _lower_wins(_total(team1), _total(team2), played)
+    return _totals(ball1.astype(np.int8) + total1, ball2.astype(np.int8) + total2)
+
+
+@scoring_format("match_play")
+def match_play(team1, team2, pars):
+    """Best-ball match play: one point for the match, halves split it"""
+    best1, best2 = _best(team1), _best(team2)
+    played = _played(best1, best2)
+    hole1, hole2, won1, won2 = _totals(*_lower_wins(best1, best2, played))
+    any_played = played.any(axis=-1)
+    total1 = np.where(won1 > won2, 1.0, np.where(won1 == won2, 0.5, 0.0)) * any_played
+    total2 = np.where(won2 > won1, 1.0, np.where(won1 == won2, 0.5, 0.0)) * any_played
+    return hole1, hole2, total1, total2
+
+
+@scoring_format("stableford")
+def stableford(team1, team2, pars):
+    """Team Stableford: 2 points for par, one more per stroke under"""
+    points1 = np.nan_to_num(np.clip(2 + pars - team1, 0, None)).sum(axis=1)
+    points2 = np.nan_to_num(np.clip(2 + pars - team2, 0, None)).sum(axis=1)
+    return _totals(points1, points2)
+
+
+@scoring_format("skins")
+def skins(team1, team2, pars):
+    """A skin per hole for an outright low score, ties carry over"""
+    best1, best2 = _best(team1), _best(team2)
+    played = _played(best1, best2)
+    won1, won2 = _lower_wins(best1, best2, played)
+
+    hole1 = np.zeros(best1.shape)
+    hole2 = np.zeros(best2.shape)
+    carry = np.ones(best1.shape[:-1])
+    for h in range(best1.shape[-1]):
+        hole1[..., h] = np.where(won1[..., h], carry, 0)
+        hole2[..., h] = np.where(won2[..., h], carry, 0)
+        carry = np.where(
+            won1[..., h] | won2[..., h], 1, np.where(played[..., h], carry + 1, carry)
+        )
+    return _totals(hole1, hole2)
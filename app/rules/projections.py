@@ -0,0 +1,229 @@
+"""Monte Carlo standings projections.
+
+Every remaining match is simulated by sampling each player's strokes from
+their historical distribution on each hole of the league course and scoring
+the sampled cards with the league rules. All simulations of a chunk are one
+NumPy array scored by the league's compiled format, and chunks are spread
+over a process pool.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.base.models import (
+    League, LeagueTeam, Team, Player, Hole, Match, PlayerScore, HoleScore
+)
+from .formats import DEFAULT_FORMAT, compile_format, player_handicap
+from .scoring import calculate_card_points
+
+# Samples kept per (player, hole); longer histories are subsampled to this size
+POOL_SIZE = 64
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        # Workers start on first use, long after the server's threads; a
+        # forked child could inherit a lock some thread held mid-fork
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.PROJECTION_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _pool
+
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def build_model(db: Session, league: League) -> dict:
+    """Collect standings so far, remaining matches and stroke distributions"""
+    holes = db.query(Hole).filter(Hole.course_id == league.course_id)\
+        .order_by(Hole.number).all()
+    hole_index = {h.id: i for i, h in enumerate(holes)}
+    course_par = sum(h.par or 0 for h in holes)
+    scoring_format = league.scoring_format or DEFAULT_FORMAT
+
+    teams = db.query(Team).join(LeagueTeam)\
+        .filter(LeagueTeam.league_id == league.id)\
+        .order_by(Team.id).all()
+    team_index = {t.id: i for i, t in enumerate(teams)}
+    players = db.query(Player.id, Player.team_id, Player.league_average)\
+        .filter(Player.team_id.in_(list(team_index)))\
+        .order_by(Player.id).all()
+    player_index = {player_id: i for i, (player_id, _, _) in enumerate(players)}
+    handicaps = np.array(
+        [player_handicap(average, course_par) for _, _, average in players], dtype=np.int64
+    )
+    rosters = {team_id: [] for team_id in team_index}
+    for player_id, team_id, _ in players:
+        rosters[team_id].append(player_index[player_id])
+
+    # Every stroke these players have recorded on this course
+    history = db.query(PlayerScore.player_id, HoleScore.hole_id, HoleScore.strokes)\
+        .join(HoleScore, HoleScore.player_score_id == PlayerScore.id)\
+        .filter(
+            PlayerScore.player_id.in_(list(player_index)),
+            HoleScore.hole_id.in_(list(hole_index))
+        ).all()
+    observed = [[[] for _ in holes] for _ in players]
+    field = [[] for _ in holes]
+    for player_id, hole_id, strokes in history:
+        observed[player_index[player_id]][hole_index[hole_id]].append(strokes)
+        field[hole_index[hole_id]].append(strokes)
+
+    # Simulations draw uniformly from the first pool_counts[p, h] entries
+    rng = np.random.default_rng()
+    pool = np.zeros((len(players), len(holes), POOL_SIZE), dtype=np.int16)
+    pool_counts = np.zeros((len(players), len(holes)), dtype=np.int64)
+    for h, hole in enumerate(holes):
+        par = hole.par or 4
+        fallback = field[h] or [par, par + 1, par + 1, par + 2]
+        for p in range(len(players)):
+            samples = np.array(observed[p][h] or fallback, dtype=np.int16)
+            if len(samples) > POOL_SIZE:
+                samples = rng.choice(samples, POOL_SIZE, replace=False)
+            pool[p, h, :len(samples)] = samples
+            pool_counts[p, h] = len(samples)
+
+    matches = db.query(Match).filter(Match.league_id == league.id).all()
+    # The league's partition of hole_scores holds every card of its matches
+    played = db.query(
+            HoleScore.match_id,
+            HoleScore.player_id,
+            HoleScore.team_id,
+            HoleScore.hole_number,
+            HoleScore.strokes
+        )\
+        .filter(HoleScore.league_id == league.id)\
+        .all()
+    cards = {}
+    for match_id, player_id, team_id, hole_number, strokes in played:
+        cards.setdefault(match_id, {}).setdefault((team_id, player_id), {})[hole_number] = strokes
+
+    current_points = np.zeros(len(teams))
+    remaining = []
+    for match in matches:
+        if match.team1_id not in team_index or match.team2_id not in team_index:
+            continue
+        match_cards = cards.get(match.id)
+        if match_cards:
+            team1_cards = [(p, c) for (t, p), c in match_cards.items() if t == match.team1_id]
+            team2_cards = [(p, c) for (t, p), c in match_cards.items() if t == match.team2_id]
+            points = calculate_card_points(
+                [c for _, c in team1_cards],
+                [c for _, c in team2_cards],
+                holes,
+                scoring_format,
+                [_handicap(handicaps, player_index, p) for p, _ in team1_cards],
+                [_handicap(handicaps, player_index, p) for p, _ in team2_cards]
+            )
+            current_points[team_index[match.team1_id]] += points['team1_points']
+            current_points[team_index[match.team2_id]] += points['team2_points']
+        elif rosters[match.team1_id] and rosters[match.team2_id]:
+            remaining.append((
+                team_index[match.team1_id],
+                team_index[match.team2_id],
+                np.array(rosters[match.team1_id]),
+                np.array(rosters[match.team2_id])
+            ))
+
+    return {
+        "teams": [(t.id, t.name) for t in teams],
+        "current_points": current_points,
+        "pool": pool,
+        "pool_counts": pool_counts,
+        "handicaps": handicaps,
+        "remaining": remaining,
+        "scoring_format": scoring_format,
+        "pars": tuple(h.par or 0 for h in holes),
+        "stroke_index": tuple(h.handicap or h.number for h in holes)
+    }
+
+
+def _handicap(handicaps, player_index, player_id) -> int:
+    index = player_index.get(player_id)
+    return int(handicaps[index]) if index is not None else 0
+
+
+def simulate_chunk(model: dict, simulations: int, seed: int) -> np.ndarray:
+    """Final points per team for ``simulations`` seasons, shaped (sims, teams)"""
+    rng = np.random.default_rng(seed)
+    compiled = compile_format(model["scoring_format"], model["pars"], model["stroke_index"])
+    pool = model["pool"]
+    holes = np.arange(pool.shape[1])
+    points = np.tile(model["current_points"], (simulations, 1))
+
+    def sample(players):
+        counts = model["pool_counts"][players[:, None], holes[None, :]]
+        draws = (rng.random((simulations, len(players), len(holes))) * counts[None]).astype(np.int64)
+        return pool[players[None, :, None], holes[None, None, :], draws]
+
+    for team1, team2, players1, players2 in model["remaining"]:
+        strokes1 = sample(players1)
+        strokes2 = sample(players2)
+        _, _, points1, points2 = compiled(
+            strokes1, strokes2, model["handicaps"][players1], model["handicaps"][players2]
+        )
+        points[:, team1] += points1
+        points[:, team2] += points2
+
+    return points
+
+
+def summarize(model: dict, points: np.ndarray, playoff_spots: int, seed: int) -> list:
+    simulations, team_count = points.shape
+    # Random jitter breaks ties evenly between teams level on points
+    jitter = np.random.default_rng(seed).random(points.shape) * 1e-3
+    order = np.argsort(-(points + jitter), axis=1)
+    ranks = np.empty_like(order)
+    ranks[np.arange(simulations)[:, None], order] = np.arange(team_count)[None, :]
+
+    return [
+        {
+            "team_id": team_id,
+            "name": name,
+            "current_points": float(model["current_points"][i]),
+            "expected_points": float(points[:, i].mean()),
+            "first_place_odds": float((ranks[:, i] == 0).mean()),
+            "playoff_odds": float((ranks[:, i] < playoff_spots).mean())
+        }
+        for i, (team_id, name) in enumerate(model["teams"])
+    ]
+
+
+async def project_league(db: Session, league: League, simulations: int, playoff_spots: int) -> dict:
+    model = build_model(db, league)
+    if not model["teams"]:
+        return {
+            "league_id": league.id,
+            "simulations": 0,
+            "remaining_matches": 0,
+            "teams": []
+        }
+
+    chunks = settings.PROJECTION_PROCESSES
+    sizes = [simulations // chunks + (1 if i < simulations % chunks else 0) for i in range(chunks)]
+    seeds = np.random.SeedSequence().generate_state(chunks + 1)
+    loop = asyncio.get_running_loop()
+    results = await asyncio.gather(*[
+        loop.run_in_executor(get_pool(), simulate_chunk, model, size, int(seed))
+        for size, seed in zip(sizes, seeds) if size
+    ])
+
+    return {
+        "league_id": league.id,
+        "simulations": simulations,
+        "remaining_matches": len(model["remaining"]),
+        "teams": summarize(model, np.concatenate(results), playoff_spots, int(seeds[-1]))
+    }
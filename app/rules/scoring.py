@@ -1,49 +1,119 @@
+import numpy as np
+
+from .formats import DEFAULT_FORMAT, cards_to_strokes, compile_format, player_handicap
+
 def calculate_match_points(match, scores):
+    holes = match.league.course.holes
+    course_par = sum(hole.par or 0 for hole in holes)
+    team1_scores = [s for s in scores if score_team_id(s) == match.team1_id]
+    team2_scores = [s for s in scores if score_team_id(s) == match.team2_id]
+
+    results = calculate_card_points(
+        [player_card(s) for s in team1_scores],
+        [player_card(s) for s in team2_scores],
+        holes,
+        match.league.scoring_format or DEFAULT_FORMAT,
+        [player_handicap(s.player.league_average if s.player else None, course_par) for s in team1_scores],
+        [player_handicap(s.player.league_average if s.player else None, course_par) for s in team2_scores]
+    )
+    results['match_id'] = match.id
+    return results
+
+def calculate_card_points(
+    team1_cards,
+    team2_cards,
+    holes,
+    scoring_format=DEFAULT_FORMAT,
+    team1_handicaps=None,
+    team2_handicaps=None
+):
+    """Score a match from plain scorecards with the league's format.
+
+    Each card maps hole number to strokes for one player; ``holes`` are the
+    course holes (anything with number, par and handicap attributes).
+    """
     results = {
-        'match_id': match.id,
         'team1_points': 0,
         'team2_points': 0,
         'hole_results': []
     }
-    
-    for hole_number in range(1, match.league.course.holes.count() + 1):
-        hole_result = calculate_hole_points(
-            match.team1_id,
-            match.team2_id,
-            scores,
-            hole_number
-        )
-        results['hole_results'].append(hole_result)
-        results['team1_points'] += hole_result['points_team1']
-        results['team2_points'] += hole_result['points_team2']
-    
+    if not team1_cards or not team2_cards or not holes:
+        return results
+
+    holes = sorted(holes, key=lambda hole: hole.number)
+    hole_numbers = [hole.number for hole in holes]
+    compiled = compile_format(
+        scoring_format,
+        tuple(hole.par or 0 for hole in holes),
+        tuple(hole.handicap or hole.number for hole in holes)
+    )
+    team1_strokes = cards_to_strokes(team1_cards, hole_numbers)
+    team2_strokes = cards_to_strokes(team2_cards, hole_numbers)
+    hole1, hole2, total1, total2 = compiled(
+        team1_strokes, team2_strokes, team1_handicaps, team2_handicaps
+    )
+
+    # Holes not played (yet) by one of the teams are left out
+    played = ~np.isnan(team1_strokes[0]).all(axis=0) & ~np.isnan(team2_strokes[0]).all(axis=0)
+    results['team1_points'] = float(total1[0])
+    results['team2_points'] = float(total2[0])
+    results['hole_results'] = [
+        {
+            'hole_number': number,
+            'points_team1': float(hole1[0, h]),
+            'points_team2': float(hole2[0, h])
+        }
+        for h, number in enumerate(hole_numbers) if played[h]
+    ]
     return results
 
+def score_team_id(player_score):
+    """Team a scorecard counts for, falling back to the player's current team"""
+    if player_score.team_id is not None:
+        return player_score.team_id
+    return player_score.player.team_id if player_score.player else None
+
+def player_card(player_score):
+    return {
+        hole_score.hole.number: hole_score.strokes
+        for hole_score in player_score.hole_scores
+    }
+
 def calculate_hole_points(team1_id, team2_id, scores, hole_number):
-    team1_scores = [s for s in scores if s.team_id == team1_id]
-    team2_scores = [s for s in scores if s.team_id == team2_id]
-    
-    team1_best = min(ps.hole_scores[hole_number-1].strokes for ps in team1_scores)
-    team2_best = min(ps.hole_scores[hole_number-1].strokes for ps in team2_scores)
-    
-    team1_total = sum(ps.hole_scores[hole_number-1].strokes for ps in team1_scores)
-    team2_total = sum(ps.hole_scores[hole_number-1].strokes for ps in team2_scores)
-    
+    return score_hole(
+        [player_card(s).get(hole_number) for s in scores if score_team_id(s) == team1_id],
+        [player_card(s).get(hole_number) for s in scores if score_team_id(s) == team2_id],
+        hole_number
+    )
+
+def score_hole(team1_strokes, team2_strokes, hole_number):
+    team1_strokes = [strokes for strokes in team1_strokes if strokes is not None]
+    team2_strokes = [strokes for strokes in team2_strokes if strokes is not None]
+
+    if not team1_strokes or not team2_strokes:
+        return None
+
+    team1_best = min(team1_strokes)
+    team2_best = min(team2_strokes)
+
+    team1_total = sum(team1_strokes)
+    team2_total = sum(team2_strokes)
+
     points_team1 = 0
     points_team2 = 0
-    
+
     # Point for best individual score
     if team1_best < team2_best:
         points_team1 += 1
     elif team2_best < team1_best:
         points_team2 += 1
-    
+
     # Point for team total
     if team1_total < team2_total:
         points_team1 += 1
     elif team2_total < team1_total:
         points_team2 += 1
-    
+
     return {
         'hole_number': hole_number,
         'team1_best_player_score': team1_best,
@@ -52,4 +122,4 @@ def calculate_hole_points(team1_id, team2_id, scores, hole_number):
         'team2_total_score': team2_total,
         'points_team1': points_team1,
         'points_team2': points_team2
-    }
\ No newline at end of file
+    }
@@ -0,0 +1,127 @@
+"""Weekly skins across the whole field.
+
+All of a week's cards form one players x holes matrix; a hole's skin goes to
+the only player holding the column minimum, and tied holes carry their
+value to the next hole.
+"""
+from typing import List
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.base.models import League, Match, Player, HoleScore, Hole
+from .formats import allocate_strokes, allocation_rank, player_handicap
+
+
+def compute_skins(strokes: np.ndarray):
+    """Skins for a (players, holes) matrix with NaN for holes not played.
+
+    Returns per hole whether a skin was won, the winning row, the skin's
+    value including carryovers, and the value still carried after the last
+    hole.
+    """
+    low = np.fmin.reduce(strokes, axis=0)
+    is_low = strokes == low[None, :]
+    won = is_low.sum(axis=0) == 1
+    winners = is_low.argmax(axis=0)
+    played = ~np.isnan(low)
+
+    values = np.zeros(strokes.shape[1])
+    carry = 1
+    for h in range(strokes.shape[1]):
+        if won[h]:
+            values[h] = carry
+            carry = 1
+        elif played[h]:
+            carry += 1
+    return won, winners, values, carry - 1
+
+
+def week_skins(db: Session, league: League, week_number: int) -> dict:
+    holes = db.query(Hole).filter(Hole.course_id == league.course_id)\
+        .order_by(Hole.number).all()
+    hole_index = {h.id: i for i, h in enumerate(holes)}
+    course_par = sum(h.par or 0 for h in holes)
+
+    week_matches = db.query(Match.id).filter(
+        Match.league_id == league.id,
+        Match.week_number == week_number
+    )
+    rows = db.query(
+            HoleScore.player_id,
+            Player.first_name,
+            Player.last_name,
+            Player.league_average,
+            func.coalesce(HoleScore.team_id, Player.team_id),
+            HoleScore.hole_id,
+            HoleScore.strokes
+        )\
+        .join(Player, Player.id == HoleScore.player_id)\
+        .filter(
+            HoleScore.league_id == league.id,
+            HoleScore.match_id.in_(week_matches)
+        )\
+        .all()
+
+    players = {}
+    for player_id, first_name, last_name, league_average, team_id, _, _ in rows:
+        players.setdefault(player_id, {
+            "player_id": player_id,
+            "name": f"{first_name} {last_name}",
+            "team_id": team_id,
+            "handicap": player_handicap(league_average, course_par)
+        })
+    player_list = list(players.values())
+    player_index = {p["player_id"]: i for i, p in enumerate(player_list)}
+
+    gross = np.full((len(player_list), len(holes)), np.nan)
+    for player_id, _, _, _, _, hole_id, strokes in rows:
+        if hole_id in hole_index:
+            gross[player_index[player_id], hole_index[hole_id]] = strokes
+
+    received = allocate_strokes(
+        [p["handicap"] for p in player_list],
+        allocation_rank([h.handicap or h.number for h in holes])
+    )
+    net = gross - received
+
+    return {
+        "league_id": league.id,
+        "week_number": week_number,
+        "players": len(player_list),
+        "gross": _skins_result(gross, holes, player_list),
+        "net": _skins_result(net, holes, player_list)
+    }
+
+
+def _skins_result(strokes: np.ndarray, holes: List[Hole], players: List[dict]) -> dict:
+    if not players or not holes:
+        return {"skins": [], "carried_over": 0, "totals": []}
+
+    won, winners, values, carried_over = compute_skins(strokes)
+    skins = []
+    totals = {}
+    for h, hole in enumerate(holes):
+        if not won[h]:
+            continue
+        player = players[winners[h]]
+        skins.append({
+            "hole_number": hole.number,
+            "player_id": player["player_id"],
+            "name": player["name"],
+            "team_id": player["team_id"],
+            "strokes": float(strokes[winners[h], h]),
+            "value": int(values[h])
+        })
+        totals[player["player_id"]] = totals.get(player["player_id"], 0) + int(values[h])
+
+    return {
+        "skins": skins,
+        "carried_over": int(carried_over),
+        "totals": [
+            {"player_id": p["player_id"], "name": p["name"], "skins": totals[p["player_id"]]}
+            for p in sorted(players, key=lambda p: -totals.get(p["player_id"], 0))
+            if p["player_id"] in totals
+        ]
+    }
@@ -0,0 +1,149 @@
+"""Week summary: per-hole field statistics and low rounds.
+
+A week's cards are loaded in one query into a players x holes matrix
+(NaN for holes not played) and reduced with NumPy. Only complete rounds
+count towards low gross, low net and the field average.
+"""
+from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.base.models import (
+    League, Match, Player, HoleScore, Hole, WeekSummary
+)
+from .formats import player_handicap
+
+
+def week_summary(db: Session, league: League, week_number: int) -> Optional[dict]:
+    """Summary of a league week, or None when nothing has been scored"""
+    holes = db.query(Hole).filter(Hole.course_id == league.course_id)\
+        .order_by(Hole.number).all()
+    hole_index = {h.id: i for i, h in enumerate(holes)}
+    pars = np.array([h.par or 0 for h in holes], dtype=np.float64)
+    course_par = int(pars.sum())
+
+    week_matches = db.query(Match.id).filter(
+        Match.league_id == league.id,
+        Match.week_number == week_number
+    )
+    rows = db.query(
+            HoleScore.player_id,
+            Player.first_name,
+            Player.last_name,
+            Player.league_average,
+            func.coalesce(HoleScore.team_id, Player.team_id),
+            HoleScore.hole_id,
+            HoleScore.strokes
+        )\
+        .join(Player, Player.id == HoleScore.player_id)\
+        .filter(
+            HoleScore.league_id == league.id,
+            HoleScore.match_id.in_(week_matches)
+        )\
+        .all()
+    if not rows or not holes:
+        return None
+
+    players = {}
+    for player_id, first_name, last_name, league_average, team_id, _, _ in rows:
+        players.setdefault(player_id, {
+            "player_id": player_id,
+            "name": f"{first_name} {last_name}",
+            "team_id": team_id,
+            "handicap": player_handicap(league_average, course_par)
+        })
+    player_list = list(players.values())
+    player_index = {p["player_id"]: i for i, p in enumerate(player_list)}
+
+    strokes = np.full((len(player_list), len(holes)), np.nan)
+    for player_id, _, _, _, _, hole_id, hole_strokes in rows:
+        if hole_id in hole_index and hole_strokes is not None:
+            strokes[player_index[player_id], hole_index[hole_id]] = hole_strokes
+
+    played = ~np.isnan(strokes)
+    counts = played.sum(axis=0)
+    with np.errstate(invalid="ignore"):
+        averages = np.nansum(strokes, axis=0) / np.where(counts, counts, np.nan)
+    to_par = strokes - pars[None, :]
+
+    hole_summaries = []
+    for h, hole in enumerate(holes):
+        if not counts[h]:
+            continue
+        column = to_par[played[:, h], h]
+        hole_summaries.append({
+            "hole_number": hole.number,
+            "par": hole.par,
+            "handicap": hole.handicap,
+            "scores": int(counts[h]),
+            "average": round(float(averages[h]), 2),
+            "to_par": round(float(averages[h] - pars[h]), 2),
+            "low": int(np.nanmin(strokes[:, h])),
+            "high": int(np.nanmax(strokes[:, h])),
+            "birdies_or_better": int((column < 0).sum()),
+            "pars": int((column == 0).sum()),
+            "bogeys_or_worse": int((column > 0).sum())
+        })
+
+    complete = played.all(axis=1)
+    gross = np.nansum(strokes, axis=1)
+    handicaps = np.array([p["handicap"] for p in player_list])
+    net = gross - handicaps
+    rounds = [
+        dict(
+            player_id=p["player_id"], name=p["name"], team_id=p["team_id"],
+            gross=int(gross[i]), net=int(net[i])
+        )
+        for i, p in enumerate(player_list) if complete[i]
+    ]
+
+    by_difficulty = sorted(hole_summaries, key=lambda s: s["to_par"])
+    return {
+        "league_id": league.id,
+        "week_number": week_number,
+        "players": len(player_list),
+        "complete_rounds": len(rounds),
+        "field_average": round(float(gross[complete].mean()), 2) if rounds else None,
+        "hardest_hole": by_difficulty[-1]["hole_number"] if by_difficulty else None,
+        "easiest_hole": by_difficulty[0]["hole_number"] if by_difficulty else None,
+        "low_gross": _lowest(rounds, "gross"),
+        "low_net": _lowest(rounds, "net"),
+        "holes": hole_summaries
+    }
+
+
+def refresh_week_summary(db: Session, league_id: int, week_number: int):
+    """Recompute the stored summary of one week, dropping it if nothing is scored"""
+    league = db.query(League).filter(League.id == league_id).first()
+    summary = week_summary(db, league, week_number) if league else None
+    if summary is None:
+        db.query(WeekSummary).filter(
+            WeekSummary.league_id == league_id,
+            WeekSummary.week_number == week_number
+        ).delete()
+        return
+    db.merge(WeekSummary(
+        league_id=league_id,
+        week_number=week_number,
+        summary=summary,
+        computed_at=datetime.utcnow()
+    ))
+
+
+def drop_week_summaries(db: Session, league_ids: List[int]):
+    """Delete every stored week summary of ``league_ids``; reads compute
+    them on the fly until the weeks are recomputed"""
+    if league_ids:
+        db.query(WeekSummary).filter(WeekSummary.league_id.in_(league_ids))\
+            .delete(synchronize_session=False)
+
+
+def _lowest(rounds: list, key: str) -> list:
+    """Every round tied for the lowest ``key``"""
+    if not rounds:
+        return []
+    low = min(r[key] for r in rounds)
+    return [r for r in rounds if r[key] == low]
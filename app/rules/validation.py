@@ -0,0 +1,138 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Set, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, joinedload, selectinload
+
+from app.models.base.models import Match, League, Course, Team
+
+
+def score_error(code, message, match_id=None, player_id=None, hole_id=None):
+    return {
+        "code": code,
+        "message": message,
+        "match_id": match_id,
+        "player_id": player_id,
+        "hole_id": hole_id
+    }
+
+
+def load_match_for_scoring(db: Session, match_id: int):
+    """Load a match with its course holes and both rosters.
+
+    The league, course and teams are joined into the match query; holes and
+    rosters are collections and each get their own IN query, since joining
+    all three would return holes x team1 players x team2 players rows.
+    """
+    return db.query(Match)\
+        .options(
+            joinedload(Match.league).joinedload(League.course).selectinload(Course.holes),
+            joinedload(Match.team1).selectinload(Team.players),
+            joinedload(Match.team2).selectinload(Team.players)
+        )\
+        .filter(Match.id == match_id)\
+        .first()
+
+
+def validate_player_scores(
+    match_id: int,
+    team1_id: int,
+    team2_id: int,
+    rosters: Dict[int, Set[int]],
+    course_hole_ids: Set[int],
+    player_scores: Iterable
+) -> Tuple[List[dict], Dict[int, int]]:
+    """Check a match's submitted cards against its rosters and course.
+
+    Returns the list of errors and the team each valid player scores for.
+    """
+    player_scores = list(player_scores)
+    errors = []
+
+    team1_players = rosters.get(team1_id, set())
+    team2_players = rosters.get(team2_id, set())
+    player_counts = Counter(ps.player_id for ps in player_scores)
+
+    for player_id in sorted(set(player_counts) - team1_players - team2_players):
+        errors.append(score_error(
+            "player_not_in_match",
+            f"Player {player_id} does not play for team {team1_id} or team {team2_id}",
+            match_id=match_id,
+            player_id=player_id
+        ))
+    for player_id, count in sorted(player_counts.items()):
+        if count > 1:
+            errors.append(score_error(
+                "duplicate_player",
+                f"Player {player_id} submitted {count} times",
+                match_id=match_id,
+                player_id=player_id
+            ))
+
+    for player_score in player_scores:
+        hole_counts = Counter(s.hole_id for s in player_score.scores)
+        for hole_id in sorted(set(hole_counts) - course_hole_ids):
+            errors.append(score_error(
+                "hole_not_on_course",
+                f"Hole {hole_id} is not on the league course",
+                match_id=match_id,
+                player_id=player_score.player_id,
+                hole_id=hole_id
+            ))
+        for hole_id, count in sorted(hole_counts.items()):
+            if count > 1:
+                errors.append(score_error(
+                    "duplicate_hole",
+                    f"Hole {hole_id} submitted {count} times",
+                    match_id=match_id,
+                    player_id=player_score.player_id,
+                    hole_id=hole_id
+                ))
+        for s in player_score.scores:
+            if s.strokes < 1:
+                errors.append(score_error(
+                    "invalid_strokes",
+                    f"Strokes must be at least 1, got {s.strokes}",
+                    match_id=match_id,
+                    player_id=player_score.player_id,
+                    hole_id=s.hole_id
+                ))
+
+    team_ids = {player_id: team1_id for player_id in team1_players & player_counts.keys()}
+    team_ids.update({player_id: team2_id for player_id in team2_players & player_counts.keys()})
+    return errors, team_ids
+
+
+def validate_match_submission(match: Match, player_scores) -> Tuple[List[dict], Dict[int, int]]:
+    """Validate cards for a match loaded by ``load_match_for_scoring``"""
+    course = match.league.course if match.league else None
+    if not course:
+        return [score_error(
+            "no_course",
+            f"No course assigned to league {match.league_id}",
+            match_id=match.id
+        )], {}
+
+    rosters = {
+        match.team1_id: {p.id for p in match.team1.players},
+        match.team2_id: {p.id for p in match.team2.players}
+    }
+    return validate_player_scores(
+        match.id,
+        match.team1_id,
+        match.team2_id,
+        rosters,
+        {hole.id for hole in course.holes},
+        player_scores
+    )
+
+
+def raise_for_errors(errors: List[dict]):
+    if errors:
+        raise HTTPException(
+            status_code=422,
+            detail={
+                "message": f"Score submission has {len(errors)} errors",
+                "errors": errors
+            }
+        )
@@ -0,0 +1,17 @@
+from typing import List, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from .index import (
+    search_index, SearchDoc, player_doc, team_doc, course_doc, PLAYER, TEAM, COURSE
+)
+from .fulltext import fulltext_search
+
+
+def search(db: Session, query: str, kinds: Optional[Set[str]] = None, limit: int = 10) -> List[SearchDoc]:
+    """Search with the configured backend"""
+    if settings.SEARCH_BACKEND == "mysql":
+        return fulltext_search(db, query, kinds, limit)
+    search_index.ensure_built(db)
+    return search_index.search(query, kinds, limit)
@@ -0,0 +1,37 @@
+"""MySQL FULLTEXT search backend.
+
+Answers the same queries as the in-memory index straight from the
+database using the FULLTEXT indexes on player, team and course names.
+Each query word is matched as a required prefix (``+word*``).
+"""
+from typing import List, Optional, Set
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from .index import SearchDoc, PLAYER, TEAM, COURSE, tokenize
+
+QUERIES = {
+    PLAYER: "SELECT id, CONCAT_WS(' ', first_name, last_name) FROM players "
+            "WHERE MATCH(first_name, last_name) AGAINST(:q IN BOOLEAN MODE) LIMIT :limit",
+    TEAM: "SELECT id, name FROM teams "
+          "WHERE MATCH(name) AGAINST(:q IN BOOLEAN MODE) LIMIT :limit",
+    COURSE: "SELECT id, name FROM courses "
+            "WHERE MATCH(name) AGAINST(:q IN BOOLEAN MODE) LIMIT :limit",
+}
+
+
+def fulltext_search(db: Session, query: str, kinds: Optional[Set[str]] = None, limit: int = 10) -> List[SearchDoc]:
+    words = tokenize(query)
+    if not words:
+        return []
+    boolean_query = " ".join(f"+{word}*" for word in words)
+    docs = []
+    for kind, sql in QUERIES.items():
+        if kinds is None or kind in kinds:
+            rows = db.execute(text(sql), {"q": boolean_query, "limit": limit})
+            docs += [SearchDoc(kind, row_id, name) for row_id, name in rows]
+
+    lowered = query.strip().lower()
+    docs.sort(key=lambda d: (not d.name.lower().startswith(lowered), len(d.name), d.name))
+    return docs[:limit]
@@ -0,0 +1,182 @@
+"""In-memory typeahead index over player, team and course names.
+
+Every prefix of every word in a name maps to the documents containing it,
+so a query is one dict lookup per query word plus a set intersection.
+Words that match no prefix fall back to a trigram index for matches inside
+a word. Writers update the index incrementally and broadcast the change to
+the other workers over the shared cache backend's pub/sub.
+"""
+import json
+import logging
+import re
+import threading
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.base.models import Player, Team, Course
+
+UPDATES_CHANNEL = "search:update"
+PLAYER = "player"
+TEAM = "team"
+COURSE = "course"
+
+# Longer prefixes are rare in typeahead and only cost memory
+MAX_PREFIX = 20
+
+DocKey = Tuple[str, int]
+
+
+@dataclass(frozen=True)
+class SearchDoc:
+    kind: str
+    id: int
+    name: str
+
+
+def tokenize(text: str) -> List[str]:
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def _trigrams(word: str) -> Set[str]:
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def player_doc(player) -> SearchDoc:
+    return SearchDoc(PLAYER, player.id, f"{player.first_name or ''} {player.last_name or ''}".strip())
+
+
+def team_doc(team) -> SearchDoc:
+    return SearchDoc(TEAM, team.id, team.name or "")
+
+
+def course_doc(course) -> SearchDoc:
+    return SearchDoc(COURSE, course.id, course.name or "")
+
+
+class SearchIndex:
+    def __init__(self):
+        self._docs: Dict[DocKey, SearchDoc] = {}
+        self._prefixes: Dict[str, Set[DocKey]] = {}
+        self._trigrams: Dict[str, Set[DocKey]] = {}
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._backend = None
+        self._origin = uuid.uuid4().hex
+        self.built = False
+
+    def start(self, backend):
+        """Apply index changes published by other workers"""
+        self._backend = backend
+        backend.subscribe(UPDATES_CHANNEL, self._on_message)
+
+    def ensure_built(self, db: Session):
+        if not self.built:
+            with self._build_lock:
+                if not self.built:
+                    self.rebuild(db)
+
+    def rebuild(self, db: Session):
+        docs = [player_doc(p) for p in db.query(Player.id, Player.first_name, Player.last_name)]
+        docs += [team_doc(t) for t in db.query(Team.id, Team.name)]
+        docs += [course_doc(c) for c in db.query(Course.id, Course.name)]
+        with self._lock:
+            self._docs.clear()
+            self._prefixes.clear()
+            self._trigrams.clear()
+            for doc in docs:
+                self._add(doc)
+            self.built = True
+        logging.info("Built search index with %s documents", len(docs))
+
+    def upsert(self, docs: Iterable[SearchDoc]):
+        docs = list(docs)
+        self._apply(upserts=docs)
+        self._publish({"upsert": [[d.kind, d.id, d.name] for d in docs]})
+
+    def remove(self, kind: str, ids: Iterable[int]):
+        keys = [(kind, i) for i in ids]
+        self._apply(removals=keys)
+        self._publish({"remove": keys})
+
+    def search(self, query: str, kinds: Optional[Set[str]] = None, limit: int = 10) -> List[SearchDoc]:
+        words = tokenize(query)
+        if not words:
+            return []
+        with self._lock:
+            matches = None
+            for word in words:
+                found = self._prefixes.get(word[:MAX_PREFIX]) or self._infix(word)
+                matches = set(found) if matches is None else matches & found
+                if not matches:
+                    return []
+            docs = [self._docs[key] for key in matches if kinds is None or key[0] in kinds]
+
+        # Whole-name prefix matches first, then shorter names
+        lowered = query.strip().lower()
+        docs.sort(key=lambda d: (not d.name.lower().startswith(lowered), len(d.name), d.name))
+        return docs[:limit]
+
+    def _infix(self, word: str) -> Set[DocKey]:
+        grams = _trigrams(word)
+        if not grams:
+            return set()
+        found = set.intersection(*[self._trigrams.get(g, set()) for g in grams])
+        return {key for key in found if any(word in w for w in tokenize(self._docs[key].name))}
+
+    def _add(self, doc: SearchDoc):
+        key = (doc.kind, doc.id)
+        self._docs[key] = doc
+        for word in tokenize(doc.name):
+            for end in range(1, min(len(word), MAX_PREFIX) + 1):
+                self._prefixes.setdefault(word[:end], set()).add(key)
+            for gram in _trigrams(word):
+                self._trigrams.setdefault(gram, set()).add(key)
+
+    def _discard(self, key: DocKey):
+        doc = self._docs.pop(key, None)
+        if doc is None:
+            return
+        for word in tokenize(doc.name):
+            for end in range(1, min(len(word), MAX_PREFIX) + 1):
+                self._discard_from(self._prefixes, word[:end], key)
+            for gram in _trigrams(word):
+                self._discard_from(self._trigrams, gram, key)
+
+    @staticmethod
+    def _discard_from(index: Dict[str, Set[DocKey]], term: str, key: DocKey):
+        keys = index.get(term)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del index[term]
+
+    def _apply(self, upserts=(), removals=()):
+        with self._lock:
+            for key in removals:
+                self._discard(tuple(key))
+            for doc in upserts:
+                self._discard((doc.kind, doc.id))
+                self._add(doc)
+
+    def _publish(self, change: dict):
+        if self._backend is None:
+            return
+        try:
+            self._backend.publish(UPDATES_CHANNEL, json.dumps(dict(change, origin=self._origin)))
+        except Exception as e:
+            logging.warning("Failed to broadcast search index update: %s", e)
+
+    def _on_message(self, message: str):
+        change = json.loads(message)
+        if change.get("origin") == self._origin:
+            return
+        self._apply(
+            upserts=[SearchDoc(*doc) for doc in change.get("upsert", [])],
+            removals=change.get("remove", [])
+        )
+
+
+search_index = SearchIndex()
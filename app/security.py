@@ -0,0 +1,20 @@
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+from app.config import settings
+
+ADMIN_HEADER = "X-Admin-Token"
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    """Admin access is disabled entirely while ADMIN_TOKEN is unset"""
+    if not settings.ADMIN_TOKEN or not token:
+        return False
+    return secrets.compare_digest(token.encode(), settings.ADMIN_TOKEN.encode())
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin token required")
@@ -0,0 +1,3 @@
+# Background tasks package
+from .queue import task_queue, enqueue, WEEK_RECOMPUTE
+from . import recompute
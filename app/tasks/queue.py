@@ -0,0 +1,220 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Callable, Dict, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.base.models import TaskOutbox
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+WEEK_RECOMPUTE = "week_recompute"
+
+TaskKey = Tuple[str, int, int]
+
+_handlers: Dict[str, Callable[[Session, int, int], None]] = {}
+
+
+def register_handler(kind: str):
+    """Register the function that performs tasks of the given kind"""
+    def decorator(func):
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def enqueue(db: Session, kind: str, league_id: int, week_number: int) -> TaskOutbox:
+    """Record a task in the outbox as part of the caller's transaction.
+
+    A task that is still pending for the same (kind, league, week) is reused,
+    so a burst of submissions for one week collapses into a single run.
+    """
+    task = db.query(TaskOutbox).filter(
+        TaskOutbox.kind == kind,
+        TaskOutbox.league_id == league_id,
+        TaskOutbox.week_number == week_number,
+        TaskOutbox.status == PENDING
+    ).order_by(TaskOutbox.id).first()
+
+    if not task:
+        task = TaskOutbox(
+            kind=kind,
+            league_id=league_id,
+            week_number=week_number,
+            status=PENDING,
+            attempts=0
+        )
+        db.add(task)
+        db.flush()
+
+    return task
+
+
+class TaskQueue:
+    """Runs outbox tasks on a fixed number of asyncio workers.
+
+    Keys are debounced for ``coalesce_seconds`` before they are queued, a key
+    is never run by two workers at once, and a key notified while it is
+    running is queued once more after the current run finishes.
+    """
+
+    def __init__(self, workers: int, coalesce_seconds: float, max_attempts: int):
+        self.workers = workers
+        self.coalesce_seconds = coalesce_seconds
+        self.max_attempts = max_attempts
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._scheduled: Set[TaskKey] = set()
+        self._running: Set[TaskKey] = set()
+        self._rerun: Set[TaskKey] = set()
+        self._workers = []
+
+    @property
+    def started(self) -> bool:
+        return self._loop is not None
+
+    def depth(self) -> int:
+        """Number of keys waiting to run, including ones still debouncing"""
+        return len(self._scheduled) + len(self._rerun)
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+        for key in await asyncio.to_thread(self._recover):
+            self._schedule(key)
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+
+    def notify(self, kind: str, league_id: int, week_number: int):
+        """Wake the queue for a task committed to the outbox.
+
+        Safe to call from request handlers running in the threadpool. Before
+        ``start`` this is a no-op; the outbox row is picked up on startup.
+        """
+        if not self._loop:
+            return
+        self._loop.call_soon_threadsafe(self._schedule, (kind, league_id, week_number))
+
+    def _schedule(self, key: TaskKey, delay: Optional[float] = None):
+        if key in self._running:
+            self._rerun.add(key)
+            return
+        if key in self._scheduled:
+            return
+        self._scheduled.add(key)
+        self._loop.call_later(
+            self.coalesce_seconds if delay is None else delay,
+            self._queue.put_nowait,
+            key
+        )
+
+    async def _worker(self):
+        while True:
+            key = await self._queue.get()
+            self._scheduled.discard(key)
+            self._running.add(key)
+            retry = False
+            try:
+                retry = await asyncio.to_thread(self._run, key)
+            except Exception:
+                logging.exception("Task %s crashed", key)
+            finally:
+                self._running.discard(key)
+                self._queue.task_done()
+
+            if key in self._rerun:
+                self._rerun.discard(key)
+                self._schedule(key)
+            elif retry:
+                self._schedule(key, delay=self.coalesce_seconds * 5)
+
+    def _recover(self):
+        """Requeue tasks left pending or interrupted by a previous process"""
+        db = SessionLocal()
+        try:
+            db.query(TaskOutbox).filter(TaskOutbox.status == RUNNING)\
+                .update({TaskOutbox.status: PENDING}, synchronize_session=False)
+            db.commit()
+            keys = db.query(TaskOutbox.kind, TaskOutbox.league_id, TaskOutbox.week_number)\
+                .filter(TaskOutbox.status == PENDING)\
+                .distinct()\
+                .all()
+            return [tuple(key) for key in keys]
+        finally:
+            db.close()
+
+    def _run(self, key: TaskKey) -> bool:
+        """Claim every pending row for the key and run the handler once.
+
+        Returns True when the task failed and should be retried.
+        """
+        kind, league_id, week_number = key
+        handler = _handlers.get(kind)
+        if not handler:
+            logging.error("No handler registered for task kind %s", kind)
+            return False
+
+        db = SessionLocal()
+        try:
+            tasks = db.query(TaskOutbox).filter(
+                TaskOutbox.kind == kind,
+                TaskOutbox.league_id == league_id,
+                TaskOutbox.week_number == week_number,
+                TaskOutbox.status == PENDING
+            ).with_for_update(skip_locked=True).all()
+            if not tasks:
+                db.rollback()
+                return False
+
+            task_ids = [task.id for task in tasks]
+            attempts = max(task.attempts for task in tasks) + 1
+            db.query(TaskOutbox).filter(TaskOutbox.id.in_(task_ids)).update({
+                TaskOutbox.status: RUNNING,
+                TaskOutbox.attempts: attempts,
+                TaskOutbox.started_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+
+            try:
+                handler(db, league_id, week_number)
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logging.exception("Task %s failed (attempt %s)", key, attempts)
+                status = FAILED if attempts >= self.max_attempts else PENDING
+                db.query(TaskOutbox).filter(TaskOutbox.id.in_(task_ids)).update({
+                    TaskOutbox.status: status,
+                    TaskOutbox.last_error: str(e)
+                }, synchronize_session=False)
+                db.commit()
+                return status == PENDING
+
+            db.query(TaskOutbox).filter(TaskOutbox.id.in_(task_ids)).update({
+                TaskOutbox.status: DONE,
+                TaskOutbox.finished_at: datetime.utcnow()
+            }, synchronize_session=False)
+            db.commit()
+            return False
+        finally:
+            db.close()
+
+
+task_queue = TaskQueue(
+    workers=settings.TASK_WORKERS,
+    coalesce_seconds=settings.TASK_COALESCE_SECONDS,
+    max_attempts=settings.TASK_MAX_ATTEMPTS
+)
@@ -0,0 +1,115 @@
+import logging
+from datetime import datetime
+from typing import Callable, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from app.models.base.models import Match, League, Course, Player, PlayerScore, MatchResult
+from app.rules.formats import DEFAULT_FORMAT, player_handicap
+from app.rules.scoring import calculate_card_points
+from app.crud import head_to_head
+from app.crud.scores import card_rows
+from app.rules.summary import refresh_week_summary
+from .queue import WEEK_RECOMPUTE, register_handler
+
+_week_hooks: List[Callable[[Session, int, int], None]] = []
+
+
+def week_hook(func):
+    """Register a step that refreshes derived data for a league week"""
+    _week_hooks.append(func)
+    return func
+
+
+@register_handler(WEEK_RECOMPUTE)
+def recompute_week(db: Session, league_id: int, week_number: int):
+    for hook in _week_hooks:
+        hook(db, league_id, week_number)
+
+
+@week_hook
+def recompute_match_results(db: Session, league_id: int, week_number: int):
+    """Score every match of the week and store the points in match_results"""
+    league = db.query(League)\
+        .options(joinedload(League.course).selectinload(Course.holes))\
+        .filter(League.id == league_id)\
+        .first()
+    matches = db.query(Match).filter(
+        Match.league_id == league_id,
+        Match.week_number == week_number
+    ).all()
+    holes = league.course.holes if league and league.course else []
+    course_par = sum(hole.par or 0 for hole in holes)
+    match_ids = [match.id for match in matches]
+
+    # The week's cards with their teams and handicaps, then every stroke
+    # straight from hole_scores
+    cards = {}
+    handicaps = {}
+    if match_ids:
+        for match_id, player_id, team_id, league_average in db.query(
+                PlayerScore.match_id,
+                PlayerScore.player_id,
+                func.coalesce(PlayerScore.team_id, Player.team_id),
+                Player.league_average
+            )\
+            .outerjoin(Player, Player.id == PlayerScore.player_id)\
+            .filter(PlayerScore.match_id.in_(match_ids)):
+            cards.setdefault(match_id, {})[player_id] = (team_id, {})
+            handicaps[player_id] = player_handicap(league_average, course_par)
+    for match_id, player_id, _, hole_number, strokes in card_rows(db, league_id, match_ids):
+        if player_id in cards.get(match_id, {}):
+            cards[match_id][player_id][1][hole_number] = strokes
+
+    for match in matches:
+        if not cards.get(match.id) or not holes:
+            db.query(MatchResult).filter(MatchResult.match_id == match.id).delete()
+            continue
+
+        sides = {match.team1_id: ([], []), match.team2_id: ([], [])}
+        for player_id, (team_id, card) in cards[match.id].items():
+            if team_id in sides:
+                sides[team_id][0].append(card)
+                sides[team_id][1].append(handicaps[player_id])
+        points = calculate_card_points(
+            sides[match.team1_id][0],
+            sides[match.team2_id][0],
+            holes,
+            league.scoring_format or DEFAULT_FORMAT,
+            sides[match.team1_id][1],
+            sides[match.team2_id][1]
+        )
+        db.merge(MatchResult(
+            match_id=match.id,
+            team1_points=points['team1_points'],
+            team2_points=points['team2_points'],
+            holes_scored=len(points['hole_results']),
+            computed_at=datetime.utcnow()
+        ))
+
+    logging.info(
+        "Recomputed results for %s matches in league %s week %s",
+        len(matches), league_id, week_number
+    )
+
+
+@week_hook
+def refresh_head_to_head(db: Session, league_id: int, week_number: int):
+    """Rebuild head-to-head records of every pair that met this week"""
+    # Match results merged by the previous hook feed the team records
+    db.flush()
+    match_ids = [
+        match_id for (match_id,) in db.query(Match.id).filter(
+            Match.league_id == league_id,
+            Match.week_number == week_number
+        )
+    ]
+    head_to_head.refresh_pairs(db, *head_to_head.match_pairs(db, match_ids))
+
+
+@week_hook
+def refresh_summary(db: Session, league_id: int, week_number: int):
+    """Rebuild the stored field summary of the week"""
+    db.flush()
+    refresh_week_summary(db, league_id, week_number)
@@ -0,0 +1,118 @@
+"""Worker warmup, run in the background from the lifespan.
+
+Fills the connection pools, the course cache, the cache versions of
+active leagues, the search index and the OpenAPI schema before the worker
+reports ready, so the first requests after a deploy or restart do not pay
+for them. A failing step is logged and leaves that part cold; it does
+not keep the worker out of rotation.
+"""
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI
+from pydantic import BaseModel
+from sqlalchemy.engine import Engine
+
+from app import cache
+from app.crud import courses as courses_crud
+from app.database import SessionLocal, engine, replicas
+from app.models import schemas
+from app.models.base.models import League
+from app.search import search_index
+
+
+def warm_pool(engines: List[Engine]):
+    """Open every engine's base pool of connections up front"""
+    for pooled in engines:
+        connections = [pooled.connect() for _ in range(pooled.pool.size())]
+        for connection in connections:
+            connection.close()
+
+
+def warm_courses():
+    db = SessionLocal(info={"read_only": True})
+    try:
+        version = cache.courses_version()
+        courses = courses_crud.course_payloads(db)
+    finally:
+        db.close()
+    cache.set_courses(courses, version=version)
+    for course in courses:
+        cache.set_courses(course, course["id"], version=version)
+
+
+def warm_leagues():
+    """Fetch the cache versions of leagues still being played"""
+    db = SessionLocal(info={"read_only": True})
+    try:
+        league_ids = [
+            league_id for (league_id,) in db.query(League.id).filter(League.archived_at.is_(None))
+        ]
+    finally:
+        db.close()
+    for league_id in league_ids:
+        cache.league_version(league_id)
+
+
+def warm_search():
+    db = SessionLocal(info={"read_only": True})
+    try:
+        search_index.ensure_built(db)
+    finally:
+        db.close()
+
+
+def warm_schemas(app: FastAPI):
+    """Resolve forward references of the response models and build the
+    OpenAPI document, which FastAPI otherwise does on first use"""
+    for model in vars(schemas).values():
+        if isinstance(model, type) and issubclass(model, BaseModel) and model is not BaseModel:
+            model.model_rebuild()
+    app.openapi()
+
+
+class Warmup:
+    def __init__(self):
+        self.ready = False
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.steps: Dict[str, dict] = {}
+
+    def run(self, app: FastAPI):
+        self.started_at = datetime.utcnow()
+        steps: List[Tuple[str, Callable[[], None]]] = [
+            ("pool", lambda: warm_pool([engine] + replicas.engines)),
+            ("courses", warm_courses),
+            ("leagues", warm_leagues),
+            ("search", warm_search),
+            ("schemas", lambda: warm_schemas(app)),
+        ]
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                step()
+                status = {"status": "ok"}
+            except Exception as e:
+                logging.exception("Warmup step %s failed", name)
+                status = {"status": "failed", "error": str(e)}
+            status["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+            self.steps[name] = status
+        self.finished_at = datetime.utcnow()
+        self.ready = True
+        logging.info("Warmup finished: %s", self.steps)
+
+    def skip(self):
+        self.ready = True
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": self.steps
+        }
+
+
+warmup = Warmup()
@@ -0,0 +1,26 @@
+import argparse
+
+from app.config import settings
+from app.database import SessionLocal
+from app.archive import archive_league
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Compact a finished league's scores into a snapshot file"
+    )
+    parser.add_argument("league_id", type=int)
+    parser.add_argument("--dir", default=settings.ARCHIVE_DIR, help="Snapshot directory")
+    parser.add_argument(
+        "--force", action="store_true", help="Archive even if some matches have no scores"
+    )
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        path = archive_league(db, args.league_id, args.dir, force=args.force)
+    finally:
+        db.close()
+    print(f"League {args.league_id} archived to {path}")
+
+if __name__ == "__main__":
+    main()
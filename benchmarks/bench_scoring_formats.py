@@ -0,0 +1,63 @@
+"""Benchmark every registered scoring format.
+
+Times each compiled format on a league week (15 matches scored from cards)
+and on a batch of simulated matches, and fails if any format is more than
+``--max-ratio`` times slower than the default format on either workload.
+
+    python -m benchmarks.bench_scoring_formats
+"""
+import argparse
+import sys
+import timeit
+
+import numpy as np
+
+from app.rules.formats import DEFAULT_FORMAT, available_formats, compile_format
+
+PARS = (4, 3, 5, 4, 4, 3, 4, 5, 4)
+STROKE_INDEX = (3, 9, 1, 5, 7, 8, 2, 4, 6)
+
+
+def workloads(rng):
+    week = rng.integers(3, 9, size=(2, 15, 4, len(PARS))).astype(np.float64)
+    week[rng.random(week.shape) < 0.02] = np.nan
+    simulated = rng.integers(3, 9, size=(2, 20000, 4, len(PARS))).astype(np.int16)
+    handicaps = rng.integers(0, 18, size=4)
+    return {"week": week, "simulated": simulated}, handicaps
+
+
+def bench(name, arrays, handicaps, repeat):
+    compiled = compile_format(name, PARS, STROKE_INDEX)
+    team1, team2 = arrays
+    timer = timeit.Timer(lambda: compiled(team1, team2, handicaps, handicaps))
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ratio", type=float, default=3.0)
+    args = parser.parse_args()
+
+    loads, handicaps = workloads(np.random.default_rng(0))
+    results = {
+        name: {load: bench(name, arrays, handicaps, args.repeat) for load, arrays in loads.items()}
+        for name in available_formats()
+    }
+
+    print(f"{'format':<28}{'week (us)':>12}{'20k sims (ms)':>16}")
+    failures = []
+    for name, timings in results.items():
+        print(f"{name:<28}{timings['week'] * 1e6:>12.1f}{timings['simulated'] * 1e3:>16.2f}")
+        for load, seconds in timings.items():
+            if seconds > results[DEFAULT_FORMAT][load] * args.max_ratio:
+                failures.append(f"{name} is over {args.max_ratio}x slower than {DEFAULT_FORMAT} on {load}")
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,13 +1,125 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from datetime import datetime
-from app.routers import players, teams, scores, courses, leagues, matches
-from app.database import engine
+from app.routers import players, teams, scores, courses, leagues, matches, jobs, search, query, admin, health
+from app.database import engine, pool_wait, replicas
+from app.config import settings
 from app.models.base import Base
+from app.tasks import task_queue
+from app.rules import projections
+from app import cache
+from app.search import search_index
+from app.middleware import (
+    CoalescingMiddleware, LoadSheddingMiddleware, InMemoryBuckets, RedisBuckets, CRITICAL, LOW
+)
+from app.middleware.profiling import ProfilingMiddleware
+from app.middleware.query_context import QueryContextMiddleware
+from app.diagnostics import profiling
+from app.warmup import warmup
 
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    replicas.start()
+    cache.shared_cache.start()
+    search_index.start(cache.shared_cache.backend)
+    await task_queue.start()
+    profiling.start_sampler()
+    # Requests are served while warming up; /health/ready reports 503 until done
+    warming = None
+    if settings.WARMUP_ENABLED:
+        warming = asyncio.create_task(asyncio.to_thread(warmup.run, app))
+    else:
+        warmup.skip()
+    yield
+    if warming is not None and not warming.done():
+        warming.cancel()
+    profiling.stop_sampler()
+    await task_queue.stop()
+    cache.shared_cache.stop()
+    replicas.stop()
+    projections.shutdown_pool()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def league_week_key(path_params, query_params):
+    # Requests arriving after new scores are posted must not join a
+    # computation that started before them. Key functions run on the event
+    # loop, so only a version known locally is used (warmup reads those of
+    # active leagues); requests for other leagues are not coalesced.
+    if not path_params["league_id"].isdigit():
+        return None
+    league_id = int(path_params["league_id"])
+    version = cache.known_league_version(league_id)
+    if version is None:
+        return None
+    return league_id, path_params["week_number"], version
+
+
+def match_key(path_params, query_params):
+    # Keyed on the league version like league_week_key, so a GET after a
+    # score submission never replays cards or an ETag from before it. A
+    # match this worker has not served yet is not coalesced.
+    if not path_params["match_id"].isdigit():
+        return None
+    match_id = int(path_params["match_id"])
+    league_id = cache.match_league(match_id)
+    version = cache.known_league_version(league_id) if league_id is not None else None
+    if version is None:
+        return None
+    return match_id, version
+
+
+if settings.SLOW_QUERY_THRESHOLD_MS > 0:
+    app.add_middleware(QueryContextMiddleware)
+
+# Innermost so a captured profile covers the route and nothing else
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Added before CORS so CORS headers are still applied per request
+app.add_middleware(
+    CoalescingMiddleware,
+    routes={
+        "/leagues/{league_id}/matches/week/{week_number}": league_week_key,
+        "/matches/{match_id}": match_key,
+    }
+)
+
+# Score submissions and health checks are never shed; list views and heavy
+# reads go first
+app.add_middleware(
+    LoadSheddingMiddleware,
+    buckets=RedisBuckets(settings.REDIS_URL) if settings.REDIS_URL else InMemoryBuckets(),
+    load=pool_wait.current,
+    priorities={
+        ("GET", "/health/live"): CRITICAL,
+        ("GET", "/health/ready"): CRITICAL,
+        ("POST", "/matches/{match_id}/scores"): CRITICAL,
+        ("POST", "/leagues/{league_id}/weeks/{week_number}/scores"): CRITICAL,
+        ("GET", "/leagues/"): LOW,
+        ("GET", "/teams/"): LOW,
+        ("GET", "/courses/"): LOW,
+        ("GET", "/jobs/"): LOW,
+        ("GET", "/leagues/{league_id}/matches"): LOW,
+        ("GET", "/leagues/{league_id}/export"): LOW,
+        ("GET", "/leagues/{league_id}/projections"): LOW,
+    },
+    client_rate=settings.RATE_LIMIT_CLIENT_RATE,
+    client_burst=settings.RATE_LIMIT_CLIENT_BURST,
+    global_rate=settings.RATE_LIMIT_GLOBAL_RATE,
+    global_burst=settings.RATE_LIMIT_GLOBAL_BURST,
+    shed_low_wait=settings.SHED_LOW_PRIORITY_WAIT_MS / 1000,
+    shed_normal_wait=settings.SHED_NORMAL_PRIORITY_WAIT_MS / 1000,
+    retry_after=settings.SHED_RETRY_AFTER_SECONDS,
+    trusted_proxies=[p.strip() for p in settings.TRUSTED_PROXIES.split(",") if p.strip()]
+)
 
 origins = [
     "http://localhost:3000",
@@ -35,6 +147,11 @@ app.include_router(scores.router)
 app.include_router(courses.router)
 app.include_router(leagues.router)
 app.include_router(matches.router)
+app.include_router(jobs.router)
+app.include_router(search.router)
+app.include_router(query.router)
+app.include_router(admin.router)
+app.include_router(health.router)
 
 
 
@@ -0,0 +1,58 @@
+import pytest
+
+from app.cache import InMemoryBackend, SharedCache
+
+
+@pytest.fixture
+def caches():
+    """Two workers' caches sharing one backend"""
+    backend = InMemoryBackend()
+    first = SharedCache(backend, ttl=60, local_max_entries=16, resync_seconds=3600)
+    second = SharedCache(backend, ttl=60, local_max_entries=16, resync_seconds=3600)
+    first.start()
+    second.start()
+    yield first, second
+    first.stop()
+    second.stop()
+
+
+def test_value_set_by_one_worker_is_visible_to_another(caches):
+    first, second = caches
+    first.set("standings", "league:1", {"team": 1})
+    assert second.get("standings", "league:1") == {"team": 1}
+    assert second.stats["remote_hits"] == 1
+
+
+def test_invalidation_reaches_every_worker(caches):
+    first, second = caches
+    first.set("standings", "league:1", "old")
+    assert second.get("standings", "league:1") == "old"
+    second.invalidate("league:1")
+    assert first.get("standings", "league:1") is None
+    assert second.get("standings", "league:1") is None
+    assert first.version("league:1") == second.version("league:1") == 1
+
+
+def test_value_computed_before_an_invalidation_is_not_served(caches):
+    first, second = caches
+    version = first.version("league:1")
+    second.invalidate("league:1")
+    first.set("standings", "league:1", "stale", version=version)
+    assert first.get("standings", "league:1") is None
+    assert second.get("standings", "league:1") is None
+
+
+def test_unreadable_version_skips_the_cache():
+    class BrokenBackend(InMemoryBackend):
+        def get(self, key):
+            raise ConnectionError("backend down")
+
+        def incr(self, key):
+            raise ConnectionError("backend down")
+
+    cache = SharedCache(BrokenBackend(), ttl=60, local_max_entries=16)
+    assert cache.version("league:1") is None
+    cache.set("standings", "league:1", "value")
+    assert cache.get("standings", "league:1") is None
+    cache.invalidate("league:1")
+    assert cache.version("league:1") is None
@@ -0,0 +1,84 @@
+import asyncio
+
+from app.middleware.coalescing import CoalescingMiddleware
+
+
+def make_app(calls):
+    async def app(scope, receive, send):
+        calls.append(scope["path"])
+        await asyncio.sleep(0.01)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": scope["path"].encode()})
+    return app
+
+
+def get(path, query=b""):
+    return {"type": "http", "method": "GET", "path": path, "query_string": query}
+
+
+async def request(middleware, scope):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, None, send)
+    return messages
+
+
+def run(middleware, *scopes):
+    async def main():
+        return await asyncio.gather(*[request(middleware, scope) for scope in scopes])
+    return asyncio.run(main())
+
+
+def test_identical_requests_share_one_response():
+    calls = []
+    middleware = CoalescingMiddleware(make_app(calls), {"/matches/{match_id}": None})
+    responses = run(middleware, get("/matches/1"), get("/matches/1"), get("/matches/1"))
+    assert calls == ["/matches/1"]
+    assert all(r[-1]["body"] == b"/matches/1" for r in responses)
+
+
+def test_different_params_are_not_coalesced():
+    calls = []
+    middleware = CoalescingMiddleware(make_app(calls), {"/matches/{match_id}": None})
+    run(middleware, get("/matches/1"), get("/matches/2"), get("/matches/1", b"x=1"))
+    assert len(calls) == 3
+
+
+def test_unregistered_routes_pass_through():
+    calls = []
+    middleware = CoalescingMiddleware(make_app(calls), {"/matches/{match_id}": None})
+    run(middleware, get("/teams/1"), get("/teams/1"))
+    assert len(calls) == 2
+
+
+def test_key_function_can_opt_out():
+    calls = []
+    middleware = CoalescingMiddleware(make_app(calls), {"/matches/{match_id}": lambda p, q: None})
+    run(middleware, get("/matches/1"), get("/matches/1"))
+    assert len(calls) == 2
+
+
+def test_followers_serve_themselves_when_the_leader_is_cancelled():
+    calls = []
+    app = make_app(calls)
+
+    async def slow_app(scope, receive, send):
+        await asyncio.sleep(0.05)
+        await app(scope, receive, send)
+
+    middleware = CoalescingMiddleware(slow_app, {"/matches/{match_id}": None})
+
+    async def main():
+        leader = asyncio.create_task(request(middleware, get("/matches/1")))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(request(middleware, get("/matches/1")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.wait_for(follower, timeout=1)
+
+    messages = asyncio.run(main())
+    assert messages[-1]["body"] == b"/matches/1"
+    assert calls == ["/matches/1"]
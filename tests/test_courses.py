@@ -0,0 +1,97 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from app.crud.courses import affected_league_weeks, update_course
+from app.database import get_db
+from app.models import schemas
+from app.models.base import Base
+from app.models.base.models import Course, Hole, League, Match, PlayerScore, HoleScore
+
+# (id, number, par, stroke index)
+HOLES = [(11, 1, 4, 1), (12, 2, 3, 2), (13, 3, 5, 3)]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Course(id=1, name="Course"))
+    session.add_all([
+        Hole(id=hole_id, course_id=1, number=number, par=par, handicap=handicap)
+        for hole_id, number, par, handicap in HOLES
+    ])
+    # A gross and a net league, each with hole 1 scored in week 1
+    for league_id, scoring_format in ((1, "best_ball_aggregate"), (2, "net_best_ball_aggregate")):
+        session.add_all([
+            League(id=league_id, name=f"League {league_id}", course_id=1, scoring_format=scoring_format),
+            Match(id=league_id, league_id=league_id, week_number=1),
+            PlayerScore(id=league_id, match_id=league_id, player_id=1),
+            HoleScore(
+                id=league_id, league_id=league_id, player_score_id=league_id, hole_id=11,
+                match_id=league_id, player_id=1, hole_number=1, strokes=4
+            ),
+        ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def edit(holes, name="Course"):
+    return schemas.CourseUpdate(name=name, holes=[
+        {"id": 0, "number": number, "par": par, "handicap": handicap}
+        for number, par, handicap in holes
+    ])
+
+
+def holes(db):
+    return [
+        (h.id, h.number, h.par, h.handicap)
+        for h in db.query(Hole).filter(Hole.course_id == 1).order_by(Hole.number)
+    ]
+
+
+def test_par_edit_keeps_hole_ids(db):
+    changes = update_course(db, db.get(Course, 1), edit([(1, 5, 1), (2, 3, 2), (3, 5, 3)]))
+    assert holes(db) == [(11, 1, 5, 1), (12, 2, 3, 2), (13, 3, 5, 3)]
+    assert changes == {"layout_changed": True, "stroke_index_changed": False}
+    assert affected_league_weeks(db, 1, changes) == {1: [1], 2: [1]}
+
+
+def test_removing_a_scored_hole_is_rejected(db):
+    with pytest.raises(ValueError, match="recorded scores: 1"):
+        update_course(db, db.get(Course, 1), edit([(2, 3, 2), (3, 5, 3)]))
+
+    update_course(db, db.get(Course, 1), edit([(1, 4, 1), (2, 3, 2)]))
+    assert [h[0] for h in holes(db)] == [11, 12]
+
+
+def test_stroke_index_edit_only_rescores_net_leagues(db):
+    changes = update_course(db, db.get(Course, 1), edit([(1, 4, 2), (2, 3, 1), (3, 5, 3)]))
+    assert changes == {"layout_changed": False, "stroke_index_changed": True}
+    assert affected_league_weeks(db, 1, changes) == {2: [1]}
+
+
+def test_unchanged_holes_affect_no_weeks(db):
+    changes = update_course(db, db.get(Course, 1), edit([(1, 4, 1), (2, 3, 2), (3, 5, 3)], name="Renamed"))
+    assert affected_league_weeks(db, 1, changes) == {}
+
+
+def test_duplicate_hole_numbers_get_400(db):
+    app.dependency_overrides[get_db] = lambda: db
+    try:
+        response = TestClient(app).put("/courses/1", json={"name": "Course", "holes": [
+            {"id": 0, "number": 1, "par": 4, "handicap": 1},
+            {"id": 0, "number": 1, "par": 3, "handicap": 2},
+        ]})
+    finally:
+        app.dependency_overrides.pop(get_db)
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Hole numbers must be unique"
+    assert [h[0] for h in holes(db)] == [11, 12, 13]
@@ -0,0 +1,141 @@
+import pytest
+from sqlalchemy import create_engine, delete
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import head_to_head
+from app.crud.head_to_head import PLAYER_TOTALS, TEAM_TOTALS, season_records
+from app.models.base import Base
+from app.models.base.models import (
+    Course, Hole, Team, Player, League, Match, PlayerScore, HoleScore, MatchResult,
+    TeamHeadToHead, PlayerHeadToHead
+)
+
+# (match id, team1, team2, team1 points, team2 points,
+#  {player: (team, {hole id: strokes})})
+MATCHES = [
+    (1, 2, 1, 3.0, 1.0, {201: (2, {11: 4, 12: 5}), 101: (1, {11: 5, 12: 5})}),
+    (2, 1, 2, 2.0, 2.0, {101: (1, {11: 3, 12: 6}), 201: (2, {11: 4, 12: 4})}),
+    (3, 1, 3, 0.0, 4.0, {101: (1, {11: 5}), 301: (3, {11: 4, 12: 4})}),
+]
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Course(id=1, name="Course"),
+        Hole(id=11, course_id=1, number=1, par=4, handicap=1),
+        Hole(id=12, course_id=1, number=2, par=4, handicap=2),
+        Team(id=1, name="One"), Team(id=2, name="Two"), Team(id=3, name="Three"),
+        Player(id=101, first_name="A", last_name="One", team_id=1),
+        Player(id=201, first_name="B", last_name="Two", team_id=2),
+        Player(id=301, first_name="C", last_name="Three", team_id=3),
+        League(id=1, name="League", course_id=1),
+    ])
+    hole_score_id = 0
+    for match_id, team1, team2, points1, points2, cards in MATCHES:
+        session.add(Match(id=match_id, league_id=1, week_number=match_id, team1_id=team1, team2_id=team2))
+        session.add(MatchResult(match_id=match_id, team1_points=points1, team2_points=points2))
+        for player_id, (team_id, strokes) in cards.items():
+            score_id = match_id * 1000 + player_id
+            session.add(PlayerScore(id=score_id, match_id=match_id, player_id=player_id, team_id=team_id))
+            for hole_id, hole_strokes in strokes.items():
+                hole_score_id += 1
+                session.add(HoleScore(
+                    id=hole_score_id, league_id=1, player_score_id=score_id, hole_id=hole_id,
+                    match_id=match_id, player_id=player_id, team_id=team_id,
+                    hole_number=hole_id - 10, strokes=hole_strokes
+                ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def season():
+    return {"matches": [
+        {
+            "id": match_id,
+            "team1_id": team1,
+            "team2_id": team2,
+            "result": {"team1_points": points1, "team2_points": points2},
+            "scores": [
+                {
+                    "player_id": player_id,
+                    "team_id": team_id,
+                    "hole_scores": [{"hole_id": h, "strokes": s} for h, s in strokes.items()]
+                }
+                for player_id, (team_id, strokes) in cards.items()
+            ]
+        }
+        for match_id, team1, team2, points1, points2, cards in MATCHES
+    ]}
+
+
+def stored(db):
+    teams = {
+        (r.team_id, r.opponent_id): {c: getattr(r, c) for c in TEAM_TOTALS}
+        for r in db.query(TeamHeadToHead)
+    }
+    players = {
+        (r.player_id, r.opponent_id): {c: getattr(r, c) for c in PLAYER_TOTALS}
+        for r in db.query(PlayerHeadToHead)
+    }
+    return teams, players
+
+
+def totals(records, columns):
+    return {pair: {c: record[c] for c in columns} for pair, record in records.items()}
+
+
+def refresh_all(db):
+    head_to_head.refresh_pairs(db, *head_to_head.match_pairs(db, [m[0] for m in MATCHES]))
+    db.commit()
+
+
+def test_season_records_match_what_refresh_counts(db):
+    refresh_all(db)
+    team_records, player_records = season_records(season())
+    assert stored(db) == (totals(team_records, TEAM_TOTALS), totals(player_records, PLAYER_TOTALS))
+
+
+def test_team_record_is_stored_from_the_lower_id(db):
+    refresh_all(db)
+    teams, players = stored(db)
+    assert teams[(1, 2)] == {
+        "matches_played": 2, "wins": 0, "losses": 1, "halves": 1,
+        "points_for": 3.0, "points_against": 5.0
+    }
+    # Match 3 has one shared hole, so only it is compared
+    assert players[(101, 301)] == {
+        "matches_played": 1, "holes_won": 0, "holes_lost": 1, "holes_halved": 0,
+        "strokes": 5, "opponent_strokes": 4
+    }
+
+
+def test_records_flip_for_the_higher_id(db):
+    refresh_all(db)
+    record = head_to_head.team_head_to_head(db, 2, 1, limit=5)["record"]
+    assert (record["wins"], record["losses"], record["halves"]) == (1, 0, 1)
+    assert (record["points_for"], record["points_against"]) == (5.0, 3.0)
+
+    record = head_to_head.player_head_to_head(db, 201, 101, limit=5)["record"]
+    low = head_to_head.player_head_to_head(db, 101, 201, limit=5)["record"]
+    assert (record["holes_won"], record["holes_lost"]) == (low["holes_lost"], low["holes_won"])
+    assert (record["strokes"], record["opponent_strokes"]) == (low["opponent_strokes"], low["strokes"])
+
+
+def test_archiving_keeps_records(db):
+    refresh_all(db)
+    before = stored(db)
+
+    pairs = head_to_head.archive_season(db, season())
+    db.execute(delete(HoleScore))
+    db.execute(delete(PlayerScore))
+    db.execute(delete(MatchResult))
+    db.execute(delete(Match))
+    head_to_head.refresh_pairs(db, *pairs)
+    db.commit()
+
+    assert stored(db) == before
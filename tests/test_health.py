@@ -0,0 +1,81 @@
+import threading
+
+from app.diagnostics.health import DatabaseProbe, pool_stats
+
+
+class FakePool:
+    def __init__(self, size, checked_in, checked_out, overflow):
+        self._counts = size, checked_in, checked_out, overflow
+
+    def size(self):
+        return self._counts[0]
+
+    def checkedin(self):
+        return self._counts[1]
+
+    def checkedout(self):
+        return self._counts[2]
+
+    def overflow(self):
+        return self._counts[3]
+
+
+class FakeConnection:
+    def __init__(self, engine):
+        self.engine = engine
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def exec_driver_sql(self, statement):
+        self.engine.calls += 1
+        self.engine.release.wait()
+        if self.engine.error:
+            raise self.engine.error
+
+
+class FakeEngine:
+    def __init__(self, error=None, hang=False):
+        self.calls = 0
+        self.error = error
+        self.release = threading.Event()
+        if not hang:
+            self.release.set()
+
+    def connect(self):
+        return FakeConnection(self)
+
+
+def test_pool_stats_reports_saturation():
+    assert pool_stats(FakePool(5, 2, 3, -2), 10) == {
+        "size": 5, "checked_in": 2, "checked_out": 3, "overflow": 0,
+        "max_overflow": 10, "saturated": False
+    }
+    assert pool_stats(FakePool(5, 0, 15, 10), 10)["saturated"]
+
+
+def test_probe_reuses_recent_result():
+    engine = FakeEngine()
+    probe = DatabaseProbe(engine, timeout=1.0)
+    assert probe.check()["ok"]
+    assert probe.check()["ok"]
+    assert engine.calls == 1
+
+
+def test_probe_reports_errors():
+    probe = DatabaseProbe(FakeEngine(error=RuntimeError("gone away")), timeout=1.0)
+    assert probe.check() == {"ok": False, "error": "gone away"}
+
+
+def test_probe_times_out_without_stacking_pings():
+    engine = FakeEngine(hang=True)
+    probe = DatabaseProbe(engine, timeout=0.05, max_age=0)
+    try:
+        assert not probe.check()["ok"]
+        assert not probe.check()["ok"]
+        assert engine.calls == 1
+    finally:
+        engine.release.set()
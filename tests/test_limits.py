@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from app.middleware.limits import LoadSheddingMiddleware, InMemoryBuckets, RedisBuckets, CRITICAL, LOW
+
+
+async def ok_app(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def make_middleware(wait=0.0, client_burst=10, global_burst=100, trusted_proxies=()):
+    return LoadSheddingMiddleware(
+        ok_app,
+        buckets=InMemoryBuckets(),
+        load=lambda: wait,
+        priorities={
+            ("POST", "/matches/{match_id}/scores"): CRITICAL,
+            ("GET", "/leagues/"): LOW,
+        },
+        client_rate=0.001,
+        client_burst=client_burst,
+        global_rate=0.001,
+        global_burst=global_burst,
+        shed_low_wait=0.05,
+        shed_normal_wait=0.25,
+        retry_after=5,
+        trusted_proxies=trusted_proxies
+    )
+
+
+def status(middleware, method, path, client="1.2.3.4", forwarded_for=None):
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    headers = [(b"x-forwarded-for", forwarded_for.encode())] if forwarded_for else []
+    scope = {"type": "http", "method": method, "path": path, "headers": headers, "client": (client, 1)}
+    asyncio.run(middleware(scope, None, send))
+    return messages[0]["status"], dict(messages[0]["headers"])
+
+
+def test_low_priority_reads_are_shed_first():
+    middleware = make_middleware(wait=0.1)
+    assert status(middleware, "GET", "/leagues/")[0] == 503
+    assert status(middleware, "GET", "/leagues/1")[0] == 200
+    assert status(middleware, "POST", "/matches/1/scores")[0] == 200
+
+
+def test_score_writes_are_never_shed():
+    middleware = make_middleware(wait=10.0)
+    assert status(middleware, "GET", "/leagues/1")[0] == 503
+    assert status(middleware, "POST", "/matches/1/scores")[0] == 200
+
+
+def test_shed_response_has_retry_after():
+    code, headers = status(make_middleware(wait=0.1), "GET", "/leagues/")
+    assert headers[b"retry-after"] == b"5"
+
+
+def test_client_bucket_limits_each_client():
+    middleware = make_middleware(client_burst=2)
+    assert [status(middleware, "GET", "/leagues/1")[0] for _ in range(3)] == [200, 200, 429]
+    assert status(middleware, "GET", "/leagues/1", client="5.6.7.8")[0] == 200
+
+
+def test_global_bucket_does_not_apply_to_score_writes():
+    middleware = make_middleware(global_burst=1)
+    assert status(middleware, "GET", "/leagues/1")[0] == 200
+    assert status(middleware, "GET", "/leagues/1")[0] == 429
+    assert status(middleware, "POST", "/matches/1/scores")[0] == 200
+
+
+def test_forwarded_for_from_untrusted_peer_is_ignored():
+    middleware = make_middleware(client_burst=2, trusted_proxies=["10.0.0.0/8"])
+    codes = [
+        status(middleware, "GET", "/leagues/1", forwarded_for=f"9.9.9.{i}")[0]
+        for i in range(3)
+    ]
+    assert codes == [200, 200, 429]
+
+
+def test_forwarded_for_uses_right_most_untrusted_hop():
+    middleware = make_middleware(trusted_proxies=["10.0.0.0/8"])
+    scope = {
+        "client": ("10.0.0.2", 1),
+        "headers": [(b"x-forwarded-for", b"6.6.6.6, 5.6.7.8, 10.0.0.1")]
+    }
+    assert middleware.client_id(scope) == "5.6.7.8"
+    assert middleware.client_id(dict(scope, client=("1.2.3.4", 1))) == "1.2.3.4"
+
+
+def test_reads_do_not_use_up_a_clients_score_writes():
+    middleware = make_middleware(client_burst=2)
+    assert [status(middleware, "GET", "/leagues/1")[0] for _ in range(3)] == [200, 200, 429]
+    assert status(middleware, "POST", "/matches/1/scores")[0] == 200
+
+
+def test_idle_buckets_are_pruned():
+    buckets = InMemoryBuckets(prune_seconds=0)
+    asyncio.run(buckets.take("client:1.2.3.4", rate=1000.0, burst=1))
+    time.sleep(0.01)
+    asyncio.run(buckets.take("client:5.6.7.8", rate=0.001, burst=1))
+    assert len(buckets) == 1
+
+
+def test_unreachable_redis_lets_requests_through():
+    async def failing_script(keys, args):
+        raise ConnectionError("redis down")
+
+    buckets = RedisBuckets.__new__(RedisBuckets)
+    buckets._take = failing_script
+    assert asyncio.run(buckets.take("client:1.2.3.4", 1.0, 1)) == (True, 0.0)
@@ -0,0 +1,177 @@
+from types import SimpleNamespace
+from uuid import uuid4
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import update
+
+from main import app
+from app.crud import idempotency
+from app.crud.scores import VersionConflict, claim_versions
+from app.database import SessionLocal
+from app.models.base.models import (
+    Course, Hole, Team, Player, League, LeagueTeam, Match, PlayerScore, HoleScore,
+    MatchResult, TaskOutbox, IdempotencyKey
+)
+from app.models.schemas import PlayerScoreCreate
+from app.routers import matches as matches_router
+from app.routers.matches import _if_match
+
+client = TestClient(app)
+
+
+def test_if_match_accepts_strong_weak_and_wildcard_tags():
+    assert _if_match('"3"', 3)
+    assert _if_match('W/"3"', 3)
+    assert _if_match('"1", W/"3"', 3)
+    assert _if_match("*", 7)
+    assert not _if_match('"2"', 3)
+    assert not _if_match("3", 3)
+
+
+def test_claim_versions_reports_every_stale_match():
+    # Matches are claimed in id order; 1 still has the version read, 2 and 3 moved on
+    rowcounts = iter([1, 0, 0])
+    db = SimpleNamespace(execute=lambda statement, **kwargs: SimpleNamespace(rowcount=next(rowcounts)))
+    with pytest.raises(VersionConflict) as conflict:
+        claim_versions(db, {3: 1, 1: 4, 2: 2})
+    assert conflict.value.match_ids == [2, 3]
+
+
+def test_request_hash_ignores_key_order_only():
+    a = [PlayerScoreCreate(player_id=1, scores=[{"hole_id": 5, "strokes": 4}])]
+    b = [{"scores": [{"strokes": 4, "hole_id": 5}], "player_id": 1}]
+    c = [PlayerScoreCreate(player_id=1, scores=[{"hole_id": 5, "strokes": 5}])]
+    assert idempotency.request_hash(a) == idempotency.request_hash(b)
+    assert idempotency.request_hash(a) != idempotency.request_hash(c)
+
+
+@pytest.fixture
+def match():
+    """A one-week league on a two-hole course with one player per team"""
+    suffix = uuid4().hex[:8]
+    db = SessionLocal()
+    course = Course(name=f"OCC course {suffix}")
+    db.add(course)
+    db.flush()
+    holes = [Hole(course_id=course.id, number=n, par=4, handicap=n) for n in (1, 2)]
+    teams = [Team(name=f"OCC team {n} {suffix}") for n in (1, 2)]
+    db.add_all(holes + teams)
+    db.flush()
+    players = [Player(first_name="Occ", last_name=str(t.id), team_id=t.id) for t in teams]
+    league = League(name=f"OCC league {suffix}", course_id=course.id)
+    db.add_all(players + [league])
+    db.flush()
+    db.add_all([LeagueTeam(league_id=league.id, team_id=t.id) for t in teams])
+    db_match = Match(league_id=league.id, week_number=1, team1_id=teams[0].id, team2_id=teams[1].id)
+    db.add(db_match)
+    db.commit()
+
+    yield SimpleNamespace(
+        id=db_match.id,
+        league_id=league.id,
+        hole_ids=[h.id for h in holes],
+        player_ids=[p.id for p in players]
+    )
+
+    match_id, league_id = db_match.id, league.id
+    db.query(HoleScore).filter(HoleScore.league_id == league_id).delete(synchronize_session=False)
+    db.query(PlayerScore).filter(PlayerScore.match_id == match_id).delete(synchronize_session=False)
+    db.query(MatchResult).filter(MatchResult.match_id == match_id).delete(synchronize_session=False)
+    db.query(IdempotencyKey).filter(IdempotencyKey.scope == f"match-scores:{match_id}")\
+        .delete(synchronize_session=False)
+    db.query(TaskOutbox).filter(TaskOutbox.league_id == league_id).delete(synchronize_session=False)
+    db.query(Match).filter(Match.id == match_id).delete(synchronize_session=False)
+    db.query(LeagueTeam).filter(LeagueTeam.league_id == league_id).delete(synchronize_session=False)
+    db.query(League).filter(League.id == league_id).delete(synchronize_session=False)
+    db.query(Player).filter(Player.id.in_([p.id for p in players])).delete(synchronize_session=False)
+    db.query(Team).filter(Team.id.in_([t.id for t in teams])).delete(synchronize_session=False)
+    db.query(Hole).filter(Hole.course_id == course.id).delete(synchronize_session=False)
+    db.query(Course).filter(Course.id == course.id).delete(synchronize_session=False)
+    db.commit()
+    db.close()
+
+
+def cards(match, strokes):
+    return [
+        {
+            "player_id": player_id,
+            "scores": [{"hole_id": hole_id, "strokes": strokes} for hole_id in match.hole_ids]
+        }
+        for player_id in match.player_ids
+    ]
+
+
+def submit(match, strokes, **headers):
+    return client.post(f"/matches/{match.id}/scores", json=cards(match, strokes), headers=headers)
+
+
+def test_first_submission_bumps_version_and_sets_etag(match):
+    response = submit(match, 4)
+    assert response.status_code == 200
+    assert response.json()["version"] == 2
+    assert response.headers["ETag"] == '"2"'
+
+
+def test_unchanged_resubmit_keeps_version(match):
+    submit(match, 4)
+    response = submit(match, 4)
+    assert response.status_code == 200
+    assert response.json()["message"] == "Scores unchanged"
+    assert response.json()["version"] == 2
+    assert response.json()["job_id"] is None
+
+
+def test_stale_if_match_gets_412_with_current_cards(match):
+    submit(match, 4)
+    response = submit(match, 5, **{"If-Match": '"1"'})
+    assert response.status_code == 412
+    assert response.headers["ETag"] == '"2"'
+    body = response.json()
+    assert body["version"] == 2
+    assert {h["strokes"] for card in body["scores"] for h in card["hole_scores"]} == {4}
+
+
+def test_current_weak_and_wildcard_if_match_are_accepted(match):
+    assert submit(match, 4, **{"If-Match": 'W/"1"'}).status_code == 200
+    assert submit(match, 5, **{"If-Match": "*"}).status_code == 200
+
+
+@pytest.fixture
+def concurrent_write(monkeypatch):
+    """Make another writer commit between the route's read and its write"""
+    load = matches_router.load_match_for_scoring
+
+    def load_then_race(db, match_id):
+        loaded = load(db, match_id)
+        other = SessionLocal()
+        other.execute(update(Match).where(Match.id == match_id).values(version=Match.version + 1))
+        other.commit()
+        other.close()
+        return loaded
+
+    monkeypatch.setattr(matches_router, "load_match_for_scoring", load_then_race)
+
+
+def test_lost_race_without_if_match_gets_409(match, concurrent_write):
+    response = submit(match, 4)
+    assert response.status_code == 409
+    assert response.json()["version"] == 2
+
+
+def test_lost_race_with_if_match_gets_412(match, concurrent_write):
+    assert submit(match, 4, **{"If-Match": '"1"'}).status_code == 412
+
+
+def test_idempotent_retry_replays_first_response(match):
+    first = submit(match, 4, **{"Idempotency-Key": "occ-retry"})
+    retry = submit(match, 4, **{"Idempotency-Key": "occ-retry"})
+    assert retry.status_code == 200
+    assert retry.headers[idempotency.REPLAYED_HEADER] == "true"
+    assert retry.json() == first.json()
+
+
+def test_idempotency_key_reused_with_different_body_gets_422(match):
+    submit(match, 4, **{"Idempotency-Key": "occ-reuse"})
+    response = submit(match, 5, **{"Idempotency-Key": "occ-reuse"})
+    assert response.status_code == 422
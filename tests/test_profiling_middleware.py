@@ -0,0 +1,31 @@
+import asyncio
+
+from app.middleware import profiling as profiling_middleware
+from app.middleware.profiling import ProfilingMiddleware
+
+
+def test_overlapping_captures_are_rejected(monkeypatch):
+    monkeypatch.setattr(profiling_middleware, "is_admin_token", lambda token: True)
+    monkeypatch.setattr(profiling_middleware, "save_profile", lambda profile: "abc")
+
+    async def app(scope, receive, send):
+        await asyncio.sleep(0.02)
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    middleware = ProfilingMiddleware(app)
+    scope = {"type": "http", "method": "GET", "path": "/", "headers": [(b"x-profile", b"1")]}
+
+    async def request():
+        messages = []
+
+        async def send(message):
+            messages.append(message)
+
+        await middleware(scope, None, send)
+        return messages[0]["status"]
+
+    async def main():
+        return await asyncio.gather(request(), request())
+
+    assert sorted(asyncio.run(main())) == [200, 409]
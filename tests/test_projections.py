@@ -0,0 +1,69 @@
+import numpy as np
+
+from app.rules.projections import POOL_SIZE, simulate_chunk, summarize
+
+
+def make_model(strokes1, strokes2, current_points=(0.0, 0.0)):
+    """Two one-player teams meeting once on a two-hole course; each player's
+    pool holds ``strokes`` per hole"""
+    pool = np.zeros((2, 2, POOL_SIZE), dtype=np.int16)
+    counts = np.zeros((2, 2), dtype=np.int64)
+    for p, per_hole in enumerate((strokes1, strokes2)):
+        for h, samples in enumerate(per_hole):
+            pool[p, h, :len(samples)] = samples
+            counts[p, h] = len(samples)
+    return {
+        "teams": [(1, "One"), (2, "Two")],
+        "current_points": np.array(current_points),
+        "pool": pool,
+        "pool_counts": counts,
+        "handicaps": np.zeros(2, dtype=np.int64),
+        "remaining": [(0, 1, np.array([0]), np.array([1]))],
+        "scoring_format": "best_ball_aggregate",
+        "pars": (4, 3),
+        "stroke_index": (1, 2)
+    }
+
+
+def test_same_seed_same_seasons():
+    model = make_model([[3, 4, 5], [2, 3, 4]], [[3, 4, 5], [2, 3, 4]])
+    first = simulate_chunk(model, 200, seed=7)
+    assert first.shape == (200, 2)
+    assert np.array_equal(first, simulate_chunk(model, 200, seed=7))
+    assert not np.array_equal(first, simulate_chunk(model, 200, seed=8))
+
+
+def test_draws_stay_within_each_pool():
+    # Team one can only beat or halve team two, never lose a hole
+    model = make_model([[3, 4], [2, 3]], [[4, 5], [3, 4]], current_points=(1.0, 2.0))
+    points = simulate_chunk(model, 500, seed=1)
+    assert (points[:, 0] - 1.0 >= points[:, 1] - 2.0).all()
+    assert (points >= [1.0, 2.0]).all()
+
+
+def test_certain_outcome_is_the_same_every_season():
+    model = make_model([[3], [2]], [[5], [4]])
+    points = simulate_chunk(model, 50, seed=3)
+    assert (points == points[0]).all()
+    assert points[0, 0] > points[0, 1]
+
+
+def test_summarize_odds():
+    model = make_model([[4], [3]], [[4], [3]], current_points=(10.0, 0.0))
+    points = np.tile([12.0, 1.0], (100, 1))
+    leader, trailer = summarize(model, points, playoff_spots=1, seed=0)
+    assert leader == {
+        "team_id": 1, "name": "One", "current_points": 10.0, "expected_points": 12.0,
+        "first_place_odds": 1.0, "playoff_odds": 1.0
+    }
+    assert (trailer["first_place_odds"], trailer["playoff_odds"]) == (0.0, 0.0)
+    assert summarize(model, points, playoff_spots=2, seed=0)[1]["playoff_odds"] == 1.0
+
+
+def test_summarize_splits_ties_evenly_and_repeatably():
+    model = make_model([[4], [3]], [[4], [3]])
+    points = np.zeros((4000, 2))
+    teams = summarize(model, points, playoff_spots=1, seed=5)
+    assert abs(teams[0]["first_place_odds"] - 0.5) < 0.05
+    assert abs(teams[0]["first_place_odds"] + teams[1]["first_place_odds"] - 1.0) < 1e-9
+    assert teams == summarize(model, points, playoff_spots=1, seed=5)
@@ -0,0 +1,112 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.archive.snapshot import write_snapshot
+from app.models.base import Base
+from app.models.base.models import (
+    Course, Hole, Team, Player, League, LeagueTeam, Match, MatchResult, PlayerScore, HoleScore
+)
+from app.query import execute
+
+LEAGUE_NIGHT = {
+    "league": {
+        "resource": "leagues",
+        "where": {"id": 1},
+        "include": {
+            "course": {"include": {"holes": {}}},
+            "teams": {"include": {"players": {}}},
+            "matches": {"include": {"result": {}, "scores": {"include": {"hole_scores": {}}}}}
+        }
+    }
+}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Course(id=1, name="Course"),
+        Hole(id=11, course_id=1, number=1, par=4, handicap=1),
+        Hole(id=12, course_id=1, number=2, par=3, handicap=2),
+        Team(id=1, name="One"), Team(id=2, name="Two"),
+        Player(id=101, first_name="A", last_name="One", team_id=1),
+        Player(id=201, first_name="B", last_name="Two", team_id=2),
+        League(id=1, name="League", course_id=1),
+        LeagueTeam(league_id=1, team_id=1), LeagueTeam(league_id=1, team_id=2),
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def add_weeks(db, weeks):
+    """Add one scored match per week, numbering rows after the existing ones"""
+    start = db.query(Match).count()
+    for match_id in range(start + 1, start + weeks + 1):
+        db.add(Match(id=match_id, league_id=1, week_number=match_id, team1_id=1, team2_id=2))
+        db.add(MatchResult(match_id=match_id, team1_points=2.0, team2_points=2.0, holes_scored=2))
+        for player_id, team_id in ((101, 1), (201, 2)):
+            score_id = match_id * 1000 + player_id
+            db.add(PlayerScore(id=score_id, match_id=match_id, player_id=player_id, team_id=team_id))
+            for hole_id in (11, 12):
+                db.add(HoleScore(
+                    id=score_id * 100 + hole_id, league_id=1, player_score_id=score_id,
+                    hole_id=hole_id, match_id=match_id, player_id=player_id, team_id=team_id,
+                    hole_number=hole_id - 10, strokes=4
+                ))
+    db.commit()
+
+
+def test_statement_count_does_not_grow_with_rows(db):
+    add_weeks(db, 1)
+    small = execute(db, LEAGUE_NIGHT)
+    add_weeks(db, 5)
+    large = execute(db, LEAGUE_NIGHT)
+
+    assert large["statements"] == small["statements"]
+    league = large["data"]["league"][0]
+    assert len(league["matches"]) == 6
+    assert all(len(score["hole_scores"]) == 2 for m in league["matches"] for score in m["scores"])
+    assert [t["players"][0]["id"] for t in league["teams"]] == [101, 201]
+    assert [h["number"] for h in league["course"]["holes"]] == [1, 2]
+
+
+def test_archived_league_matches_come_from_the_snapshot(db, tmp_path):
+    path = str(tmp_path / "league_2.snap")
+    write_snapshot(path, {
+        "league": {"id": 2},
+        "matches": [
+            {"id": 50, "league_id": 2, "week_number": 1, "team1_id": 1, "team2_id": 2, "date": None,
+             "result": {"team1_points": 3.0, "team2_points": 1.0, "holes_scored": 2}, "scores": []},
+            {"id": 51, "league_id": 2, "week_number": 2, "team1_id": 2, "team2_id": 1, "date": None,
+             "result": {"team1_points": 2.0, "team2_points": 2.0, "holes_scored": 2}, "scores": []},
+        ]
+    })
+    db.add(League(id=2, name="Archived", course_id=1, snapshot_path=path))
+    db.commit()
+
+    result = execute(db, {"league": {
+        "resource": "leagues",
+        "where": {"id": 2},
+        "include": {"matches": {"where": {"week_number": 2}, "include": {"result": {}, "team1": {}}}}
+    }})
+    matches = result["data"]["league"][0]["matches"]
+    assert [m["id"] for m in matches] == [51]
+    assert matches[0]["result"] == {
+        "match_id": 51, "team1_points": 2.0, "team2_points": 2.0, "holes_scored": 2
+    }
+    assert matches[0]["team1"] == {"id": 2, "name": "Two"}
+
+
+@pytest.mark.parametrize("value", [{"id": 1}, [[1, 2]], [{"id": 1}]])
+def test_unhashable_filter_values_are_rejected(db, value):
+    with pytest.raises(ValueError, match="takes a value or a list of values"):
+        execute(db, {"league": {"resource": "leagues", "where": {"id": value}}})
+
+
+def test_list_filters_are_accepted(db):
+    result = execute(db, {"league": {"resource": "leagues", "where": {"id": [1, 2]}}})
+    assert [league["id"] for league in result["data"]["league"]] == [1]
@@ -0,0 +1,31 @@
+import os
+
+from app.diagnostics.profiling import SamplingProfiler, prune_profiles
+
+
+def test_sample_records_folded_stacks():
+    sampler = SamplingProfiler(interval=1.0)
+    sampler.sample()
+    folded = sampler.folded()
+    assert sampler.samples == 1
+    assert "test_sampling_profiler:test_sample_records_folded_stacks" in folded
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) == 1
+
+
+def test_reset_clears_stacks():
+    sampler = SamplingProfiler(interval=1.0)
+    sampler.sample()
+    sampler.reset()
+    assert sampler.folded() == ""
+    assert sampler.samples == 0
+
+
+def test_prune_profiles_keeps_the_most_recent(tmp_path):
+    for n in range(4):
+        path = tmp_path / f"{n}.pstats"
+        path.write_text("")
+        os.utime(path, (n, n))
+    (tmp_path / "notes.txt").write_text("")
+    prune_profiles(str(tmp_path), keep=2)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2.pstats", "3.pstats", "notes.txt"]
@@ -0,0 +1,70 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.rules.formats import cards_to_strokes, compile_format
+from app.rules.scoring import calculate_card_points, score_hole
+
+PARS = (4, 3, 5)
+STROKE_INDEX = (2, 3, 1)
+HOLES = [SimpleNamespace(number=n, par=p, handicap=i) for n, p, i in zip((1, 2, 3), PARS, STROKE_INDEX)]
+
+
+def strokes(*cards):
+    return cards_to_strokes([dict(zip((1, 2, 3), card)) for card in cards], (1, 2, 3))
+
+
+def test_default_format_matches_hole_rule():
+    rng = np.random.default_rng(1)
+    for _ in range(50):
+        team1 = rng.integers(3, 7, size=(2, 3)).tolist()
+        team2 = rng.integers(3, 7, size=(2, 3)).tolist()
+        expected1 = expected2 = 0
+        for h in range(3):
+            result = score_hole([c[h] for c in team1], [c[h] for c in team2], h + 1)
+            expected1 += result['points_team1']
+            expected2 += result['points_team2']
+
+        points = calculate_card_points(
+            [dict(zip((1, 2, 3), c)) for c in team1],
+            [dict(zip((1, 2, 3), c)) for c in team2],
+            HOLES
+        )
+        assert (points['team1_points'], points['team2_points']) == (expected1, expected2)
+
+def test_unplayed_holes_are_skipped():
+    points = calculate_card_points([{1: 4}], [{1: 5, 2: 3}], HOLES)
+    assert [h['hole_number'] for h in points['hole_results']] == [1]
+    assert points['team1_points'] == 2
+
+def test_integer_batches_match_float_cards():
+    compiled = compile_format("best_ball_aggregate", PARS, STROKE_INDEX)
+    team1 = np.array([[[4, 3, 6], [5, 4, 5]]], dtype=np.int16)
+    team2 = np.array([[[4, 4, 5], [4, 3, 6]]], dtype=np.int16)
+    ints = compiled(team1, team2)
+    floats = compiled(team1.astype(float), team2.astype(float))
+    for a, b in zip(ints, floats):
+        assert np.array_equal(a, b)
+
+def test_match_play_halved():
+    compiled = compile_format("match_play", PARS, STROKE_INDEX)
+    _, _, total1, total2 = compiled(strokes((3, 4, 5)), strokes((4, 3, 5)))
+    assert (total1[0], total2[0]) == (0.5, 0.5)
+
+def test_skins_carry_over():
+    compiled = compile_format("skins", PARS, STROKE_INDEX)
+    hole1, hole2, total1, total2 = compiled(strokes((4, 3, 4)), strokes((4, 3, 5)))
+    assert hole1[0].tolist() == [0, 0, 3]
+    assert (total1[0], total2[0]) == (3, 0)
+
+def test_stableford_points():
+    compiled = compile_format("stableford", PARS, STROKE_INDEX)
+    _, _, total1, total2 = compiled(strokes((3, 3, 7)), strokes((4, 4, 5)))
+    assert (total1[0], total2[0]) == (3 + 2 + 0, 2 + 1 + 2)
+
+def test_net_strokes_go_to_hardest_holes_first():
+    compiled = compile_format("net_best_ball", PARS, STROKE_INDEX)
+    assert compiled.strokes_received([1]).tolist() == [[0, 0, 1]]
+    assert compiled.strokes_received([4]).tolist() == [[1, 1, 2]]
+    _, _, total1, total2 = compiled(strokes((5, 3, 5)), strokes((4, 3, 5)), [3], [0])
+    assert (total1[0], total2[0]) == (2, 0)
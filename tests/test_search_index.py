@@ -0,0 +1,47 @@
+from app.search.index import SearchIndex, SearchDoc, PLAYER, TEAM, COURSE
+
+
+def make_index():
+    index = SearchIndex()
+    index.upsert([
+        SearchDoc(PLAYER, 1, "Tom Watson"),
+        SearchDoc(PLAYER, 2, "Tommy Fleetwood"),
+        SearchDoc(PLAYER, 3, "Jon Rahm"),
+        SearchDoc(TEAM, 1, "Thunder Tommies"),
+        SearchDoc(COURSE, 1, "Pebble Beach"),
+    ])
+    return index
+
+
+def names(docs):
+    return [doc.name for doc in docs]
+
+
+def test_prefix_matches_any_word():
+    assert set(names(make_index().search("tom"))) == {"Tom Watson", "Tommy Fleetwood", "Thunder Tommies"}
+
+
+def test_every_query_word_must_match():
+    assert names(make_index().search("tom wat")) == ["Tom Watson"]
+
+
+def test_whole_name_prefix_ranks_first():
+    assert names(make_index().search("tom"))[0] == "Tom Watson"
+
+
+def test_infix_fallback():
+    assert names(make_index().search("ebbl")) == ["Pebble Beach"]
+
+
+def test_kind_filter_and_limit():
+    index = make_index()
+    assert names(index.search("tom", kinds={TEAM})) == ["Thunder Tommies"]
+    assert len(index.search("tom", limit=1)) == 1
+
+
+def test_upsert_replaces_and_remove_drops():
+    index = make_index()
+    index.upsert([SearchDoc(PLAYER, 3, "Jon Rahm Jr")])
+    assert names(index.search("jr")) == ["Jon Rahm Jr"]
+    index.remove(PLAYER, [3])
+    assert index.search("rahm") == []
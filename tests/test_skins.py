@@ -0,0 +1,41 @@
+import numpy as np
+
+from app.rules.formats import allocate_strokes, allocation_rank
+from app.rules.skins import compute_skins
+
+STROKE_INDEX = (2, 3, 1)
+nan = np.nan
+
+
+def skins(*cards):
+    won, winners, values, carried = compute_skins(np.array(cards, dtype=float))
+    return [int(w) if ok else None for ok, w in zip(won, winners)], values.tolist(), carried
+
+
+def test_tied_holes_carry_to_the_next_winner():
+    assert skins((4, 3, 5, 4), (4, 4, 5, 3)) == ([None, 0, None, 1], [0, 2, 0, 2], 0)
+
+
+def test_ties_after_the_last_win_stay_carried():
+    assert skins((3, 4, 4), (4, 4, 4)) == ([0, None, None], [1, 0, 0], 2)
+
+
+def test_shared_low_wins_nothing_even_when_others_are_higher():
+    assert skins((3,), (3,), (4,)) == ([None], [0], 1)
+
+
+def test_unplayed_holes_do_not_add_to_the_carry():
+    assert skins((4, nan, 3), (4, nan, 5)) == ([None, None, 0], [0, 0, 2], 0)
+
+
+def test_the_only_card_on_a_hole_wins_it():
+    assert skins((nan, 4), (5, 4)) == ([1, None], [1, 0], 1)
+
+
+def test_net_strokes_change_the_winners():
+    gross = np.array([(4, 4, 5), (5, 4, 5)], dtype=float)
+    # The second player's one stroke falls on the hardest hole, the third
+    net = gross - allocate_strokes([0, 1], allocation_rank(STROKE_INDEX))
+
+    assert skins(*gross) == ([0, None, None], [1, 0, 0], 2)
+    assert skins(*net) == ([0, None, 1], [1, 0, 2], 0)
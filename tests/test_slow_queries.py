@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+from app.diagnostics.slow_queries import SlowQueryLog, fingerprint, normalize_route, parameters_shape
+
+
+def test_fingerprint_collapses_literals_and_in_lists():
+    a = fingerprint("SELECT * FROM matches\n WHERE league_id = 5 AND id IN (1, 2, 3)")
+    b = fingerprint("SELECT * FROM matches WHERE league_id = 7 AND id IN (4)")
+    assert a == b == "SELECT * FROM matches WHERE league_id = ? AND id IN (...)"
+
+
+def test_fingerprint_replaces_placeholders_and_strings():
+    assert fingerprint("SELECT id FROM teams WHERE name = 'Eagles' AND id = %(id_1)s") == \
+        "SELECT id FROM teams WHERE name = ? AND id = ?"
+
+
+def test_parameters_shape_hides_values():
+    assert parameters_shape({"league_id": 5, "name": "x"}, False) == "{league_id: int, name: str}"
+    assert parameters_shape([(1, 2), (3, 4)], True) == "2 rows of (int, int)"
+
+
+def test_normalize_route_replaces_ids():
+    assert normalize_route("GET", "/leagues/12/matches/week/3") == "GET /leagues/{id}/matches/week/{id}"
+
+
+def test_timing_is_kept_per_execution_context():
+    log = SlowQueryLog(threshold=0)
+    conn = SimpleNamespace(engine=None, info={})
+    # A statement that raised never gets after_cursor_execute
+    log._before(conn, None, "SELECT 1", {}, SimpleNamespace(), False)
+    context = SimpleNamespace()
+    log._before(conn, None, "SELECT 2", {}, context, False)
+    log._after(conn, None, "SELECT 2", {}, context, False)
+    assert conn.info == {}
+    assert [entry["statement"] for entry in log.top(10)] == ["SELECT ?"]
@@ -0,0 +1,73 @@
+import os
+from datetime import date
+
+from app.archive.snapshot import open_snapshot, write_snapshot
+from app.models.schemas import MatchResponse
+
+
+def make_season(strokes=4):
+    def card(score_id, match_id, player_id, team_id):
+        return {
+            "id": score_id,
+            "match_id": match_id,
+            "player_id": player_id,
+            "team_id": team_id,
+            "hole_scores": [
+                {"hole_id": 11, "hole_number": 1, "strokes": strokes},
+                {"hole_id": 12, "hole_number": 2, "strokes": strokes + 1},
+            ]
+        }
+
+    return {
+        "league": {"id": 7, "name": "Archived", "course_id": 3, "scoring_format": "best_ball_aggregate"},
+        "course": {"id": 3, "name": "Course", "holes": [
+            {"id": 11, "number": 1, "par": 4, "handicap": 1},
+            {"id": 12, "number": 2, "par": 4, "handicap": 2},
+        ]},
+        "teams": [{"id": 1, "name": "One", "players": []}, {"id": 2, "name": "Two", "players": []}],
+        "matches": [
+            {
+                "id": 20, "league_id": 7, "week_number": 1, "team1_id": 1, "team2_id": 2,
+                "date": "2024-05-01",
+                "result": {"team1_points": 2.0, "team2_points": 2.0, "holes_scored": 2},
+                "scores": [card(200, 20, 101, 1), card(201, 20, 201, None)]
+            },
+            {
+                "id": 21, "league_id": 7, "week_number": 2, "team1_id": 2, "team2_id": 1,
+                "date": None,
+                "result": {"team1_points": 0, "team2_points": 0, "holes_scored": 0},
+                "scores": []
+            },
+        ]
+    }
+
+
+def test_export_round_trips_the_season(tmp_path):
+    season = make_season()
+    path = str(tmp_path / "league_7.snap")
+    write_snapshot(path, season)
+
+    snapshot = open_snapshot(path)
+    assert snapshot.export() == season
+    assert snapshot.hole_score_count() == 4
+    assert snapshot.weeks() == [1, 2]
+    assert [m["id"] for m in snapshot.matches(2)] == [21]
+
+
+def test_undated_snapshot_matches_validate(tmp_path):
+    path = str(tmp_path / "league_7.snap")
+    write_snapshot(path, make_season())
+
+    matches = [MatchResponse.model_validate(m) for m in open_snapshot(path).matches()]
+    assert [m.date for m in matches] == [date(2024, 5, 1), None]
+
+
+def test_rewritten_snapshot_is_reopened(tmp_path):
+    path = str(tmp_path / "league_7.snap")
+    write_snapshot(path, make_season(strokes=4))
+    assert open_snapshot(path).export()["matches"][0]["scores"][0]["hole_scores"][0]["strokes"] == 4
+
+    write_snapshot(path, make_season(strokes=5))
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1))
+    assert open_snapshot(path).export()["matches"][0]["scores"][0]["hole_scores"][0]["strokes"] == 5
@@ -0,0 +1,175 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.base import Base
+from app.models.base.models import TaskOutbox
+from app.tasks import queue
+from app.tasks.queue import DONE, FAILED, PENDING, RUNNING, TaskQueue, enqueue
+
+KIND = "test_task"
+
+
+@pytest.fixture
+def session_factory(tmp_path, monkeypatch):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'outbox.db'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine, tables=[TaskOutbox.__table__])
+    factory = sessionmaker(bind=engine)
+    monkeypatch.setattr(queue, "SessionLocal", factory)
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def handler(monkeypatch):
+    """Records each (league, week) run; queued behaviours run one per call"""
+    handled = SimpleNamespace(calls=[], behaviours=[])
+
+    def handle(db, league_id, week_number):
+        handled.calls.append((league_id, week_number))
+        if handled.behaviours:
+            handled.behaviours.pop(0)()
+
+    monkeypatch.setitem(queue._handlers, KIND, handle)
+    return handled
+
+
+def add_task(factory, week_number=1, status=PENDING):
+    db = factory()
+    if status == PENDING:
+        enqueue(db, KIND, 1, week_number)
+    else:
+        db.add(TaskOutbox(kind=KIND, league_id=1, week_number=week_number, status=status, attempts=0))
+    db.commit()
+    db.close()
+
+
+def statuses(factory):
+    db = factory()
+    rows = [(t.status, t.attempts) for t in db.query(TaskOutbox).order_by(TaskOutbox.id)]
+    db.close()
+    return rows
+
+
+async def until(condition, timeout=2.0):
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not condition():
+        assert loop.time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def run(task_queue, body):
+    async def main():
+        await task_queue.start()
+        try:
+            await body()
+        finally:
+            await task_queue.stop()
+    asyncio.run(main())
+
+
+def raises():
+    raise RuntimeError("boom")
+
+
+def test_enqueue_reuses_the_pending_row(session_factory):
+    db = session_factory()
+    first = enqueue(db, KIND, 1, 1)
+    assert enqueue(db, KIND, 1, 1).id == first.id
+    assert enqueue(db, KIND, 1, 2).id != first.id
+
+    first.status = DONE
+    db.flush()
+    assert enqueue(db, KIND, 1, 1).id != first.id
+    db.close()
+
+
+def test_burst_of_notifies_runs_once(session_factory, handler):
+    task_queue = TaskQueue(workers=2, coalesce_seconds=0.05, max_attempts=3)
+
+    async def body():
+        add_task(session_factory)
+        for _ in range(3):
+            task_queue.notify(KIND, 1, 1)
+        await until(lambda: statuses(session_factory) == [(DONE, 1)])
+        await asyncio.sleep(0.1)
+
+    run(task_queue, body)
+    assert handler.calls == [(1, 1)]
+
+
+def test_start_recovers_pending_and_interrupted_rows(session_factory, handler):
+    add_task(session_factory, week_number=1, status=RUNNING)
+    add_task(session_factory, week_number=1)
+    add_task(session_factory, week_number=2)
+    task_queue = TaskQueue(workers=1, coalesce_seconds=0.01, max_attempts=3)
+
+    async def body():
+        await until(lambda: all(status == DONE for status, _ in statuses(session_factory)))
+
+    run(task_queue, body)
+    assert sorted(handler.calls) == [(1, 1), (1, 2)]
+
+
+def test_notify_while_running_queues_one_rerun(session_factory, handler):
+    started, release = threading.Event(), threading.Event()
+
+    def block():
+        started.set()
+        release.wait(2)
+
+    handler.behaviours.append(block)
+    task_queue = TaskQueue(workers=2, coalesce_seconds=0.01, max_attempts=3)
+
+    async def body():
+        add_task(session_factory)
+        task_queue.notify(KIND, 1, 1)
+        assert await asyncio.to_thread(started.wait, 2)
+
+        add_task(session_factory)
+        task_queue.notify(KIND, 1, 1)
+        task_queue.notify(KIND, 1, 1)
+        await until(lambda: task_queue.depth() == 1)
+        release.set()
+        await until(lambda: statuses(session_factory) == [(DONE, 1), (DONE, 1)])
+
+    run(task_queue, body)
+    assert handler.calls == [(1, 1), (1, 1)]
+
+
+def test_failed_task_is_retried_after_backoff(session_factory, handler):
+    handler.behaviours.append(raises)
+    task_queue = TaskQueue(workers=1, coalesce_seconds=0.04, max_attempts=3)
+
+    async def body():
+        add_task(session_factory)
+        task_queue.notify(KIND, 1, 1)
+        await until(lambda: statuses(session_factory) == [(PENDING, 1)])
+        # Retries wait five debounce periods
+        await asyncio.sleep(0.05)
+        assert len(handler.calls) == 1
+        await until(lambda: statuses(session_factory) == [(DONE, 2)])
+
+    run(task_queue, body)
+    assert len(handler.calls) == 2
+
+
+def test_task_fails_after_max_attempts(session_factory, handler):
+    handler.behaviours.extend([raises, raises])
+    task_queue = TaskQueue(workers=1, coalesce_seconds=0.01, max_attempts=2)
+
+    async def body():
+        add_task(session_factory)
+        task_queue.notify(KIND, 1, 1)
+        await until(lambda: statuses(session_factory) == [(FAILED, 2)])
+        await asyncio.sleep(0.1)
+
+    run(task_queue, body)
+    assert len(handler.calls) == 2
@@ -0,0 +1,41 @@
+from types import SimpleNamespace
+
+from app.rules.validation import validate_player_scores
+
+
+def card(player_id, *holes):
+    return SimpleNamespace(
+        player_id=player_id,
+        scores=[SimpleNamespace(hole_id=hole_id, strokes=strokes) for hole_id, strokes in holes]
+    )
+
+ROSTERS = {1: {10, 11}, 2: {20, 21}}
+HOLES = {100, 101, 102}
+
+def test_valid_submission_assigns_teams():
+    errors, team_ids = validate_player_scores(
+        5, 1, 2, ROSTERS, HOLES,
+        [card(10, (100, 4), (101, 5)), card(21, (100, 3))]
+    )
+    assert errors == []
+    assert team_ids == {10: 1, 21: 2}
+
+def test_player_not_on_either_team():
+    errors, team_ids = validate_player_scores(
+        5, 1, 2, ROSTERS, HOLES, [card(30, (100, 4))]
+    )
+    assert [e["code"] for e in errors] == ["player_not_in_match"]
+    assert errors[0]["player_id"] == 30
+    assert team_ids == {}
+
+def test_unknown_and_duplicate_holes():
+    errors, _ = validate_player_scores(
+        5, 1, 2, ROSTERS, HOLES, [card(10, (100, 4), (100, 5), (999, 3))]
+    )
+    assert sorted(e["code"] for e in errors) == ["duplicate_hole", "hole_not_on_course"]
+
+def test_duplicate_player_and_invalid_strokes():
+    errors, _ = validate_player_scores(
+        5, 1, 2, ROSTERS, HOLES, [card(10, (100, 0)), card(10, (101, 4))]
+    )
+    assert sorted(e["code"] for e in errors) == ["duplicate_player", "invalid_strokes"]
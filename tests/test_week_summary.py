@@ -0,0 +1,104 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.teams import update_roster
+from app.models import schemas
+from app.models.base import Base
+from app.models.base.models import (
+    Course, Hole, Team, Player, League, LeagueTeam, Match, PlayerScore, HoleScore, WeekSummary
+)
+from app.rules.summary import refresh_week_summary, week_summary
+
+# {player: (team, league average, [hole 1 strokes, hole 2 strokes])}; par 4 and 3
+CARDS = {
+    101: (1, None, [4, 3]),
+    102: (1, None, [3]),
+    201: (2, 10.0, [5, 5]),
+    202: (2, None, [4, 3]),
+}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Course(id=1, name="Course"),
+        Hole(id=11, course_id=1, number=1, par=4, handicap=1),
+        Hole(id=12, course_id=1, number=2, par=3, handicap=2),
+        Team(id=1, name="One"), Team(id=2, name="Two"),
+        League(id=1, name="League", course_id=1, scoring_format="best_ball_aggregate"),
+        LeagueTeam(league_id=1, team_id=1), LeagueTeam(league_id=1, team_id=2),
+        Match(id=1, league_id=1, week_number=1, team1_id=1, team2_id=2),
+        Match(id=2, league_id=1, week_number=2, team1_id=2, team2_id=1),
+    ])
+    hole_score_id = 0
+    for player_id, (team_id, league_average, strokes) in CARDS.items():
+        session.add(Player(
+            id=player_id, first_name="P", last_name=str(player_id),
+            team_id=team_id, league_average=league_average
+        ))
+        session.add(PlayerScore(id=player_id, match_id=1, player_id=player_id, team_id=team_id))
+        for hole_id, hole_strokes in zip((11, 12), strokes):
+            hole_score_id += 1
+            session.add(HoleScore(
+                id=hole_score_id, league_id=1, player_score_id=player_id, hole_id=hole_id,
+                match_id=1, player_id=player_id, team_id=team_id,
+                hole_number=hole_id - 10, strokes=hole_strokes
+            ))
+    session.commit()
+    yield session
+    session.close()
+
+
+def summary(db, week_number=1):
+    return week_summary(db, db.get(League, 1), week_number)
+
+
+def test_per_hole_averages(db):
+    first, second = summary(db)["holes"]
+    assert first == {
+        "hole_number": 1, "par": 4, "handicap": 1, "scores": 4, "average": 4.0, "to_par": 0.0,
+        "low": 3, "high": 5, "birdies_or_better": 1, "pars": 2, "bogeys_or_worse": 1
+    }
+    assert (second["scores"], second["average"], second["to_par"]) == (3, 3.67, 0.67)
+    assert summary(db)["hardest_hole"] == 2
+    assert summary(db)["easiest_hole"] == 1
+
+
+def test_only_complete_rounds_count(db):
+    result = summary(db)
+    assert result["players"] == 4
+    assert result["complete_rounds"] == 3
+    assert result["field_average"] == 8.0
+    rounds = result["low_gross"] + result["low_net"]
+    assert 102 not in {r["player_id"] for r in rounds}
+
+
+def test_low_rounds_keep_every_tie(db):
+    result = summary(db)
+    assert sorted(r["player_id"] for r in result["low_gross"]) == [101, 202]
+    # 201 shoots 10 off a handicap of 3 (average 10 on a par 7)
+    assert sorted(r["player_id"] for r in result["low_net"]) == [101, 201, 202]
+    assert {r["net"] for r in result["low_net"]} == {7}
+
+
+def test_unscored_week_has_no_summary(db):
+    assert summary(db, week_number=2) is None
+    assert summary(db, week_number=3) is None
+
+
+def test_handicap_change_drops_stored_summaries(db):
+    refresh_week_summary(db, 1, 1)
+    db.commit()
+
+    update_roster(db, 1, [schemas.PlayerBase(id=101, first_name="P", last_name="101")], replace=False)
+    assert db.query(WeekSummary).count() == 1
+
+    update_roster(
+        db, 1, [schemas.PlayerBase(id=101, first_name="P", last_name="101", league_average=9.0)],
+        replace=False
+    )
+    assert db.query(WeekSummary).count() == 0